@@ -1 +1,24 @@
-from .circuit import circuit, node, gate
\ No newline at end of file
+from .circuit_types import node_type, node_value, gate_type, fault_types
+from .circuit import circuit, node, gate, fault
+from .simulation import create_input_vector, monte_carlo_select, print_tables, test_circuit, result_node_names, \
+                        test_fault_simulation, test_full_fault_list_detection, \
+                        print_scoap_simulation_comparison, perform_monte_carlo_test, x_expansion_outputs, \
+                        check_three_valued_simulation
+from .fault_simulation import fault_simulator
+from .fault_grading import fault_grading_session
+from .parallel_fault_simulation import parallel_fault_simulator
+from .fault_collapsing import fault_universe
+from .compiled_simulation import compiled_circuit
+from .podem import podem, test_generation_session, test_status
+from .pattern_source import random_pattern_source, simulate_random_patterns
+from .testability import testability_analysis
+from .exhaustive import gray_code_vectors, truth_tables
+from .profiling import simulation_profile, diff_profiles
+from .result_sinks import columnar_result_store, result_stream_writer, count_sink, read_result_file
+from .fault_dictionary import fault_dictionary
+from .compaction import merge_compatible_vectors, test_compaction_session
+from .structure import structural_index
+from .service import simulation_server, simulation_client, async_simulation_client, run_server, benchmark_service
+from .three_valued import pack_three_valued_vectors, unpack_rails
+from .weighted_patterns import weighted_pattern_source, fault_weight_analysis, weighted_random_session, \
+                               compare_with_uniform, print_weighted_comparison
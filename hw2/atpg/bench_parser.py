@@ -0,0 +1,301 @@
+import os
+import mmap
+import struct
+import hashlib
+import stat
+from array import array
+from .errors import *
+from .circuit_types import *
+
+#gate type of a node without a gate (primary input)
+no_gate = -1
+
+#header of the binary netlist cache: magic, bench file mtime (ns), bench file size,
+#sha256 of the bench file, number of nodes, number of fanin entries, size of the names
+cache_magic = b"ATPGNET1"
+cache_header = struct.Struct("<8sqq32siii")
+
+class parsed_netlist:
+    '''
+    Netlist read from a circuit bench file. Nodes are numbered in the order they are
+    declared (INPUT, OUTPUT or assignment), which is also the order of circuit.nodes.
+
+    Attributes:
+    names: Name of each node(string)
+    node_types: Node type of each node(node_type)
+    gate_types: Gate type of each node, no_gate for inputs(gate_type)
+    fanin_offsets, fanin_index: IDs of the nodes fed in of node i are
+                                fanin_index[fanin_offsets[i]:fanin_offsets[i + 1]]
+    input_is_output: 1 for primary inputs also declared as primary outputs
+    '''
+
+    def __init__(self, names, node_types, gate_types, fanin_offsets, fanin_index, input_is_output):
+        self.names = names
+        self.node_types = node_types
+        self.gate_types = gate_types
+        self.fanin_offsets = fanin_offsets
+        self.fanin_index = fanin_index
+        self.input_is_output = input_is_output
+
+    def fanin(self, i):
+        '''
+        Returns the IDs of the nodes fed in to node i
+        '''
+        return self.fanin_index[self.fanin_offsets[i]:self.fanin_offsets[i + 1]]
+
+def parse_bench_text(text):
+    '''
+    Parses the contents of a circuit bench file in a single pass. Node names used before
+    they are declared get a placeholder that is patched once the node is declared.
+    Comments start with # and run to the end of the line.
+    '''
+    names = []
+    node_index = {}
+    node_types = []
+    gate_types = []
+    fanins = []
+    input_is_output = []
+    pending = {} #forward references, (node ID, fanin position) of every use of an undeclared name
+
+    def declare(name):
+        i = node_index.get(name)
+        if i == None:
+            i = len(names)
+            node_index[name] = i
+            names.append(name)
+            node_types.append(node_type.internal_wire)
+            gate_types.append(no_gate)
+            fanins.append(None)
+            input_is_output.append(0)
+            for user, position in pending.pop(name, ()):
+                fanins[user][position] = i
+        return i
+
+    for line in text.splitlines():
+        comment = line.find("#")
+        if comment >= 0:
+            line = line[:comment]
+        line = line.strip()
+        if not line:
+            continue
+
+        open_paren = line.find("(")
+        close_paren = line.rfind(")")
+        if (open_paren < 0) or (close_paren < open_paren):
+            raise GateReprError(line)
+        arguments = line[open_paren + 1:close_paren]
+        equal = line.find("=")
+
+        if (equal < 0) or (equal > open_paren):
+            keyword = line[:open_paren].strip().upper()
+            i = declare(arguments.strip())
+            if keyword == "INPUT":
+                input_is_output[i] = int(node_types[i] == node_type.output_node)
+                node_types[i] = node_type.input_node
+            elif keyword == "OUTPUT":
+                if node_types[i] == node_type.input_node:
+                    input_is_output[i] = 1
+                else:
+                    node_types[i] = node_type.output_node
+            else:
+                raise GateReprError(line)
+            continue
+
+        keyword = line[equal + 1:open_paren].strip().upper()
+        if not keyword:
+            raise GateReprError(line[equal + 1:].strip())
+        if keyword not in gate_dict:
+            raise GateNotDefined(keyword)
+
+        i = declare(line[:equal].strip())
+        gate_types[i] = gate_dict[keyword][0]
+        fanin = []
+        for input_name in arguments.split(","):
+            input_name = input_name.strip()
+            j = node_index.get(input_name)
+            if j == None:
+                pending.setdefault(input_name, []).append((i, len(fanin)))
+                j = -1
+            fanin.append(j)
+        fanins[i] = fanin
+
+    if pending:
+        raise NodeNotDefined(next(iter(pending)))
+
+    fanin_offsets = array("i", [0])
+    fanin_index = array("i")
+    for i in range(len(names)):
+        if fanins[i] != None:
+            fanin_index.extend(fanins[i])
+        fanin_offsets.append(len(fanin_index))
+
+    return parsed_netlist(names, array("b", node_types), array("b", gate_types),
+                          fanin_offsets, fanin_index, array("b", input_is_output))
+
+def parse_bench_file(circuit_bench_file):
+    '''
+    Parses a circuit bench file, see parse_bench_text
+    '''
+    with open(circuit_bench_file, "r") as f:
+        return parse_bench_text(f.read())
+
+def default_cache_dir():
+    '''
+    Returns the default directory of the netlist cache and of the compiled code cache, a
+    directory of the current user: $XDG_CACHE_HOME/atpg or ~/.cache/atpg
+    '''
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "atpg")
+
+def is_private(status):
+    '''
+    Returns True if the file or directory of the os.stat result is owned by the current
+    user and can not be written by other users. Cache files are only loaded if private,
+    another user could otherwise plant a netlist or a code object
+    '''
+    if hasattr(os, "getuid") and (status.st_uid != os.getuid()):
+        return False
+    return (status.st_mode & (stat.S_IWGRP | stat.S_IWOTH)) == 0
+
+def private_file_opener(path, flags):
+    '''
+    Opener of the cache files written, open(path, mode, opener = private_file_opener) creates
+    the file with mode 0600 whatever the umask
+    '''
+    return os.open(path, flags, 0o600)
+
+def private_cache_dir(cache_dir = None):
+    '''
+    Returns the cache directory, the default one if not given. A missing directory is
+    created with mode 0700. Raises CacheDirNotPrivate if the directory is a symbolic link,
+    is owned by another user or can be written by other users
+
+    param[in] cache_dir: Directory of the cache
+    '''
+    if cache_dir == None:
+        cache_dir = default_cache_dir()
+    os.makedirs(cache_dir, mode = 0o700, exist_ok = True)
+    status = os.lstat(cache_dir)
+    if (not stat.S_ISDIR(status.st_mode)) or (not is_private(status)):
+        raise CacheDirNotPrivate(cache_dir)
+    return cache_dir
+
+def cache_file_path(circuit_bench_file, cache_dir = None):
+    '''
+    Returns the path of the cache file of a circuit bench file, named after its absolute path
+    '''
+    if cache_dir == None:
+        cache_dir = default_cache_dir()
+    key = hashlib.sha1(os.path.abspath(circuit_bench_file).encode()).hexdigest()
+    return os.path.join(cache_dir, f"{key}.atpgn")
+
+def store_netlist(netlist: parsed_netlist, cache_file, mtime, size, digest):
+    '''
+    Writes the netlist in the binary cache format: header, node types, gate types,
+    input_is_output, fanin offsets, fanin index and the names separated by new lines
+    '''
+    names = "\n".join(netlist.names).encode()
+    os.makedirs(os.path.dirname(cache_file), exist_ok = True)
+    temp_file = f"{cache_file}.{os.getpid()}.tmp"
+    with open(temp_file, "wb", opener = private_file_opener) as f:
+        f.write(cache_header.pack(cache_magic, mtime, size, digest, len(netlist.names),
+                                  len(netlist.fanin_index), len(names)))
+        f.write(netlist.node_types.tobytes())
+        f.write(netlist.gate_types.tobytes())
+        f.write(netlist.input_is_output.tobytes())
+        f.write(netlist.fanin_offsets.tobytes())
+        f.write(netlist.fanin_index.tobytes())
+        f.write(names)
+    os.replace(temp_file, cache_file)
+
+def _discard_cache_file(cache_file):
+    '''
+    Deletes a cache file that can not be used, it is written again by load_bench_file
+    '''
+    try:
+        os.remove(cache_file)
+    except OSError:
+        pass
+
+def load_netlist(cache_file):
+    '''
+    Maps a cache file and returns its header and the netlist, None if the file can not be
+    used. A file whose arrays do not match the sizes in its header (truncated or corrupt)
+    or that is not private (see is_private) is deleted
+    '''
+    try:
+        with open(cache_file, "rb") as f:
+            if not is_private(os.fstat(f.fileno())):
+                data = None
+            else:
+                data = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None, None
+    if data == None:
+        _discard_cache_file(cache_file)
+        return None, None
+
+    valid = False
+    with data:
+        if len(data) >= cache_header.size:
+            header = cache_header.unpack_from(data)
+            magic, mtime, size, digest, num_nodes, num_fanin, names_size = header
+            offset_size = array("i").itemsize
+            expected_size = cache_header.size + 3 * num_nodes + offset_size * (num_nodes + 1 + num_fanin) + names_size
+            valid = (magic == cache_magic) and (len(data) == expected_size)
+
+        if valid:
+            view = memoryview(data)
+            position = cache_header.size
+            fields = []
+            for code, length in [("b", num_nodes), ("b", num_nodes), ("b", num_nodes),
+                                 ("i", num_nodes + 1), ("i", num_fanin)]:
+                field = array(code)
+                end = position + field.itemsize * length
+                field.frombytes(view[position:end])
+                fields.append(field)
+                position = end
+            names = bytes(view[position:position + names_size])
+            view.release()
+
+    if valid:
+        node_types, gate_types, input_is_output, fanin_offsets, fanin_index = fields
+        try:
+            names = names.decode().split("\n") if num_nodes else []
+        except UnicodeDecodeError:
+            names = None
+        valid = (names != None) and (len(names) == num_nodes) and (fanin_offsets[0] == 0) and \
+                (fanin_offsets[-1] == num_fanin) and \
+                all(fanin_offsets[i] <= fanin_offsets[i + 1] for i in range(num_nodes)) and \
+                all(0 <= j < num_nodes for j in fanin_index)
+
+    if not valid:
+        _discard_cache_file(cache_file)
+        return None, None
+    return header, parsed_netlist(names, node_types, gate_types, fanin_offsets, fanin_index, input_is_output)
+
+def load_bench_file(circuit_bench_file, use_cache = False, cache_dir = None):
+    '''
+    Returns the parsed netlist of a circuit bench file. With use_cache the netlist is kept
+    in a binary cache file. The cache is used directly if the modification time and size
+    of the bench file did not change, otherwise only if the sha256 of the bench file
+    still matches. The cache directory must be private to the current user, see
+    private_cache_dir
+    '''
+    if not use_cache:
+        return parse_bench_file(circuit_bench_file)
+
+    cache_file = cache_file_path(circuit_bench_file, private_cache_dir(cache_dir))
+    status = os.stat(circuit_bench_file)
+    header, netlist = load_netlist(cache_file)
+    if (header != None) and (header[1] == status.st_mtime_ns) and (header[2] == status.st_size):
+        return netlist
+
+    with open(circuit_bench_file, "rb") as f:
+        contents = f.read()
+    digest = hashlib.sha256(contents).digest()
+    if (header == None) or (header[3] != digest):
+        netlist = parse_bench_text(contents.decode())
+
+    store_netlist(netlist, cache_file, status.st_mtime_ns, status.st_size, digest)
+    return netlist
@@ -0,0 +1,171 @@
+import gc
+import json
+import os
+import platform
+import random
+import time
+import tracemalloc
+from .circuit import *
+from .fault_simulation import *
+
+#measured metrics as (unit, True if a higher value is better)
+metrics = {
+    "parse_time": ("s", False),
+    "levelize_time": ("s", False),
+    "scalar_simulation_rate": ("vectors/s", True),
+    "parallel_simulation_rate": ("vectors/s", True),
+    "fault_list_time": ("s", False),
+    "fault_simulation_rate": ("faults x vectors/s", True),
+    "peak_memory": ("bytes", False),
+}
+
+def _best_time(function, repeat):
+    '''
+    Returns the lowest wall time of repeat calls of the function, with the garbage
+    collector turned off during every call
+    '''
+    best = None
+    for k in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            function()
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        if (best == None) or (elapsed < best):
+            best = elapsed
+    return best
+
+def benchmark_circuit(circuit_bench_file, num_vectors = 1024, num_scalar_vectors = 64, num_fault_vectors = 64,
+                      repeat = 3, seed = 0):
+    '''
+    Measures the engines on one bench file and returns a dictionary with the value of
+    every metric. Times are the best of repeat runs, the peak memory is measured in a
+    separate run of parse, levelization, fault list construction and one block of fault
+    simulation with tracemalloc, so the tracing does not slow down the timed runs
+
+    param[in] circuit_bench_file: Bench file of the circuit
+    param[in] num_vectors: Number of random vectors of the bit-parallel simulation
+    param[in] num_scalar_vectors: Number of random vectors of the scalar simulation
+    param[in] num_fault_vectors: Number of random vectors fault simulated against all the faults
+    param[in] repeat: Number of timed runs of every metric
+    param[in] seed: Seed of the random vectors
+    '''
+    results = {}
+    results["parse_time"] = _best_time(lambda: circuit(circuit_bench_file), repeat)
+
+    circuits = [circuit(circuit_bench_file) for k in range(repeat)]
+    results["levelize_time"] = _best_time(lambda: circuits.pop().levelize_circuit(), repeat)
+
+    circuit_under_test = circuit(circuit_bench_file)
+    circuit_under_test.levelize_circuit()
+    input_names = [n.name for n in circuit_under_test.input_list]
+    rng = random.Random(seed)
+
+    iv_list = [[rng.randint(0, 1) for n in input_names] for i in range(num_scalar_vectors)]
+    input_vectors = [dict(zip(input_names, input_vector)) for input_vector in iv_list]
+    def scalar_simulation():
+        for input_vector in input_vectors:
+            circuit_under_test.simulate(input_vector)
+    results["scalar_simulation_rate"] = num_scalar_vectors / _best_time(scalar_simulation, repeat)
+
+    input_words = dict((name, rng.getrandbits(num_vectors)) for name in input_names)
+    circuit_under_test.simulate_parallel(input_words, num_vectors) #create the schedule before timing
+    results["parallel_simulation_rate"] = num_vectors / _best_time(
+        lambda: circuit_under_test.simulate_parallel(input_words, num_vectors), repeat)
+
+    circuits = [circuit(circuit_bench_file) for k in range(repeat)]
+    for c in circuits:
+        c.levelize_circuit()
+    results["fault_list_time"] = _best_time(lambda: circuits.pop().create_fault_list(), repeat)
+
+    simulator = fault_simulator(circuit_under_test)
+    results["num_faults"] = len(simulator.fault_strings)
+    iv_list = [[rng.randint(0, 1) for n in input_names] for i in range(num_fault_vectors)]
+    results["fault_simulation_rate"] = (len(simulator.fault_strings) * num_fault_vectors) / _best_time(
+        lambda: [simulator.simulate(iv_list[k:k + 64]) for k in range(0, num_fault_vectors, 64)], repeat)
+
+    tracemalloc.start()
+    try:
+        c = circuit(circuit_bench_file)
+        c.levelize_circuit()
+        fault_simulator(c).simulate(iv_list[:64])
+        results["peak_memory"] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return results
+
+def run_benchmarks(bench_files, print_progress = True, **options):
+    '''
+    Benchmarks every bench file and returns the results, a dictionary with the settings
+    and the platform under "settings" and the metrics of every circuit, keys are the bench
+    names, under "circuits". The options are passed on to benchmark_circuit
+    '''
+    results = {"settings": {"python": platform.python_version(), "implementation": platform.python_implementation(),
+                            "machine": platform.machine(), "date": time.strftime("%Y-%m-%dT%H:%M:%S")},
+               "circuits": {}}
+    results["settings"].update(options)
+    for circuit_bench_file in bench_files:
+        bench = os.path.splitext(os.path.basename(circuit_bench_file))[0]
+        if print_progress:
+            print(f"Benchmarking {bench}", flush = True)
+        results["circuits"][bench] = benchmark_circuit(circuit_bench_file, **options)
+    return results
+
+def save_results(results, file_name):
+    '''
+    Writes the results of run_benchmarks to a JSON file
+    '''
+    with open(file_name, "w") as f:
+        json.dump(results, f, indent = 2)
+
+def load_results(file_name):
+    '''
+    Reads the results of run_benchmarks from a JSON file
+    '''
+    with open(file_name) as f:
+        return json.load(f)
+
+def compare_results(baseline, current, threshold = 0.1):
+    '''
+    Compares the metrics of the circuits present in both results. Returns a list of
+    (circuit, metric, baseline value, current value, relative change, regression) for
+    every metric, the relative change is positive when the metric got better. A metric
+    is a regression when it got worse by more than threshold, 0.1 is 10 %
+    '''
+    comparison = []
+    for bench in current["circuits"]:
+        if bench not in baseline["circuits"]:
+            continue
+        for metric in metrics:
+            old = baseline["circuits"][bench].get(metric)
+            new = current["circuits"][bench].get(metric)
+            if (old == None) or (new == None) or (old == 0):
+                continue
+            higher_is_better = metrics[metric][1]
+            change = (new - old) / old if higher_is_better else (old - new) / old
+            comparison.append((bench, metric, old, new, change, change < -threshold))
+    return comparison
+
+def print_results(results):
+    '''
+    Prints the metrics of every circuit as a table
+    '''
+    print("| Circuit | Faults | parse(ms) | levelize(ms) | scalar(vec/s) | parallel(vec/s) | fault list(ms) | fault sim(fault x vec/s) | peak memory(MB) |")
+    for bench, r in results["circuits"].items():
+        print("| {:<7} | {:>6} | {:>9.2f} | {:>12.2f} | {:>13.0f} | {:>15.0f} | {:>14.2f} | {:>24.0f} | {:>15.2f} |".format(
+            bench, r["num_faults"], r["parse_time"] * 1000, r["levelize_time"] * 1000, r["scalar_simulation_rate"],
+            r["parallel_simulation_rate"], r["fault_list_time"] * 1000, r["fault_simulation_rate"],
+            r["peak_memory"] / 2 ** 20))
+
+def print_comparison(comparison):
+    '''
+    Prints the output of compare_results, regressions are marked with REGRESSION
+    '''
+    print("| Circuit | Metric                   |     Baseline |      Current |  Change |")
+    for bench, metric, old, new, change, regression in comparison:
+        print("| {:<7} | {:<24} | {:>12.4g} | {:>12.4g} | {:>+6.1f}% |{}".format(
+            bench, metric, old, new, change * 100, " REGRESSION" if regression else ""))
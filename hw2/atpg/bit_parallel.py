@@ -0,0 +1,82 @@
+from .errors import *
+from .circuit_types import *
+
+#bit-parallel (parallel pattern) evaluation of gates. Every node is represented by
+#a packed word (python int), bit i of the word is the value of the node for the
+#i-th input vector of the block. The mask has a 1 for every vector in the block and
+#is used to invert the words
+def and_word(input_words, mask):
+    output = input_words[0]
+    for i in range(1, len(input_words)):
+        output &= input_words[i]
+    return output
+
+def or_word(input_words, mask):
+    output = input_words[0]
+    for i in range(1, len(input_words)):
+        output |= input_words[i]
+    return output
+
+def not_word(input_words, mask):
+    return input_words[0] ^ mask
+
+def buff_word(input_words, mask):
+    return input_words[0]
+
+def nand_word(input_words, mask):
+    return and_word(input_words, mask) ^ mask
+
+def nor_word(input_words, mask):
+    return or_word(input_words, mask) ^ mask
+
+def xor_word(input_words, mask):
+    output = input_words[0]
+    for i in range(1, len(input_words)):
+        output ^= input_words[i]
+    return output
+
+def xnor_word(input_words, mask):
+    return xor_word(input_words, mask) ^ mask
+
+word_gate_function = {gate_type.AND_gate : and_word,
+                      gate_type.OR_gate  : or_word,
+                      gate_type.NOT_gate : not_word,
+                      gate_type.BUFF_gate: buff_word,
+                      gate_type.NAND_gate: nand_word,
+                      gate_type.NOR_gate : nor_word,
+                      gate_type.XOR_gate : xor_word,
+                      gate_type.XNOR_gate: xnor_word}
+
+def evaluate_gate_word(g_type, input_words, mask):
+    '''
+    Evaluates a gate of type g_type over the packed input words
+
+    param[in] g_type: Type of the gate(gate_type)
+    param[in] input_words: Packed words of the nodes fed in
+    param[in] mask: Word with a 1 for every vector in the block
+    '''
+    return word_gate_function[g_type](input_words, mask)
+
+def pack_input_vectors(iv_list, num_inputs):
+    '''
+    Packs a list of input vectors into one word per input. Bit i of the j-th word
+    is the value of the j-th input in the i-th input vector. Only 0 and 1 can be
+    packed.
+    '''
+    input_words = [0] * num_inputs
+    for i in range(len(iv_list)):
+        iv = iv_list[i]
+        for j in range(num_inputs):
+            if iv[j] == node_value.one:
+                input_words[j] |= 1 << i
+            elif iv[j] != node_value.zero:
+                raise ValueNotBinary(iv[j])
+    return input_words
+
+def unpack_word(word, pattern):
+    '''
+    Returns the node value of the given pattern from a packed word
+    '''
+    if (word >> pattern) & 1:
+        return node_value.one
+    return node_value.zero
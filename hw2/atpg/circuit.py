@@ -1,7 +1,48 @@
 import re
+import time
 from .errors import *
 from .circuit_types import *
+from .bit_parallel import *
+from .three_valued import *
+from .bench_parser import *
+from .levelization import *
+from .profiling import *
+from .structure import *
 
+#class to represent a fault
+class fault:
+    '''
+    This class represents a fault.
+
+    Attributes:
+    fault_type: Type of fault, either stuck at 0 or stuck at 1
+    fault_node: Node to which the fault is associated with
+    fault_output: Output linked with the node where the fault is associated
+    '''
+
+    def __init__(self, fault_type, fault_node, fault_output = None):
+        self.fault_type = fault_type
+        self.fault_node = fault_node
+        self.fault_output = fault_output
+        self.fault_string = None
+        if self.fault_output == None:
+            if self.fault_type == fault_types.sa0:
+                self.fault_string = f"{self.fault_node}-0"
+            else:
+                self.fault_string = f"{self.fault_node}-1"
+        else:
+            if self.fault_type == fault_types.sa0:
+                self.fault_string = f"{self.fault_output}-{self.fault_node}-0"
+            else:
+                self.fault_string = f"{self.fault_output}-{self.fault_node}-1"
+
+    def __repr__(self):
+        '''
+        Returns the string representation of a fault
+        '''
+        return self.fault_string
+
+#class to represent a gate
 class gate:
     '''
     This class is used to represent a gate
@@ -13,33 +54,42 @@ class gate:
     Output node: Output node of the gate
     '''
 
-    def __init__(self, string_representation):
+    def __init__(self, string_representation = None):
         '''
         This function creates a gate
 
         param[in] string_representation String representation of the gate
                                         The string after = in the circuit bench file
+                                        If not given, the gate is set with set_type
         '''
         self.input_nodes = []
         self.output_node = None
         self.type = None
         self.num_inputs = 0
         self.gate_string = ""
+        self.gate_function = None
+
+        if string_representation != None:
+            self.__update_gate_type(string_representation)
 
-        self.__update_gate_type(string_representation)
+    def set_type(self, g_type, input_nodes):
+        '''
+        Sets the gate type and the nodes fed in, used when the circuit bench file is
+        already parsed
+
+        param[in] g_type: Type of the gate(gate_type)
+        param[in] input_nodes: Nodes that are fed in
+        '''
+        self.type = g_type
+        self.gate_string = gate_string[g_type]
+        self.gate_function = gate_dict[self.gate_string][1]
+        self.input_nodes = input_nodes
+        self.num_inputs = len(input_nodes)
 
     def __update_gate_type(self, string_representation: str):
         '''
         This function updates the gate type
         '''
-        gate_dict = {"AND" : gate_type.AND_gate,
-                     "OR"  : gate_type.OR_gate,
-                     "NOT" : gate_type.NOT_gate,
-                     "NOR" : gate_type.NOR_gate,
-                     "NAND": gate_type.NAND_gate,
-                     "XOR" : gate_type.XOR_gate,
-                     "XNOR": gate_type.XNOR_gate}
-
         self.gate_string = re.match(r'^[^()]+', string_representation)
 
         if self.gate_string:
@@ -51,13 +101,18 @@ class gate:
         if self.gate_string not in gate_dict:
             raise GateNotDefined(self.gate_string)
         else:
-            self.type = gate_dict[self.gate_string]
+            self.type = gate_dict[self.gate_string][0]
+            self.gate_function = gate_dict[self.gate_string][1]
             self.input_nodes = re.findall(r'\((.*?)\)', string_representation)[0]
             self.input_nodes = self.input_nodes.split(",")
             for i in range(len(self.input_nodes)):
                 self.input_nodes[i] = self.input_nodes[i].lstrip()
             self.num_inputs = len(self.input_nodes)
 
+
+    def get_output(self):
+        self.output_node.value = self.gate_function(self.input_nodes, self.output_node)
+
     def __repr__(self):
         '''
         Return a string representing the gate information
@@ -68,8 +123,114 @@ class gate:
         str_repr = str_repr[:-1] + " | "
         str_repr = f"{str_repr}Output node: {self.output_node}"
         return str_repr
-    
-#class to reprsent each node in a circuit
+
+class Controllability:
+    '''
+    This class is used to do the scoap analysis and get the c0 and c1 of each node
+
+    Attributes
+    c0: Controllability of 0
+    c1: Controllability of 1
+    '''
+    def __init__(self, n, node_gate: gate):
+        self.c0 = None
+        self.c1 = None
+        if n.type == node_type.input_node:
+            self.c0 = 1
+            self.c1 = 1
+        else:
+            self.__get_controllability(node_gate)
+
+    def __get_controllability(self, node_gate: gate):
+        if node_gate.output_node.type == node_type.input_node:
+            self.c0 = 1
+            self.c1 = 1
+            return
+        else:
+            for n in node_gate.input_nodes:
+                if n.controllability.c0 == None or n.controllability.c1 == None:
+                    raise ParentNodeControllabilityNA(n.name)
+                
+            if node_gate.type == gate_type.BUFF_gate:
+                self.__buff_controllability(node_gate)
+            elif node_gate.type == gate_type.NOT_gate:
+                self.__not_controllability(node_gate)
+            elif node_gate.type == gate_type.AND_gate:
+                self.__and_controllability(node_gate)
+            elif node_gate.type == gate_type.OR_gate:
+                self.__or_controllability(node_gate)
+            elif node_gate.type == gate_type.NAND_gate:
+                self.__nand_controllability(node_gate)
+            elif node_gate.type == gate_type.NOR_gate:
+                self.__nor_controllability(node_gate)
+            elif node_gate.type == gate_type.XOR_gate:
+                self.__xor_controllability(node_gate)
+            elif node_gate.type == gate_type.XNOR_gate:
+                self.__xnor_controllability(node_gate)
+
+    def __buff_controllability(self, node_gate: gate):
+        self.c0 = node_gate.input_nodes[0].controllability.c0 + 1
+        self.c1 = node_gate.input_nodes[0].controllability.c1 + 1
+
+    def __not_controllability(self, node_gate: gate):
+        self.c0 = node_gate.input_nodes[0].controllability.c1 + 1
+        self.c1 = node_gate.input_nodes[0].controllability.c0 + 1
+
+    def __and_controllability(self, node_gate: gate):
+        input_c0_list = [n.controllability.c0 for n in node_gate.input_nodes]
+        input_c1_list = [n.controllability.c1 for n in node_gate.input_nodes]
+
+        self.c0 = min(input_c0_list) + 1
+        self.c1 = sum(input_c1_list) + 1
+
+    def __or_controllability(self, node_gate: gate):
+        input_c0_list = [n.controllability.c0 for n in node_gate.input_nodes]
+        input_c1_list = [n.controllability.c1 for n in node_gate.input_nodes]
+
+        self.c0 = sum(input_c0_list) + 1
+        self.c1 = min(input_c1_list) + 1
+
+    def __nand_controllability(self, node_gate: gate):
+        input_c0_list = [n.controllability.c0 for n in node_gate.input_nodes]
+        input_c1_list = [n.controllability.c1 for n in node_gate.input_nodes]
+
+        self.c1 = min(input_c0_list) + 1
+        self.c0 = sum(input_c1_list) + 1
+
+    def __nor_controllability(self, node_gate: gate):
+        input_c0_list = [n.controllability.c0 for n in node_gate.input_nodes]
+        input_c1_list = [n.controllability.c1 for n in node_gate.input_nodes]
+
+        self.c0 = min(input_c1_list) + 1
+        self.c1 = sum(input_c0_list) + 1
+
+    def __xor_controllability(self, node_gate: gate):
+        c0_sum = node_gate.input_nodes[0].controllability.c0 + \
+                    node_gate.input_nodes[1].controllability.c0
+        c1_sum = node_gate.input_nodes[0].controllability.c1 + \
+                    node_gate.input_nodes[1].controllability.c1
+        c0_c1_sum = node_gate.input_nodes[0].controllability.c0 + \
+                    node_gate.input_nodes[1].controllability.c1
+        c1_c0_sum = node_gate.input_nodes[0].controllability.c1 + \
+                    node_gate.input_nodes[1].controllability.c0
+
+        self.c0 = min([c0_sum, c1_sum]) + 1
+        self.c1 = min([c0_c1_sum, c1_c0_sum]) + 1
+
+    def __xnor_controllability(self, node_gate: gate):
+        c0_sum = node_gate.input_nodes[0].controllability.c0 + \
+                    node_gate.input_nodes[1].controllability.c0
+        c1_sum = node_gate.input_nodes[0].controllability.c1 + \
+                    node_gate.input_nodes[1].controllability.c1
+        c0_c1_sum = node_gate.input_nodes[0].controllability.c0 + \
+                    node_gate.input_nodes[1].controllability.c1
+        c1_c0_sum = node_gate.input_nodes[0].controllability.c1 + \
+                    node_gate.input_nodes[1].controllability.c0
+
+        self.c1 = min([c0_sum, c1_sum]) + 1
+        self.c0 = min([c0_c1_sum, c1_c0_sum]) + 1
+
+#class to represent a node
 class node:
     '''
     This class represents a node in the circuit
@@ -80,19 +241,31 @@ class node:
     value: Value of the node(node_value)
     gate_type: Type of gate(String)
     nodes_fed_in: List of nodes fed in(node)
+    fault_list: List of faults associated with this node
     '''
 
-    def __init__(self, circuit_bench_line: str):
+    def __init__(self, circuit_bench_line: str = None):
         '''
         Initialize the object. 
 
         param[in] circuit_bench_line: A line in the circuit bench file
+                                      If not given, the attributes are set by the circuit
         '''
         self.name = None
         self.type = None
-        self.value = node_value.undefined
+        self._value = node_value.undefined
         self.gate = None
         self.level = None
+        self.fault_list = {fault_types.sa0: [], fault_types.sa1: []}
+        self.selected_fault = None
+        self.controllability = None
+        self.zero_count = 0
+        self.one_count = 0
+        self.input_is_output = False #set when a primary input is also declared as a primary output
+        self.fanout_nodes = [] #nodes whose gates are fed by this node
+
+        if circuit_bench_line == None:
+            return
 
         #check if it is an input node
         if ("INPUT" in circuit_bench_line.upper()):
@@ -110,6 +283,66 @@ class node:
             self.name = self.name.rstrip() #remove any trailing white spaces
             self.__update_gate(circuit_bench_line)
 
+    @property
+    def value(self):
+        return self._value
+    
+    @value.setter
+    def value(self, new_value):
+        if (self.selected_fault == None) or \
+            (isinstance(self.selected_fault, fault) and \
+            (self.selected_fault.fault_output != None)):
+            self._value = new_value
+        else:
+            if new_value in [node_value.d, node_value.d_bar]:
+                #faulty value before fault site is not possible
+                #hence raise an error
+                raise FaultBeforeFaultsite(self.selected_fault, node_value.str_repr[new_value])
+            else:
+                if self.selected_fault.fault_type == fault_types.sa0:
+                    if new_value == node_value.one:
+                        new_value = node_value.d
+                else:
+                    if new_value == node_value.zero:
+                        new_value = node_value.d_bar
+                self._value = new_value
+        
+        if self._value == node_value.zero:
+            self.zero_count += 1
+        if self.value == node_value.one:
+            self.one_count += 1
+
+    def get_value(self, output_node):
+        '''
+        This function is used to get the value of the node based on the
+        node fed out
+
+        output_node: node fed out
+        '''
+        return_value = self._value
+        if (self.selected_fault != None) and \
+           (isinstance(self.selected_fault, fault) and \
+            (((isinstance(self.selected_fault.fault_output, str)) and \
+              (self.selected_fault.fault_output == "out")) or \
+             ((isinstance(self.selected_fault.fault_output, node)) and \
+              (self.selected_fault.fault_output.name == output_node.name)) or \
+             ((self.selected_fault.fault_output == output_node)))):
+            if self._value in [node_value.d, node_value.d_bar]:
+                #faulty value before fault site is not possible
+                #hence raise an error
+                raise FaultBeforeFaultsite(self.selected_fault, node_value.str_repr[self._value])
+            if self.selected_fault.fault_type == fault_types.sa0:
+                #sa0 fault, return d if the node value is one
+                if self._value == node_value.one:
+                    return_value = node_value.d
+            else:
+                #sa1 fault, return d' if the node value is zero
+                if self._value == node_value.zero:
+                    return_value = node_value.d_bar
+
+        return return_value
+
+    
     def __update_gate(self, circuit_bench_line):
         '''
         Updates the gate information of a node
@@ -119,36 +352,106 @@ class node:
         self.gate = gate(gate_string_representation)
         self.gate.output_node = self
 
-    def update(self, circuit_bench_file):
+    def update(self, circuit_bench_line):
         '''
         This function updates the nodes properties based on the new circuit bench file
         '''
-        if "OUTPUT" in circuit_bench_file.upper():
-            #node is an output node
-            self.type = node_type.output_node
+        if "OUTPUT" in circuit_bench_line.upper():
+            if self.type == node_type.input_node:
+                #primary input directly observed at a primary output
+                self.input_is_output = True
+            else:
+                #node is an output node
+                self.type = node_type.output_node
+        elif "INPUT" in circuit_bench_line.upper():
+            #output declared before the input declaration
+            self.input_is_output = (self.type == node_type.output_node)
+            self.type = node_type.input_node
+            self.level = 0
         else:
             #an assignment done to the node, update the gate type
-            self.__update_gate(circuit_bench_file)
+            self.__update_gate(circuit_bench_line)
+
+    def get_controllability(self):
+        self.controllability = Controllability(self, self.gate)
+
+    def update_from_word(self, word, num_patterns):
+        '''
+        Updates the node from a packed word of a bit-parallel simulation. The value
+        of the last input vector is kept as the node value and the zero and one
+        counts are updated for all the input vectors in the word
+
+        word: Packed word of the node
+        num_patterns: Number of input vectors packed in the word
+        '''
+        num_ones = word.bit_count()
+        self.one_count += num_ones
+        self.zero_count += num_patterns - num_ones
+        self._value = unpack_word(word, num_patterns - 1)
+
+    def update_from_rails(self, zero_word, one_word, num_patterns):
+        '''
+        Updates the node from the rails of a three-valued bit-parallel simulation. The
+        value of the last input vector is kept as the node value and the zero and one
+        counts are updated for the input vectors where the node is 0 or 1
+
+        zero_word: Zero rail of the node
+        one_word: One rail of the node
+        num_patterns: Number of input vectors packed in the rails
+        '''
+        self.zero_count += (zero_word & ~one_word).bit_count()
+        self.one_count += (one_word & ~zero_word).bit_count()
+        self._value = unpack_rails(zero_word, one_word, num_patterns - 1)
 
-    def find_level(self):
-        if self.level != None:
-            #level already found
+    def create_fault_list(self, output_node = None):
+        if output_node == None:
+            if len(self.fault_list[fault_types.sa0]) == 0:
+                self.fault_list[fault_types.sa0].append(fault(fault_types.sa0, self)) #creates a-0 fault
+                if self.type == node_type.output_node:
+                    self.fault_list[fault_types.sa0].append(fault(fault_types.sa0, self, "out"))
+            if len(self.fault_list[fault_types.sa1]) == 0:
+                self.fault_list[fault_types.sa1].append(fault(fault_types.sa1, self)) #creates a-1 fault
+                if self.type == node_type.output_node:
+                    self.fault_list[fault_types.sa1].append(fault(fault_types.sa1, self, "out"))
+        else:
+            self.fault_list[fault_types.sa0].append(fault(fault_types.sa0, self, output_node))
+            self.fault_list[fault_types.sa1].append(fault(fault_types.sa1, self, output_node))
             return
         
-        prev_level = 0
+        if self.gate != None:
+            for input_node in self.gate.input_nodes:
+                input_node.create_fault_list(self) #creates g-a-0 and g-a-1
 
-        for input_node in self.gate.input_nodes:
-            if input_node.level == None:
-                input_node.find_level()
-
-            if input_node.level > prev_level:
-                prev_level = input_node.level   
+    
+    def select_fault(self, fault, output = None):
+        '''
+        Selects the fault based on the inputs given
 
-        self.level = prev_level + 1
+        fault: Type of fault to select - sa0 or sa1
+        Output: Output node associated with the fault
+        '''
 
+        if (isinstance(output, node) or (output == None)):
+            for f in self.fault_list[fault]:
+                if (isinstance(f.fault_output, node)):
+                    if f.fault_output.name == output.name:
+                        self.selected_fault = f
+                        break
+                elif ((f.fault_output == None)):
+                    if f.fault_output == output:
+                        self.selected_fault = f
+                        break
+        else:
+            for f in self.fault_list[fault]:
+                if (isinstance(f.fault_output, str)):
+                    if f.fault_output == output:
+                        self.selected_fault = f
+                        break
+        
     def __repr__(self):
         return self.name
 
+#class to represent a circuit
 class circuit:
     '''
     This class represents a circuit described in the circuit bench file
@@ -157,75 +460,81 @@ class circuit:
     nodes: List of all the nodes(nodes)
     input_list: Index of input nodes in nodes list(int)
     output_list: Index of output nodes in nodes list(int)    
+    schedule: All the nodes in the ascending order of levels, set by levelize_circuit
+    level_offsets: Nodes of level l are schedule[level_offsets[l]:level_offsets[l + 1]]
+    profile: Profile filled by simulate and simulate_event_driven, None when profiling is disabled
     '''
     
-    def __init__(self, circuit_bench_file):
+    def __init__(self, circuit_bench_file, use_cache = False, cache_dir = None):
         '''
         Initializes the class
 
         param[in] circuit_bench_file: Path to the circuit bench file
+        param[in] use_cache: Keep the parsed circuit bench file in a binary cache file
+        param[in] cache_dir: Directory of the cache, a directory of the current user
+                             is used if not given (see private_cache_dir)
         '''
+        self.circuit_bench_file = circuit_bench_file
         self.nodes = []
         self.input_list = []
         self.output_list = []
+        self.internal_nodes = []
         self.node_index = {} #index of each node in the nodes list, key values for this dictionary are the node names
         self.levelized_nodes = None
-        
-        lines = self.__parse_circuit_bench_file(circuit_bench_file)
-        #create nodes
-        self.__create_nodes(lines)
+        self.schedule = None #nodes in the ascending order of levels
+        self.level_offsets = None #nodes of level l are schedule[level_offsets[l]:level_offsets[l + 1]]
+        self.__typed_schedule = None
+        self.__structural_index = None
+        self.__fault_list_created = False
+        self.num_levels = -1
+        self.__parallel_schedule = None
+        self.__rails_schedule = None
+        self.__event_state_valid = False #node values are consistent with the last simulated input vector
+        self.num_evaluations = 0 #gates evaluated for the last input vector
+        self.profile = None
+
+        #parse the circuit bench file and create nodes
+        self.__create_nodes(load_bench_file(circuit_bench_file, use_cache, cache_dir))
         #check if all outputs are defined
         self.__check_output_definition()
 
-    def __parse_circuit_bench_file(self, circuit_bench_file):
+    def __create_nodes(self, netlist: parsed_netlist):
         '''
-        This function parses the circuit bench file and sends out a list
+        This function creates the nodes of the parsed circuit bench file, in the order they
+        are declared
         '''
-        lines = []
+        for i in range(len(netlist.names)):
+            n = node()
+            n.name = netlist.names[i]
+            n.type = netlist.node_types[i]
+            n.input_is_output = bool(netlist.input_is_output[i])
+            if n.type == node_type.input_node:
+                n.level = 0
+            self.nodes.append(n)
+            self.node_index[n.name] = i
 
-        with open(circuit_bench_file, "r") as f:
-            for line in f:
-                line = line.replace("\n", "")
-                if len(line) == 0:
-                    continue
-                lines.append(line)
+        #all the nodes are created, now create the gates with the node objects fed in
+        for i in range(len(netlist.names)):
+            n = self.nodes[i]
+            if netlist.gate_types[i] != no_gate:
+                nodes_fed_in = [self.nodes[j] for j in netlist.fanin(i)]
+                for input_node in nodes_fed_in:
+                    if n not in input_node.fanout_nodes:
+                        input_node.fanout_nodes.append(n)
+                n.gate = gate()
+                n.gate.set_type(netlist.gate_types[i], nodes_fed_in)
+                n.gate.output_node = n
 
-        return lines
-    
-    def __create_nodes(self, lines):
-        '''
-        This function creates nodes from the lines read from the circuit bench file
-        '''
-        for line in lines:
-            #check if node is already created - Possible when output is declared after using a wire
-            node_name = re.findall(r'\((.*?)\)', line)[0]
-
-            if "=" in line:
-                node_name = line.split("=")[0]
-                node_name = node_name.rstrip()
-
-            if node_name in self.node_index:
-                #update the node properties
-                self.nodes[self.node_index[node_name]].update(line)
+            #add nodes to the intern_node list
+            if n.type == node_type.input_node:
+                self.input_list.append(n)
+                if n.input_is_output:
+                    self.output_list.append(n)
+            elif n.type == node_type.output_node:
+                self.output_list.append(n)
             else:
-                #new node in the circuit
-                #create a node and add it to the node list
-                self.nodes.append(node(line))
-                if self.nodes[-1].type == node_type.input_node:
-                    self.input_list.append(self.nodes[-1].name)
-                elif self.nodes[-1].type == node_type.output_node:
-                    self.output_list.append(self.nodes[-1].name)
-                self.node_index[self.nodes[-1].name] = len(self.nodes) - 1
-
-        #all the nodes are defined, now update the input nodes in the gates list to nodes
-        for n in self.nodes:
-            if n.gate != None:
-                nodes_fed_in = n.gate.input_nodes
-                for i in range(len(nodes_fed_in)):
-                    nodes_fed_in[i] = self.nodes[self.node_index[nodes_fed_in[i]]]
-                n.gate.input_nodes = nodes_fed_in
+                self.internal_nodes.append(n)
 
-    
     def __check_output_definition(self):
         '''
         This function checks if all outputs are defined
@@ -247,29 +556,502 @@ class circuit:
         for node in self.nodes:
             if node.type != node_type.input_node:
                 str_repr = f"{str_repr}{node.gate}\n"
-
-        str_repr = f"{str_repr}-------------Levelized circuit-------------\n"
-        for level in self.levelized_nodes:
-            str_repr = f"{str_repr}Level {level}: {self.levelized_nodes[level]}\n"
+        
+        if self.levelized_nodes != None:
+            str_repr = f"{str_repr}-------------Levelized circuit-------------\n"
+            for level in self.levelized_nodes:
+                str_repr = f"{str_repr}Level {level}: {self.levelized_nodes[level]}\n"
 
         return str_repr
     
     def levelize_circuit(self):
         '''
-        This function levelizes the circuit and updates levelized_nodes
+        This function levelizes the circuit and updates levelized_nodes, schedule and
+        level_offsets. Raises CombinationalCycle if the circuit has a combinational cycle
         '''
         if self.levelized_nodes != None:
             #circuit already levelized
             return
-        
+
+        fanin_offsets = [0]
+        fanin_index = []
+        for n in self.nodes:
+            if n.gate != None:
+                fanin_index.extend(self.node_index[input_node.name] for input_node in n.gate.input_nodes)
+            fanin_offsets.append(len(fanin_index))
+
+        levels, order, self.level_offsets = levelize([n.name for n in self.nodes], fanin_offsets, fanin_index)
+        for i in range(len(self.nodes)):
+            self.nodes[i].level = levels[i]
+
+        self.schedule = [self.nodes[i] for i in order]
+        self.num_levels = len(self.level_offsets) - 1
         self.levelized_nodes = {}
+        for level in range(self.num_levels):
+            self.levelized_nodes[level] = self.schedule[self.level_offsets[level]:self.level_offsets[level + 1]]
+
+    def create_typed_schedule(self):
+        '''
+        This function returns the gates grouped by gate type within each level, a list of
+        (level, gate type, nodes) in the ascending order of levels
+        '''
+        if self.levelized_nodes == None:
+            raise CirNotLevelized()
+
+        if self.__typed_schedule == None:
+            self.__typed_schedule = []
+            for level in range(1, self.num_levels):
+                groups = {}
+                for n in self.levelized_nodes[level]:
+                    groups.setdefault(n.gate.type, []).append(n)
+                for g_type in sorted(groups):
+                    self.__typed_schedule.append((level, g_type, groups[g_type]))
+
+        return self.__typed_schedule
+
+    def create_structural_index(self):
+        '''
+        This function returns the structural index of the circuit(structural_index): fanout
+        lists, fanin and fanout cones, reachable outputs and fanout-free regions
+        '''
+        if self.levelized_nodes == None:
+            raise CirNotLevelized()
+
+        if self.__structural_index == None:
+            self.__structural_index = structural_index(self)
+
+        return self.__structural_index
+
+    def create_fault_list(self):
+        '''
+        This function creates the fault list for all the nodes in the circuit
+        '''
+        if self.__fault_list_created == True:
+            return
         
-        for node in self.nodes:
-            if node.level == None:
-                node.find_level()
+        if self.levelized_nodes == None:
+            raise CirNotLevelized()
+        for level in self.levelized_nodes:
+            for n in self.levelized_nodes[level]:
+                n.create_fault_list()
 
-            if node.level in self.levelized_nodes:
-                self.levelized_nodes[node.level].append(node.name)
-            else:
-                self.levelized_nodes[node.level] = [node.name]
-            
\ No newline at end of file
+        self.__fault_list_created = True
+
+    def get_controllability(self):
+        '''
+        This function gets the controllability of each node in the circuit
+        '''
+        if self.levelized_nodes == None:
+            raise CirNotLevelized()
+        
+        for level in self.levelized_nodes:
+            for n in self.levelized_nodes[level]:
+                n.get_controllability()
+        
+    def print_fault_list(self):
+        '''
+        This function prints the full fault list
+        '''
+        if not(self.__fault_list_created):
+            print("Fault list not created")
+            return
+        
+        total_faults = 0
+        for level in self.levelized_nodes:
+            for n in self.levelized_nodes[level]:
+                print(f"Node: {n.name}, Faults: {n.fault_list}")
+                total_faults += len(n.fault_list[0]) * 2
+
+        print("Total number of faults: ", total_faults)
+
+    def print_controllability(self):
+        '''
+        This function prints the controllability of each node in the circuit
+        '''
+        if self.levelized_nodes == None:
+            raise CirNotLevelized()
+        
+        print("-------------Controllability of each node in the circuit-------------")
+        for level in self.levelized_nodes:
+            print(f"-------------Level {level}-------------")
+            for n in self.levelized_nodes[level]:
+                print(f"{n.name}: ({n.controllability.c0}, {n.controllability.c1})")
+
+    def simulate(self, input_vector):
+        '''
+        This function simulates the circuit for the given input vector.
+        The input vector should be a dictionary with the node names as the
+        keys and values should be the node values
+        '''
+
+        for node_name in input_vector:
+            self.nodes[self.node_index[node_name]].value = input_vector[node_name]
+        
+        for n in self.levelized_nodes[0]:
+            if n.value == node_value.undefined:
+                raise InputUndefined(n)
+        
+        if self.profile == None:
+            for n in self.schedule[self.level_offsets[1]:]:
+                n.gate.get_output()
+        else:
+            self.__simulate_profiled()
+
+        self.num_evaluations = len(self.nodes) - self.level_offsets[1]
+        self.__event_state_valid = True
+
+    def simulate_event_driven(self, input_vector):
+        '''
+        This function simulates the circuit for the given input vector, re-evaluating
+        only the gates fed by a node whose value changed since the previous input
+        vector. The input vector has the same format as in simulate, inputs not in
+        the input vector keep their previous value. The first input vector after a
+        reset or a fault selection is fully simulated.
+
+        The zero and one counts are only updated for the nodes that are re-evaluated.
+        Returns the number of gates evaluated, which is also kept in num_evaluations
+        '''
+        if self.levelized_nodes == None:
+            raise CirNotLevelized()
+
+        if not self.__event_state_valid:
+            self.simulate(input_vector)
+            return self.num_evaluations
+
+        events = [[] for level in range(self.num_levels)]
+        scheduled = set()
+        for node_name in input_vector:
+            n = self.nodes[self.node_index[node_name]]
+            previous_value = n.value
+            n.value = input_vector[node_name]
+            if n.value == node_value.undefined:
+                self.__event_state_valid = False
+                raise InputUndefined(n)
+            if n.value != previous_value:
+                for fanout_node in n.fanout_nodes:
+                    if fanout_node not in scheduled:
+                        scheduled.add(fanout_node)
+                        events[fanout_node.level].append(fanout_node)
+
+        if self.profile != None:
+            self.num_evaluations = self.__propagate_events_profiled(events, scheduled)
+            return self.num_evaluations
+
+        num_evaluations = 0
+        for level in range(1, self.num_levels):
+            for n in events[level]:
+                previous_value = n.value
+                n.gate.get_output()
+                num_evaluations += 1
+                if n.value != previous_value:
+                    for fanout_node in n.fanout_nodes:
+                        if fanout_node not in scheduled:
+                            scheduled.add(fanout_node)
+                            events[fanout_node.level].append(fanout_node)
+
+        self.num_evaluations = num_evaluations
+        return num_evaluations
+
+    def __propagate_events_profiled(self, events, scheduled):
+        '''
+        Evaluates the scheduled gates like simulate_event_driven and adds every evaluation
+        to the profile. Returns the number of gates evaluated
+        '''
+        profile = self.profile
+        profile.counters["vectors"] += 1
+        num_evaluations = 0
+        for level in range(1, self.num_levels):
+            for n in events[level]:
+                previous_value = n.value
+                start = time.perf_counter()
+                n.gate.get_output()
+                profile.add(level, n.gate.type, 1, int(n.value != previous_value), time.perf_counter() - start)
+                num_evaluations += 1
+                if n.value != previous_value:
+                    for fanout_node in n.fanout_nodes:
+                        if fanout_node not in scheduled:
+                            scheduled.add(fanout_node)
+                            events[fanout_node.level].append(fanout_node)
+
+        return num_evaluations
+
+    def __simulate_profiled(self):
+        '''
+        Evaluates all the gates like simulate, one group of gates of the same type and
+        level at a time, and adds the evaluations, toggles and time of every group to
+        the profile
+        '''
+        profile = self.profile
+        profile.counters["vectors"] += 1
+        for level, g_type, group in self.create_typed_schedule():
+            toggles = 0
+            start = time.perf_counter()
+            for n in group:
+                previous_value = n._value
+                n.gate.get_output()
+                if n._value != previous_value:
+                    toggles += 1
+            profile.add(level, g_type, len(group), toggles, time.perf_counter() - start)
+
+    def enable_profiling(self, profile: simulation_profile = None):
+        '''
+        Starts filling a profile in simulate and simulate_event_driven, a new profile is
+        created if not given. The fault injection checks of node.get_value are counted
+        by a counting get_value set on every node until profiling is disabled.
+        Returns the profile
+        '''
+        if self.levelized_nodes == None:
+            raise CirNotLevelized()
+        if profile == None:
+            profile = simulation_profile("simulation")
+        self.disable_profiling()
+        self.profile = profile
+
+        counters = profile.counters
+        for n in self.nodes:
+            def counting_get_value(output_node, n = n):
+                counters["fault_injection_checks"] += 1
+                value = node.get_value(n, output_node)
+                if value != n._value:
+                    counters["fault_injections"] += 1
+                return value
+            n.get_value = counting_get_value
+
+        return profile
+
+    def disable_profiling(self):
+        '''
+        Stops profiling, returns the profile that was filled
+        '''
+        profile = self.profile
+        self.profile = None
+        for n in self.nodes:
+            n.__dict__.pop("get_value", None)
+        return profile
+
+    def __create_parallel_schedule(self):
+        '''
+        This function creates the list of gates evaluated by the bit-parallel simulation,
+        grouped by gate type within each level. Each entry has the word function of the
+        gate type and the gates of the group, as the index of the output node and the
+        indices of the nodes fed in
+        '''
+        self.__parallel_schedule = []
+        for level, g_type, group in self.create_typed_schedule():
+            gates = [(self.node_index[n.name], tuple(self.node_index[i.name] for i in n.gate.input_nodes)) for n in group]
+            self.__parallel_schedule.append((word_gate_function[g_type], gates))
+
+    def simulate_parallel(self, input_words, num_patterns, update_nodes = False):
+        '''
+        This function simulates num_patterns input vectors at once. The input words
+        should be a dictionary with the input node names as the keys and packed words
+        as values, bit i of a word is the value of the input for the i-th input vector.
+        Any number of input vectors can be packed in a word.
+
+        Returns the list of packed words of all the nodes, in the same order as the
+        nodes list. If update_nodes is set, the node values are set to the values of
+        the last input vector and the zero and one counts of the nodes are updated
+        '''
+        if self.levelized_nodes == None:
+            raise CirNotLevelized()
+
+        if self.__parallel_schedule == None:
+            self.__create_parallel_schedule()
+
+        for n in self.levelized_nodes[0]:
+            if n.name not in input_words:
+                raise InputUndefined(n)
+
+        mask = (1 << num_patterns) - 1
+        words = [0] * len(self.nodes)
+        for node_name in input_words:
+            words[self.node_index[node_name]] = input_words[node_name] & mask
+
+        for gate_function, gates in self.__parallel_schedule:
+            for output_index, input_index in gates:
+                words[output_index] = gate_function([words[i] for i in input_index], mask)
+
+        if update_nodes:
+            for i in range(len(self.nodes)):
+                self.nodes[i].update_from_word(words[i], num_patterns)
+            #selected faults are not simulated, node values may not match the fault
+            self.__event_state_valid = False
+
+        return words
+
+    def simulate_three_valued(self, input_rails, num_patterns, update_nodes = False):
+        '''
+        This function simulates num_patterns input vectors with 0, 1 and X values at once,
+        using two packed words per node (see three_valued.py). The input rails should be a
+        dictionary with the input node names as the keys and (zero rail, one rail) as
+        values, pack_three_valued_vectors packs input vectors into rails. Every gate is
+        evaluated with exact X semantics, an X is resolved only by a controlling value.
+
+        Returns the zero rails and the one rails of all the nodes, in the same order as the
+        nodes list. If update_nodes is set, the node values are set to the values of the
+        last input vector and the zero and one counts of the nodes are updated
+        '''
+        if self.levelized_nodes == None:
+            raise CirNotLevelized()
+
+        if self.__rails_schedule == None:
+            self.__rails_schedule = []
+            for level, g_type, group in self.create_typed_schedule():
+                gates = [(self.node_index[n.name], tuple(self.node_index[i.name] for i in n.gate.input_nodes))
+                         for n in group]
+                self.__rails_schedule.append((rails_gate_function[g_type], gates))
+
+        for n in self.levelized_nodes[0]:
+            if n.name not in input_rails:
+                raise InputUndefined(n)
+
+        mask = (1 << num_patterns) - 1
+        zeros = [0] * len(self.nodes)
+        ones = [0] * len(self.nodes)
+        for node_name in input_rails:
+            i = self.node_index[node_name]
+            zeros[i] = input_rails[node_name][0] & mask
+            ones[i] = input_rails[node_name][1] & mask
+
+        for rails_function, gates in self.__rails_schedule:
+            for output_index, input_index in gates:
+                zeros[output_index], ones[output_index] = rails_function([zeros[i] for i in input_index],
+                                                                         [ones[i] for i in input_index])
+
+        if update_nodes:
+            for i in range(len(self.nodes)):
+                self.nodes[i].update_from_rails(zeros[i], ones[i], num_patterns)
+            #selected faults are not simulated, node values may not match the fault
+            self.__event_state_valid = False
+
+        return zeros, ones
+
+    def select_fault_object(self, selected_fault: fault):
+        '''
+        Selects the given fault object, created by create_fault_list, without parsing
+        a fault string
+        '''
+        selected_fault.fault_node.selected_fault = selected_fault
+        self.__event_state_valid = False
+
+    def select_fault(self, fault_string):
+        fault_string_list = fault_string.split("-")
+        input_node = None
+        output_node = None
+        fault_type = fault_types.sa0
+        
+        if len(fault_string_list) == 2:
+            input_node = fault_string_list[0]
+            fault_type = fault_string_list[1]
+        else:
+            input_node = fault_string_list[1]
+            fault_type = fault_string_list[2] 
+            output_node = fault_string_list[0]
+
+        if input_node not in self.node_index:
+            raise FaultReprError(fault_input= input_node)
+        if fault_type not in ["0", "1"]:
+            raise FaultReprError(fault_type = fault_type)
+        if output_node != None:
+            if output_node != "out":
+                if output_node not in self.node_index:
+                    raise FaultReprError(fault_output = output_node)
+        
+        if output_node != "out" and output_node != None:
+            output_node = self.nodes[self.node_index[output_node]]
+        
+        if fault_type == "0":
+            fault_type = fault_types.sa0
+        else:
+            fault_type = fault_types.sa1
+
+        self.nodes[self.node_index[input_node]].select_fault(fault_type, output_node)
+        self.__event_state_valid = False
+
+    def select_fault_from_user_input(self):
+        print("Enter the fault to be selected in <output node name>-<input node name>-<0 or 1>  or <node name>-<0 or 1> format")
+        print("To select the fault at the output, enter the fault format in \"out-<output node name>-<0 or 1>\"")
+        fault_string = input("Enter fault string:")
+        self.select_fault(fault_string)
+
+    def __print_node_values_as_table(self, input_list, entries_per_row):
+        '''
+        prints node values as tables
+        '''
+        output_repr = {node_value.zero     : "0",
+                       node_value.one      : "1",
+                       node_value.d        : "D",
+                       node_value.d_bar    : "D'",
+                       node_value.undefined: "X"}
+        
+        index_row_1 = 0
+        index_row_2 = 0
+        for i in range(entries_per_row, len(input_list), entries_per_row):
+            print("Node  ", end = "")
+            while index_row_1 < i:
+                print("| {:^5} ".format(input_list[index_row_1].name), end = "")
+                index_row_1 += 1
+            print("|")
+            print("Value ", end = "")
+            while index_row_2 < i:
+                print("| {:^5} ".format(output_repr[input_list[index_row_2].value]), end = "")
+                index_row_2 += 1
+            print("|\n")
+
+
+        if index_row_1 < len(input_list):
+            print("Node  ", end = "")
+            while index_row_1 < len(input_list):
+                print("| {:^5} ".format(input_list[index_row_1].name), end = "")
+                index_row_1 += 1
+            print("|")
+            print("Value ", end = "")
+            while index_row_2 < len(input_list):
+                print("| {:^5} ".format(output_repr[input_list[index_row_2].value]), end = "")
+                index_row_2 += 1
+            print("|")
+        
+
+    def print_node_values(self, input_entries_per_row = 5, internal_entries_per_row = 5, output_entries_per_row = 5):
+        '''
+        This function prints the values of all the nodes in the circuit. Output
+        will be printed in the ascending order of levels 
+        '''
+        if (input_entries_per_row > 0):
+            print(f'------Input Nodes------')
+            self.__print_node_values_as_table(self.input_list, input_entries_per_row)
+
+        if (internal_entries_per_row > 0):
+            print(f'\n------Internal Nodes------')
+            self.__print_node_values_as_table(self.internal_nodes, internal_entries_per_row)
+
+        if (output_entries_per_row > 0):
+            print(f'\n------Output Nodes------')
+            self.__print_node_values_as_table(self.output_list, output_entries_per_row)
+
+
+    def reset_circuit(self, reset_count = False):
+        '''
+        Resets all the circuit parameters
+        '''
+        self.__event_state_valid = False
+        for n in self.input_list:
+            n.value = node_value.undefined
+            n.selected_fault = None
+            if reset_count:
+                n.zero_count = 0
+                n.one_count = 0
+
+        for n in self.internal_nodes:
+            n.value = node_value.undefined
+            n.selected_fault = None
+            if reset_count:
+                n.zero_count = 0
+                n.one_count = 0
+
+        for n in self.output_list:
+            n.value = node_value.undefined
+            n.selected_fault = None
+            if reset_count:
+                n.zero_count = 0
+                n.one_count = 0
@@ -5,9 +5,14 @@ class node_type:
 
 #class to represnt the value of each node
 class node_value:
-    high = 1
-    low = 0
+    zero = 0
+    one = 1
+    d = 2
+    d_bar = 3
     undefined = -1
+    high = one
+    low = zero
+    str_repr = {zero: "0", one: "1", d: "D", d_bar:"D'", undefined: "X"}
 
 class gate_type:
     AND_gate = 0
@@ -16,4 +21,294 @@ class gate_type:
     NAND_gate = 3
     NOR_gate = 4
     XOR_gate = 5
-    XNOR_gate = 6
\ No newline at end of file
+    XNOR_gate = 6
+    BUFF_gate = 7
+
+    @staticmethod
+    def AND(input_list, output_node):
+        output = input_list[0].get_value(output_node)
+
+        for i in range(1, len(input_list)):
+            if output == node_value.zero:
+                return output
+            value = input_list[i].get_value(output_node)
+            if value == node_value.zero:
+                output = node_value.zero
+            elif (value == node_value.one) or (output == node_value.undefined):
+                #an X stays X unless a later input has the controlling value
+                continue
+            elif value == node_value.undefined:
+                output = node_value.undefined
+            elif value == node_value.d:
+                if output == node_value.d_bar:
+                    output =  node_value.zero
+                else:
+                    output = node_value.d
+            elif value == node_value.d_bar:
+                if output == node_value.d:
+                    output =  node_value.zero
+                else:
+                    output = node_value.d_bar
+
+        return output
+    
+    @staticmethod
+    def OR(input_list, output_node):
+        output = input_list[0].get_value(output_node)
+
+        for i in range(1, len(input_list)):
+            if output == node_value.one:
+                return output
+            value = input_list[i].get_value(output_node)
+            if value == node_value.one:
+                output = node_value.one
+            elif (value == node_value.zero) or (output == node_value.undefined):
+                #an X stays X unless a later input has the controlling value
+                continue
+            elif value == node_value.undefined:
+                output = node_value.undefined
+            elif value == node_value.d:
+                if output == node_value.d_bar:
+                    output = node_value.one
+                else:
+                    output = node_value.d
+            elif value == node_value.d_bar:
+                if output == node_value.d:
+                    output = node_value.one
+                else:
+                    output = node_value.d_bar
+
+        return output
+    
+    @staticmethod
+    def NOT(input_list, output_node):
+        output_dict = {node_value.zero: node_value.one,
+                       node_value.one: node_value.zero,
+                       node_value.d: node_value.d_bar,
+                       node_value.d_bar: node_value.d,
+                       node_value.undefined: node_value.undefined}
+        
+        return output_dict[input_list[0].get_value(output_node)]
+    
+    @staticmethod
+    def BUFF(input_list, output_node):
+        
+        return input_list[0].get_value(output_node)
+    
+    @staticmethod
+    def NAND(input_list, output_node):
+        inv_output = {node_value.zero: node_value.one,
+                       node_value.one: node_value.zero,
+                       node_value.d: node_value.d_bar,
+                       node_value.d_bar: node_value.d,
+                       node_value.undefined: node_value.undefined}
+        
+        output = input_list[0].get_value(output_node)
+
+        for i in range(1, len(input_list)):
+            if output == node_value.zero:
+                return inv_output[output]
+            value = input_list[i].get_value(output_node)
+            if value == node_value.zero:
+                output = node_value.zero
+            elif (value == node_value.one) or (output == node_value.undefined):
+                #an X stays X unless a later input has the controlling value
+                continue
+            elif value == node_value.undefined:
+                output = node_value.undefined
+            elif value == node_value.d:
+                if output == node_value.d_bar:
+                    output =  node_value.zero
+                else:
+                    output = node_value.d
+            elif value == node_value.d_bar:
+                if output == node_value.d:
+                    output =  node_value.zero
+                else:
+                    output = node_value.d_bar
+
+        return inv_output[output]
+    
+    @staticmethod
+    def NOR(input_list, output_node):
+        inv_output = {node_value.zero: node_value.one,
+                       node_value.one: node_value.zero,
+                       node_value.d: node_value.d_bar,
+                       node_value.d_bar: node_value.d,
+                       node_value.undefined: node_value.undefined}
+        
+        output = input_list[0].get_value(output_node)
+
+        for i in range(1, len(input_list)):
+            if output == node_value.one:
+                return inv_output[output]
+            value = input_list[i].get_value(output_node)
+            if value == node_value.one:
+                output = node_value.one
+            elif (value == node_value.zero) or (output == node_value.undefined):
+                #an X stays X unless a later input has the controlling value
+                continue
+            elif value == node_value.undefined:
+                output = node_value.undefined
+            elif value == node_value.d:
+                if output == node_value.d_bar:
+                    output = node_value.one
+                else:
+                    output = node_value.d
+            elif value == node_value.d_bar:
+                if output == node_value.d:
+                    output = node_value.one
+                else:
+                    output = node_value.d_bar
+
+        return inv_output[output]
+    
+    @staticmethod
+    def XOR(input_list, output_node):
+        inverted_output = {node_value.zero: node_value.one,
+                          node_value.one: node_value.zero,
+                          node_value.d: node_value.d_bar,
+                          node_value.d_bar: node_value.d,
+                          node_value.undefined: node_value.undefined}
+        
+        output = None
+        if input_list[0].get_value(output_node) == node_value.undefined:
+            return node_value.undefined
+        elif input_list[0].get_value(output_node) == node_value.zero:
+            output = input_list[1].get_value(output_node)
+        elif input_list[0].get_value(output_node) == node_value.one:
+            output = inverted_output[input_list[1].get_value(output_node)]
+        elif input_list[0].get_value(output_node) == node_value.d:
+            if input_list[1].get_value(output_node) == node_value.d_bar:
+                output = node_value.one
+            elif input_list[1].get_value(output_node) == node_value.one:
+                output = inverted_output[node_value.d]
+            elif input_list[1].get_value(output_node) == node_value.zero:
+                output = node_value.d
+            elif input_list[1].get_value(output_node) == node_value.undefined:
+                output = node_value.undefined
+            else:
+                output = node_value.zero
+        elif input_list[0].get_value(output_node) == node_value.d_bar:
+            if input_list[1].get_value(output_node) == node_value.d:
+                output = node_value.one
+            elif input_list[1].get_value(output_node) == node_value.one:
+                output = inverted_output[node_value.d_bar]
+            elif input_list[1].get_value(output_node) == node_value.zero:
+                output = node_value.d_bar
+            elif input_list[1].get_value(output_node) == node_value.undefined:
+                output = node_value.undefined
+            else:
+                output = node_value.zero
+
+        for i in range(2, len(input_list)):
+            if input_list[i].get_value(output_node) == node_value.undefined:
+                return node_value.undefined
+            elif input_list[i].get_value(output_node) == node_value.zero:
+                continue
+            elif input_list[i].get_value(output_node) == node_value.one:
+                output = inverted_output[output]
+            elif input_list[i].get_value(output_node) == node_value.d:
+                if output == node_value.zero:
+                    output = node_value.d
+                elif output == node_value.one:
+                    output = inverted_output[node_value.d]
+                elif output == node_value.d:
+                    output = node_value.zero
+                elif output == node_value.d_bar:
+                    output = node_value.one
+            elif input_list[i].get_value(output_node) == node_value.d_bar:
+                if output == node_value.zero:
+                    output = node_value.d_bar
+                elif output == node_value.one:
+                    output = inverted_output[node_value.d_bar]
+                elif output == node_value.d:
+                    output = node_value.one
+                elif output == node_value.d_bar:
+                    output = node_value.zero
+    
+        return output
+    
+    @staticmethod
+    def XNOR(input_list, output_node):
+        inverted_output = {node_value.zero: node_value.one,
+                          node_value.one: node_value.zero,
+                          node_value.d: node_value.d_bar,
+                          node_value.d_bar: node_value.d,
+                          node_value.undefined: node_value.undefined}
+        
+        output = None
+        if input_list[0].get_value(output_node) == node_value.undefined:
+            return node_value.undefined
+        elif input_list[0].get_value(output_node) == node_value.one:
+            output = input_list[1].get_value(output_node)
+        elif input_list[0].get_value(output_node) == node_value.zero:
+            output = inverted_output[input_list[1].get_value(output_node)]
+        elif input_list[0].get_value(output_node) == node_value.d:
+            if input_list[1].get_value(output_node) == node_value.d_bar:
+                output = node_value.zero
+            elif input_list[1].get_value(output_node) == node_value.zero:
+                output = inverted_output[node_value.d]
+            elif input_list[1].get_value(output_node) == node_value.one:
+                output = node_value.d
+            elif input_list[1].get_value(output_node) == node_value.undefined:
+                output = node_value.undefined
+            else:
+                output = node_value.one
+        elif input_list[0].get_value(output_node) == node_value.d_bar:
+            if input_list[1].get_value(output_node) == node_value.d:
+                output = node_value.zero
+            elif input_list[1].get_value(output_node) == node_value.zero:
+                output = inverted_output[node_value.d_bar]
+            elif input_list[1].get_value(output_node) == node_value.one:
+                output = node_value.d_bar
+            elif input_list[1].get_value(output_node) == node_value.undefined:
+                output = node_value.undefined
+            else:
+                output = node_value.one
+
+        #the remaining inputs are xor-ed, XNOR(a, b, c) = XNOR(a, b) XOR c
+        for i in range(2, len(input_list)):
+            if input_list[i].get_value(output_node) == node_value.undefined:
+                return node_value.undefined
+            elif input_list[i].get_value(output_node) == node_value.zero:
+                continue
+            elif input_list[i].get_value(output_node) == node_value.one:
+                output = inverted_output[output]
+            elif input_list[i].get_value(output_node) == node_value.d:
+                if output == node_value.zero:
+                    output = node_value.d
+                elif output == node_value.one:
+                    output = inverted_output[node_value.d]
+                elif output == node_value.d:
+                    output = node_value.zero
+                elif output == node_value.d_bar:
+                    output = node_value.one
+            elif input_list[i].get_value(output_node) == node_value.d_bar:
+                if output == node_value.zero:
+                    output = node_value.d_bar
+                elif output == node_value.one:
+                    output = inverted_output[node_value.d_bar]
+                elif output == node_value.d:
+                    output = node_value.one
+                elif output == node_value.d_bar:
+                    output = node_value.zero
+    
+        return output
+                
+class fault_types:
+    sa0 = 0
+    sa1 = 1
+
+#gate type and gate function of each gate keyword of the circuit bench file
+gate_dict = {"AND" : [gate_type.AND_gate, gate_type.AND],
+             "OR"  : [gate_type.OR_gate, gate_type.OR],
+             "NOT" : [gate_type.NOT_gate, gate_type.NOT],
+             "NOR" : [gate_type.NOR_gate, gate_type.NOR],
+             "NAND": [gate_type.NAND_gate, gate_type.NAND],
+             "XOR" : [gate_type.XOR_gate, gate_type.XOR],
+             "XNOR": [gate_type.XNOR_gate, gate_type.XNOR],
+             "BUFF": [gate_type.BUFF_gate, gate_type.BUFF]}
+
+#gate keyword of each gate type
+gate_string = {gate_dict[g][0]: g for g in gate_dict}
@@ -0,0 +1,311 @@
+from array import array
+from .circuit import *
+from .bit_parallel import *
+
+class compact_netlist:
+    '''
+    Array-backed representation of a circuit. Nets are integer IDs, node types, gate
+    types and levels are typed arrays and the fanin and fanout of every net are stored
+    in CSR form: the fanin of net i is fanin_index[fanin_offsets[i]:fanin_offsets[i + 1]].
+
+    nodes, input_list, output_list, internal_nodes and levelized_nodes return thin
+    views (compact_node) with the same attributes as node, so code written for circuit
+    can run on a compact_netlist. Faults are not supported by the views.
+
+    Attributes:
+    names: Name of each net(string)
+    node_index: ID of each net, keys are the net names
+    node_types: Node type of each net(node_type)
+    gate_types: Gate type of each net, no_gate for inputs(gate_type)
+    levels: Level of each net(int)
+    fanin_offsets, fanin_index: Fanin of each net in CSR form
+    fanout_offsets, fanout_index: Fanout of each net in CSR form
+    input_index: IDs of the input nets
+    output_index: IDs of the output nets
+    input_is_output: 1 for the inputs also declared as outputs, for each net
+    schedule: IDs of the gate outputs in the ascending order of levels
+    order: IDs of all the nets in the ascending order of levels
+    level_offsets: Nets of level l are order[level_offsets[l]:level_offsets[l + 1]]
+    values: Value of each net(node_value)
+    '''
+
+    __slots__ = ("circuit_bench_file", "names", "node_index", "node_types", "gate_types", "levels",
+                 "fanin_offsets", "fanin_index", "fanout_offsets", "fanout_index",
+                 "input_index", "output_index", "input_is_output", "schedule", "order", "level_offsets", "values",
+                 "num_levels")
+
+    def __init__(self, names, node_types, gate_types, fanin_offsets, fanin_index, input_is_output, circuit_bench_file = None):
+        '''
+        Creates the netlist from the arrays of a parsed_netlist
+        '''
+        self.circuit_bench_file = circuit_bench_file
+        self.names = names
+        self.node_index = {}
+        for i in range(len(names)):
+            self.node_index[names[i]] = i
+
+        self.node_types = array("b", node_types)
+        self.gate_types = array("b", gate_types)
+        self.fanin_offsets = array("i", fanin_offsets)
+        self.fanin_index = array("i", fanin_index)
+        self.input_is_output = array("b", input_is_output)
+
+        fanout_count = [0] * len(names)
+        for j in self.fanin_index:
+            fanout_count[j] += 1
+
+        self.fanout_offsets = array("i", [0])
+        for i in range(len(names)):
+            self.fanout_offsets.append(self.fanout_offsets[-1] + fanout_count[i])
+        self.fanout_index = array("i", [0]) * len(self.fanin_index)
+        position = array("i", self.fanout_offsets[:-1])
+        for i in range(len(names)):
+            for k in range(self.fanin_offsets[i], self.fanin_offsets[i + 1]):
+                j = self.fanin_index[k]
+                self.fanout_index[position[j]] = i
+                position[j] += 1
+
+        self.input_index = array("i")
+        self.output_index = array("i")
+        for i in range(len(names)):
+            if self.node_types[i] == node_type.input_node:
+                self.input_index.append(i)
+                if self.input_is_output[i]:
+                    self.output_index.append(i)
+            elif self.node_types[i] == node_type.output_node:
+                if self.gate_types[i] == no_gate:
+                    raise FloatingOutput(names[i])
+                self.output_index.append(i)
+
+        self.values = array("b", [node_value.undefined]) * len(names)
+        self.__levelize()
+
+    @classmethod
+    def from_bench_file(cls, circuit_bench_file, use_cache = False, cache_dir = None):
+        '''
+        Creates the netlist directly from a circuit bench file, without creating node objects
+        '''
+        return cls.from_parsed_netlist(load_bench_file(circuit_bench_file, use_cache, cache_dir),
+                                       circuit_bench_file = circuit_bench_file)
+
+    @classmethod
+    def from_parsed_netlist(cls, netlist: parsed_netlist, circuit_bench_file = None):
+        '''
+        Creates the netlist from the output of the bench parser
+        '''
+        return cls(netlist.names, netlist.node_types, netlist.gate_types, netlist.fanin_offsets,
+                   netlist.fanin_index, netlist.input_is_output, circuit_bench_file = circuit_bench_file)
+
+    @classmethod
+    def from_circuit(cls, circuit_under_test: circuit):
+        '''
+        Creates the netlist from a circuit, the net IDs are the indices in the nodes list
+        '''
+        node_index = circuit_under_test.node_index
+        fanin_offsets = [0]
+        fanin_index = []
+        for n in circuit_under_test.nodes:
+            if n.gate != None:
+                fanin_index.extend(node_index[i.name] for i in n.gate.input_nodes)
+            fanin_offsets.append(len(fanin_index))
+
+        names = [n.name for n in circuit_under_test.nodes]
+        node_types = [n.type for n in circuit_under_test.nodes]
+        gate_types = [no_gate if n.gate == None else n.gate.type for n in circuit_under_test.nodes]
+        input_is_output = [n.input_is_output for n in circuit_under_test.nodes]
+        return cls(names, node_types, gate_types, fanin_offsets, fanin_index, input_is_output,
+                   circuit_bench_file = getattr(circuit_under_test, "circuit_bench_file", None))
+
+    def __levelize(self):
+        '''
+        Finds the level of every net and the evaluation schedule
+        '''
+        self.levels, self.order, self.level_offsets = levelize(self.names, self.fanin_offsets, self.fanin_index)
+        self.num_levels = len(self.level_offsets) - 1
+        self.schedule = self.order[self.level_offsets[1]:] if self.num_levels else array("i")
+
+    def fanin(self, i):
+        '''
+        Returns the IDs of the nets fed in to net i
+        '''
+        return self.fanin_index[self.fanin_offsets[i]:self.fanin_offsets[i + 1]]
+
+    def fanout(self, i):
+        '''
+        Returns the IDs of the nets fed by net i
+        '''
+        return self.fanout_index[self.fanout_offsets[i]:self.fanout_offsets[i + 1]]
+
+    def simulate_parallel(self, input_words, num_patterns):
+        '''
+        Simulates num_patterns input vectors at once. input_words are the packed words of
+        the inputs in the order of input_index. Returns the packed words of all the nets
+        '''
+        mask = (1 << num_patterns) - 1
+        words = [0] * len(self.names)
+        for k in range(len(self.input_index)):
+            words[self.input_index[k]] = input_words[k] & mask
+
+        fanin_offsets = self.fanin_offsets
+        fanin_index = self.fanin_index
+        gate_types = self.gate_types
+        for i in self.schedule:
+            input_words = [words[j] for j in fanin_index[fanin_offsets[i]:fanin_offsets[i + 1]]]
+            words[i] = word_gate_function[gate_types[i]](input_words, mask)
+
+        return words
+
+    #compatibility with the circuit class
+    @property
+    def nodes(self):
+        return [compact_node(self, i) for i in range(len(self.names))]
+
+    @property
+    def input_list(self):
+        return [compact_node(self, i) for i in self.input_index]
+
+    @property
+    def output_list(self):
+        return [compact_node(self, i) for i in self.output_index]
+
+    @property
+    def internal_nodes(self):
+        return [compact_node(self, i) for i in range(len(self.names)) if self.node_types[i] == node_type.internal_wire]
+
+    @property
+    def levelized_nodes(self):
+        levelized_nodes = {}
+        for level in range(self.num_levels):
+            levelized_nodes[level] = [compact_node(self, i) for i in self.order[self.level_offsets[level]:self.level_offsets[level + 1]]]
+        return levelized_nodes
+
+    def levelize_circuit(self):
+        '''
+        The netlist is levelized when it is created, kept for compatibility with circuit
+        '''
+        return
+
+    def simulate(self, input_vector):
+        '''
+        This function simulates the circuit for the given input vector, a dictionary with
+        the input node names as the keys, like circuit.simulate
+        '''
+        for node_name in input_vector:
+            self.values[self.node_index[node_name]] = input_vector[node_name]
+
+        for i in self.input_index:
+            if self.values[i] == node_value.undefined:
+                raise InputUndefined(compact_node(self, i))
+
+        for i in self.schedule:
+            compact_gate(self, i).get_output()
+
+    def reset_circuit(self):
+        '''
+        Sets all the values to undefined
+        '''
+        for i in range(len(self.values)):
+            self.values[i] = node_value.undefined
+
+class compact_node:
+    '''
+    View of a net of a compact_netlist with the attributes of node
+    '''
+
+    __slots__ = ("netlist", "index")
+
+    def __init__(self, netlist: compact_netlist, index):
+        self.netlist = netlist
+        self.index = index
+
+    @property
+    def name(self):
+        return self.netlist.names[self.index]
+
+    @property
+    def type(self):
+        return self.netlist.node_types[self.index]
+
+    @property
+    def level(self):
+        return self.netlist.levels[self.index]
+
+    @property
+    def input_is_output(self):
+        return bool(self.netlist.input_is_output[self.index])
+
+    @property
+    def value(self):
+        return self.netlist.values[self.index]
+
+    @value.setter
+    def value(self, new_value):
+        self.netlist.values[self.index] = new_value
+
+    def get_value(self, output_node):
+        return self.netlist.values[self.index]
+
+    @property
+    def gate(self):
+        if self.netlist.gate_types[self.index] == no_gate:
+            return None
+        return compact_gate(self.netlist, self.index)
+
+    @property
+    def fanout_nodes(self):
+        return [compact_node(self.netlist, i) for i in self.netlist.fanout(self.index)]
+
+    def __eq__(self, other):
+        return isinstance(other, compact_node) and (self.netlist is other.netlist) and (self.index == other.index)
+
+    def __hash__(self):
+        return hash((id(self.netlist), self.index))
+
+    def __repr__(self):
+        return self.name
+
+class compact_gate:
+    '''
+    View of the gate driving a net of a compact_netlist with the attributes of gate
+    '''
+
+    __slots__ = ("netlist", "index")
+
+    def __init__(self, netlist: compact_netlist, index):
+        self.netlist = netlist
+        self.index = index
+
+    @property
+    def type(self):
+        return self.netlist.gate_types[self.index]
+
+    @property
+    def gate_string(self):
+        return gate_string[self.type]
+
+    @property
+    def gate_function(self):
+        return gate_dict[self.gate_string][1]
+
+    @property
+    def input_nodes(self):
+        return [compact_node(self.netlist, i) for i in self.netlist.fanin(self.index)]
+
+    @property
+    def num_inputs(self):
+        return self.netlist.fanin_offsets[self.index + 1] - self.netlist.fanin_offsets[self.index]
+
+    @property
+    def output_node(self):
+        return compact_node(self.netlist, self.index)
+
+    def get_output(self):
+        self.netlist.values[self.index] = self.gate_function(self.input_nodes, self.output_node)
+
+    def __repr__(self):
+        str_repr = f"{self.num_inputs}-input {self.gate_string} gate | Input nodes: "
+        for n in self.input_nodes:
+            str_repr = str_repr + f"{n},"
+        str_repr = str_repr[:-1] + " | "
+        str_repr = f"{str_repr}Output node: {self.output_node}"
+        return str_repr
@@ -0,0 +1,232 @@
+import random
+import time
+from .circuit import *
+from .fault_simulation import *
+from .fault_collapsing import fault_universe
+
+def _cube_bits(cube):
+    '''
+    Returns the care bits and the value bits of a partially specified input vector, bit j
+    of the care bits is set if the j-th input is 0 or 1
+    '''
+    care = 0
+    value = 0
+    for j in range(len(cube)):
+        if cube[j] != node_value.undefined:
+            care |= 1 << j
+            if cube[j] == node_value.one:
+                value |= 1 << j
+    return care, value
+
+def merge_compatible_vectors(iv_list):
+    '''
+    Merges partially specified input vectors (X given as node_value.undefined) that do
+    not have opposite values on any input, a merged vector is specified wherever one of
+    the vectors it merges is. Vectors are merged greedily, the most specified first,
+    each into the first merged vector it is compatible with. Returns the merged vectors,
+    X inputs are kept
+    '''
+    num_inputs = len(iv_list[0]) if iv_list else 0
+    all_inputs = (1 << num_inputs) - 1
+    cubes = sorted([_cube_bits(cube) for cube in iv_list], key = lambda c: -c[0].bit_count())
+
+    merged = [] #[care, value] of the merged vectors
+    partial = [] #merged vectors with X inputs left
+    fully_specified = {} #merged vector of each value of the fully specified vectors
+    for care, value in cubes:
+        if care == all_inputs:
+            if value in fully_specified:
+                continue
+            #a fully specified vector can only be merged into a vector with X inputs
+            candidates = partial
+        else:
+            candidates = merged
+        target = None
+        for m in candidates:
+            if ((m[1] ^ value) & m[0] & care) == 0:
+                target = m
+                break
+        if target == None:
+            target = [care, value]
+            merged.append(target)
+            if care != all_inputs:
+                partial.append(target)
+        else:
+            was_partial = target[0] != all_inputs
+            target[0] |= care
+            target[1] |= value
+            if was_partial and (target[0] == all_inputs):
+                partial.remove(target)
+        if target[0] == all_inputs:
+            fully_specified[target[1]] = target
+
+    return [[((value >> j) & 1) if (care >> j) & 1 else node_value.undefined for j in range(num_inputs)]
+            for care, value in merged]
+
+class test_compaction_session:
+    '''
+    Compacts a test set without losing fault coverage:
+
+    1. The faults detected by the test set are found by fault simulation with fault dropping.
+    2. Compatible partially specified vectors are merged (merge_compatible_vectors) and
+       the X inputs left are filled.
+    3. The vectors are fault simulated in reverse order with fault dropping, a vector is
+       kept only if it detects a fault no later vector detects. The last vectors of an
+       ATPG run target the hardest faults and usually detect many easy faults as well,
+       so most of the early vectors are dropped.
+    4. A fault detected by the original test set that no kept vector detects (merging
+       and filling can change what a vector detects by chance) gets back the first
+       original vector detecting it, and the reverse order pass is run again.
+
+    The coverage is measured on the equivalence collapsed fault list by default,
+    equivalent faults are detected by the same vectors so the coverage of the full fault
+    list is unchanged as well.
+
+    Attributes:
+    test_set: Compacted input vectors, in the order of the input list
+    fault_ids: Faults whose detection is kept
+    num_vectors_before: Number of vectors of the original test set
+    num_merged: Number of vectors after merging
+    num_detected_before: Number of faults detected by the original test set
+    num_detected_after: Number of faults detected by the compacted test set
+    '''
+
+    def __init__(self, circuit_under_test: circuit, iv_list, fault_ids = None, merge = True, fill_value = 0,
+                 seed = None, reference_vectors = None, simulator: fault_simulator = None, block_size = 64):
+        '''
+        Creates a compaction session
+
+        param[in] circuit_under_test: Levelized circuit
+        param[in] iv_list: Test set, X inputs (node_value.undefined) are allowed
+        param[in] fault_ids: Faults whose detection is kept, the equivalence collapsed faults if not given
+        param[in] merge: Merge compatible partially specified vectors
+        param[in] fill_value: Value of the X inputs left, random values if None
+        param[in] seed: Seed of the random values of the X inputs
+        param[in] reference_vectors: Fully specified version of iv_list whose coverage is kept,
+                                     for example the test set of test_generation_session for
+                                     its test cubes, iv_list filled if not given
+        param[in] simulator: Fault simulator of the circuit(fault_simulator or parallel_fault_simulator)
+        param[in] block_size: Number of vectors fault simulated at once
+        '''
+        if simulator == None:
+            simulator = fault_simulator(circuit_under_test)
+        if fault_ids == None:
+            fault_ids = fault_universe(circuit_under_test).collapsed_ids
+
+        self.circuit_under_test = circuit_under_test
+        self.simulator = simulator
+        self.fault_ids = list(fault_ids)
+        self.iv_list = [list(iv) for iv in iv_list]
+        self.merge = merge
+        self.fill_value = fill_value
+        self.random = random.Random(seed)
+        self.block_size = block_size
+        if reference_vectors == None:
+            reference_vectors = [self.__fill(iv) for iv in self.iv_list]
+        self.reference_vectors = [list(iv) for iv in reference_vectors]
+
+        self.test_set = []
+        self.num_vectors_before = len(self.iv_list)
+        self.num_merged = len(self.iv_list)
+        self.num_detected_before = 0
+        self.num_detected_after = 0
+        self.run_time = 0
+
+    def __fill(self, iv):
+        '''
+        Returns the input vector with the X inputs filled
+        '''
+        if self.fill_value == None:
+            return [self.random.randint(0, 1) if v == node_value.undefined else v for v in iv]
+        return [self.fill_value if v == node_value.undefined else v for v in iv]
+
+    def __first_detections(self, iv_list, fault_ids, reverse = False):
+        '''
+        Fault simulates the input vectors with fault dropping, in reverse order if reverse
+        is set. Returns the indices of the vectors that are the first to detect a fault
+        and the faults not detected
+        '''
+        kept = set()
+        undetected = list(fault_ids)
+        order = list(range(len(iv_list)))
+        if reverse:
+            order.reverse()
+
+        for start in range(0, len(order), self.block_size):
+            if not undetected:
+                break
+            block = order[start:start + self.block_size]
+            results = self.simulator.simulate([iv_list[i] for i in block], undetected)
+            left = []
+            for fault_id in undetected:
+                word = results[fault_id]
+                if word:
+                    #the first vector of the block detecting the fault is the lowest bit
+                    kept.add(block[(word & -word).bit_length() - 1])
+                else:
+                    left.append(fault_id)
+            undetected = left
+
+        return sorted(kept), undetected
+
+    def run(self):
+        '''
+        Compacts the test set. Returns the compacted list of input vectors
+        '''
+        start = time.perf_counter()
+        kept, undetected = self.__first_detections(self.reference_vectors, self.fault_ids)
+        detected = set(self.fault_ids) - set(undetected)
+        self.num_detected_before = len(detected)
+        targets = [f for f in self.fault_ids if f in detected]
+
+        if self.merge:
+            vectors = [self.__fill(iv) for iv in merge_compatible_vectors(self.iv_list)]
+        else:
+            vectors = [self.__fill(iv) for iv in self.iv_list]
+        self.num_merged = len(vectors)
+
+        kept, lost = self.__first_detections(vectors, targets, reverse = True)
+        vectors = [vectors[i] for i in kept]
+        if lost:
+            restored, undetected = self.__first_detections(self.reference_vectors, lost)
+            vectors.extend(self.reference_vectors[i] for i in restored)
+            kept, lost = self.__first_detections(vectors, targets, reverse = True)
+            vectors = [vectors[i] for i in kept]
+
+        self.test_set = vectors
+        self.num_detected_after = len(targets) - len(lost)
+        self.run_time = time.perf_counter() - start
+        return self.test_set
+
+    def fault_coverage(self, after = True):
+        '''
+        Percentage of the faults detected by the compacted test set, or by the original
+        test set if after is not set
+        '''
+        if not self.fault_ids:
+            return 100.0
+        num_detected = self.num_detected_after if after else self.num_detected_before
+        return (num_detected / len(self.fault_ids)) * 100
+
+    def write_test_set(self, file_name):
+        '''
+        Writes the compacted test set, in the format of test_generation_session.write_test_set
+        '''
+        with open(file_name, "w") as f:
+            f.write("# " + " ".join(n.name for n in self.circuit_under_test.input_list) + "\n")
+            for iv in self.test_set:
+                f.write("".join(str(v) for v in iv) + "\n")
+
+    def print_summary(self):
+        '''
+        Prints the number of vectors and the fault coverage before and after compaction. The
+        coverage is on the faults whose detection is kept (the equivalence collapsed faults by
+        default), not on the full fault list
+        '''
+        print("Number of faults kept: ", len(self.fault_ids))
+        print("Number of test vectors before compaction: ", self.num_vectors_before)
+        print("Number of test vectors after merging: ", self.num_merged)
+        print("Number of test vectors after compaction: ", len(self.test_set))
+        print("Fault coverage of the faults kept before compaction: {}%".format(round(self.fault_coverage(False), 2)))
+        print("Fault coverage of the faults kept after compaction: {}%".format(round(self.fault_coverage(True), 2)))
+        print("Run time: {}s".format(round(self.run_time, 2)))
@@ -0,0 +1,214 @@
+import os
+import sys
+import hashlib
+import marshal
+from .circuit import *
+from .bench_parser import private_cache_dir, private_file_opener, is_private
+
+#changes whenever the generated code changes, so that old cache files are not used
+codegen_version = 2
+
+#inverted value of 0, 1, D, D' and X, X(-1) is the last entry
+inverted_value = (node_value.one, node_value.zero, node_value.d_bar, node_value.d, node_value.undefined)
+
+def _controlled_expression(input_names, value):
+    '''
+    Returns the expression of an AND (value = 0) or OR (value = 1) gate for 0, 1 and X.
+    The controlling value on any input sets the output, otherwise an X on any input gives
+    X, which is the lowest of the values left
+    '''
+    controlled = " or ".join(f"{name} == {value}" for name in input_names)
+    return f"({value} if {controlled} else min({', '.join(input_names)}))"
+
+def _xor_expression(input_names, xor_value):
+    '''
+    Returns the expression of gate_type.XOR (xor_value = 1) or gate_type.XNOR
+    (xor_value = 0) for 0, 1 and X. An X on any input gives X
+    '''
+    expression = " ^ ".join(input_names)
+    if xor_value == node_value.zero:
+        expression = f"1 ^ {expression}"
+    unknown = " or ".join(f"{name} == -1" for name in input_names)
+    return f"(-1 if {unknown} else {expression})"
+
+def scalar_expression(g_type, input_names):
+    '''
+    Returns the python expression evaluating a gate for 0, 1 and X values
+    '''
+    if g_type == gate_type.AND_gate:
+        return _controlled_expression(input_names, node_value.zero)
+    elif g_type == gate_type.NAND_gate:
+        return f"_INV[{_controlled_expression(input_names, node_value.zero)}]"
+    elif g_type == gate_type.OR_gate:
+        return _controlled_expression(input_names, node_value.one)
+    elif g_type == gate_type.NOR_gate:
+        return f"_INV[{_controlled_expression(input_names, node_value.one)}]"
+    elif g_type == gate_type.NOT_gate:
+        return f"_INV[{input_names[0]}]"
+    elif g_type == gate_type.BUFF_gate:
+        return input_names[0]
+    elif g_type == gate_type.XOR_gate:
+        return _xor_expression(input_names, node_value.one)
+    else:
+        return _xor_expression(input_names, node_value.zero)
+
+def word_expression(g_type, input_names):
+    '''
+    Returns the python expression evaluating a gate over packed words
+    '''
+    if g_type in [gate_type.AND_gate, gate_type.NAND_gate]:
+        expression = " & ".join(input_names)
+    elif g_type in [gate_type.OR_gate, gate_type.NOR_gate]:
+        expression = " | ".join(input_names)
+    elif g_type in [gate_type.XOR_gate, gate_type.XNOR_gate]:
+        expression = " ^ ".join(input_names)
+    else:
+        expression = input_names[0]
+
+    if g_type in [gate_type.NAND_gate, gate_type.NOR_gate, gate_type.XNOR_gate, gate_type.NOT_gate]:
+        expression = f"mask ^ ({expression})"
+    return expression
+
+def generate_source(circuit_under_test: circuit):
+    '''
+    Generates the source of the straight-line evaluation functions of a levelized circuit.
+    simulate(values) takes the input values in the order of the input list and returns
+    the values of all the nodes in the order of the nodes list. simulate_parallel(words, mask)
+    does the same for packed words
+    '''
+    if circuit_under_test.levelized_nodes == None:
+        raise CirNotLevelized()
+
+    variable = {}
+    for i in range(len(circuit_under_test.nodes)):
+        variable[circuit_under_test.nodes[i].name] = f"v{i}"
+
+    input_names = [variable[n.name] for n in circuit_under_test.input_list]
+    node_names = [variable[n.name] for n in circuit_under_test.nodes]
+
+    scalar_lines = []
+    word_lines = []
+    for n in circuit_under_test.schedule[circuit_under_test.level_offsets[1]:]:
+        gate_inputs = [variable[input_node.name] for input_node in n.gate.input_nodes]
+        scalar_lines.append(f"    {variable[n.name]} = {scalar_expression(n.gate.type, gate_inputs)}\n")
+        word_lines.append(f"    {variable[n.name]} = {word_expression(n.gate.type, gate_inputs)}\n")
+
+    inputs = ", ".join(input_names) + ","
+    outputs = ", ".join(node_names)
+
+    source = "def simulate(values):\n"
+    source += f"    {inputs} = values\n"
+    source += "".join(scalar_lines)
+    source += f"    return [{outputs}]\n\n"
+    source += "def simulate_parallel(words, mask):\n"
+    source += f"    {inputs} = words\n"
+    source += "".join(word_lines)
+    source += f"    return [{outputs}]\n"
+    return source
+
+class compiled_circuit:
+    '''
+    Compiled-code simulator. The levelized circuit is turned into straight-line python
+    functions with one assignment per gate, in the order of the levels. The code object
+    is cached on disk, keyed by a hash of the circuit bench file, so later runs skip
+    the code generation as well. The cache directory must be private to the current user
+    (see private_cache_dir) and a cached file is only executed if it is owned by the
+    current user and not writable by others.
+
+    The compiled functions give the same values as gate_type for 0, 1 and X inputs.
+    Selected faults are not simulated.
+
+    Attributes:
+    cache_file: Path of the cached code object, None if caching is disabled
+    from_cache: True if the code object was loaded from the cache
+    '''
+
+    def __init__(self, circuit_under_test: circuit, cache_dir = None, use_cache = True):
+        '''
+        Compiles a levelized circuit
+
+        param[in] circuit_under_test: Levelized circuit
+        param[in] cache_dir: Directory of the code cache, a directory of the current user
+                             is used if not given
+        param[in] use_cache: Load and store the code object in the cache
+        '''
+        self.circuit_under_test = circuit_under_test
+        self.cache_file = None
+        self.from_cache = False
+
+        if use_cache:
+            self.cache_file = os.path.join(private_cache_dir(cache_dir), f"{self.__cache_key()}.atpgc")
+
+        code = None
+        if (self.cache_file != None) and os.path.exists(self.cache_file):
+            try:
+                with open(self.cache_file, "rb") as f:
+                    if is_private(os.fstat(f.fileno())):
+                        code = marshal.load(f)
+                        self.from_cache = True
+            except (OSError, EOFError, ValueError, TypeError):
+                code = None
+
+        if code == None:
+            code = compile(generate_source(circuit_under_test),
+                           f"<compiled {circuit_under_test.circuit_bench_file}>", "exec")
+            if self.cache_file != None:
+                self.__store(code)
+
+        namespace = {"_INV": inverted_value}
+        exec(code, namespace)
+        self.__simulate = namespace["simulate"]
+        self.__simulate_parallel = namespace["simulate_parallel"]
+
+    def __cache_key(self):
+        '''
+        Returns the cache key, a hash of the circuit bench file, the code generator version
+        and the python version (code objects are specific to the python version)
+        '''
+        key = hashlib.sha256()
+        with open(self.circuit_under_test.circuit_bench_file, "rb") as f:
+            key.update(f.read())
+        key.update(f"{codegen_version}-{sys.implementation.cache_tag}".encode())
+        return key.hexdigest()
+
+    def __store(self, code):
+        '''
+        Stores the code object in the cache, written to a temporary file first so that a
+        partially written file is never loaded
+        '''
+        temp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+        with open(temp_file, "wb", opener = private_file_opener) as f:
+            marshal.dump(code, f)
+        os.replace(temp_file, self.cache_file)
+
+    def evaluate(self, iv):
+        '''
+        Evaluates one input vector, given in the order of the input list. Returns the
+        values of all the nodes in the order of the nodes list
+        '''
+        return self.__simulate(iv)
+
+    def evaluate_parallel(self, input_words, num_patterns):
+        '''
+        Evaluates packed input words, given in the order of the input list. Returns the
+        packed words of all the nodes in the order of the nodes list
+        '''
+        mask = (1 << num_patterns) - 1
+        return self.__simulate_parallel([w & mask for w in input_words], mask)
+
+    def simulate(self, input_vector):
+        '''
+        Simulates the input vector, a dictionary with the input node names as the keys
+        like in circuit.simulate. Returns a dictionary with the values of all the nodes
+        '''
+        iv = []
+        for n in self.circuit_under_test.input_list:
+            if n.name not in input_vector:
+                raise InputUndefined(n)
+            iv.append(input_vector[n.name])
+
+        values = self.__simulate(iv)
+        results = {}
+        for i in range(len(values)):
+            results[self.circuit_under_test.nodes[i].name] = values[i]
+        return results
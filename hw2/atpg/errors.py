@@ -1,7 +1,7 @@
 #custom errors to be used
 class GateNotDefined(Exception):
     '''
-    Error to be raised from the gate is not found in the the basic gates 
+    Error to be raised when the gate is not found in the the basic gates 
     '''
     def __init__(self, gate):
         self.message = f"{gate} not defined"
@@ -18,8 +18,129 @@ class GateReprError(Exception):
 #custom errors to be used
 class FloatingOutput(Exception):
     '''
-    Error to be raised from the gate is not found in the the basic gates 
+    Error to be raised when an output of a gate is floating
     '''
     def __init__(self, node_name):
         self.message = f"{node_name} is floating, no driver for output node is defined"
-        super().__init__(self.message)
\ No newline at end of file
+        super().__init__(self.message)
+
+class CirNotLevelized(Exception):
+    '''
+    Error to be raised if a function that requires levelized circuit is called
+    before the circuit is levelized
+    '''
+    def __init__(self):
+        self.message = f"Circuit is not levelized! Levelize circuit and try again"
+        super().__init__(self.message)
+
+class InputUndefined(Exception):
+    '''
+    This error is raised when a circuit is tried to simulated without input assignment
+    '''
+    def __init__(self, node):
+        self.message = f"{node.name} not assigned an input value"
+        super().__init__(self.message)
+
+class FaultBeforeFaultsite(Exception):
+    '''
+    This error is raised when a fault is detected before the fault site
+    '''
+    def __init__(self, fault, output):
+        self.message = f"Fault value of {output} observed before fault site {fault}"
+        super().__init__(self.message)
+
+class FaultReprError(Exception):
+    '''
+    This error is raised when the fault input from the user is not of the expected format
+    '''
+    def __init__(self, fault_input = None, fault_output = None, fault_type = None):
+        self.message = "Fault representaiton Error!"
+        if fault_input != None:
+            self.message = self.message + f"{fault_input} not a node in the circuit"
+        elif fault_output != None:
+            self.message = self.message + f"{fault_output} not a node in the circuit"
+        elif fault_type != None:
+            self.message = self.message + f"sa{fault_type} not a valid fault"
+        super().__init__(self.message)
+
+class ParentNodeControllabilityNA(Exception):
+    def __init__(self, node_name):
+        self.message = f"Node {node_name}'s controllability not available. Levelize circuit before doing scoap analysis"
+        super().__init__(self.message)
+
+class ValueNotBinary(Exception):
+    '''
+    This error is raised when a value other than 0 or 1 is used in a bit-parallel simulation
+    '''
+    def __init__(self, value):
+        self.message = f"Value {value} can not be packed, bit-parallel simulation supports only 0 and 1"
+        super().__init__(self.message)
+
+class NodeNotDefined(Exception):
+    '''
+    This error is raised when a node is used as a gate input but never declared in the circuit bench file
+    '''
+    def __init__(self, node_name):
+        self.message = f"{node_name} is used as a gate input but not defined"
+        super().__init__(self.message)
+
+class CombinationalCycle(Exception):
+    '''
+    This error is raised when the circuit can not be levelized because of a combinational cycle
+    '''
+    def __init__(self, node_names):
+        self.node_names = node_names
+        self.message = f"Combinational cycle through the nodes {', '.join(node_names)}"
+        super().__init__(self.message)
+
+class ValueNotEncodable(Exception):
+    '''
+    This error is raised when a node value can not be stored with the encoding of a result store
+    '''
+    def __init__(self, value, encoding):
+        self.message = f"Value {value} can not be stored with the {encoding} encoding"
+        super().__init__(self.message)
+
+class ServiceRequestError(Exception):
+    '''
+    This error is raised when a request to the simulation service is not valid or fails,
+    the client raises it with the message returned by the server
+    '''
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
+
+class RemoteHostRefused(Exception):
+    '''
+    This error is raised when the simulation service is asked to listen on an address other
+    than a loopback address without allowing remote clients
+    '''
+    def __init__(self, host):
+        self.message = f"Host '{host}' is not a loopback address, remote clients must be allowed explicitly"
+        super().__init__(self.message)
+
+class ValueNotThreeValued(Exception):
+    '''
+    This error is raised when a value other than 0, 1 or X is used in a three-valued bit-parallel simulation
+    '''
+    def __init__(self, value):
+        self.message = f"Value {value} can not be packed, three-valued simulation supports only 0, 1 and X"
+        super().__init__(self.message)
+
+class CacheDirNotPrivate(Exception):
+    '''
+    This error is raised when a cache directory is not owned by the current user or can be
+    written by other users, cache files found there could have been planted
+    '''
+    def __init__(self, cache_dir):
+        self.message = f"Cache directory {cache_dir} must be owned by the current user and not writable by others"
+        super().__init__(self.message)
+
+class SocketPathInUse(Exception):
+    '''
+    This error is raised when the simulation service is asked to listen on a path that
+    exists and is not a Unix socket, the file is left in place
+    '''
+    def __init__(self, socket_path):
+        self.message = f"{socket_path} exists and is not a Unix socket, it is not replaced"
+        super().__init__(self.message)
@@ -0,0 +1,164 @@
+from .circuit import *
+from .bit_parallel import *
+
+def gray_code_vectors(num_inputs):
+    '''
+    Generator streaming all the 2^num_inputs input vectors in Gray-code order, each
+    vector differs from the previous one in a single input. Yields (minterm, flipped
+    input, vector): bit j of minterm is the value of the j-th input, flipped input is
+    None for the first (all zero) vector. The same vector list is updated and yielded
+    at every step, copy it to keep it
+    '''
+    vector = [node_value.zero] * num_inputs
+    minterm = 0
+    yield minterm, None, vector
+    for step in range(1, 2 ** num_inputs):
+        #the input flipped at step k is the lowest set bit of k
+        flipped = (step & -step).bit_length() - 1
+        vector[flipped] ^= 1
+        minterm ^= 1 << flipped
+        yield minterm, flipped, vector
+
+def minterm_words(num_inputs):
+    '''
+    Returns the packed words of the inputs for all the 2^num_inputs minterms at once, bit m
+    of the j-th word is bit j of m. Simulating these words gives the truth tables of the nodes
+    '''
+    num_patterns = 2 ** num_inputs
+    all_ones = (1 << num_patterns) - 1
+    words = []
+    for j in range(num_inputs):
+        half = 1 << j
+        period = ((1 << half) - 1) << half #2^j zeros followed by 2^j ones
+        words.append(period * (all_ones // ((1 << (2 * half)) - 1)))
+    return words
+
+class truth_tables:
+    '''
+    Exhaustive truth tables of the outputs of a circuit, stored as packed bitsets. Every
+    output is enumerated over the inputs of its cone of influence only, outputs with the
+    same cone inputs share one enumeration, so an output stays tractable when the whole
+    circuit has too many inputs. Outputs whose cone has more than max_cone_inputs inputs
+    are skipped.
+
+    By default a cone is evaluated bit-sliced: every gate of the cone is evaluated once
+    over words holding all the minterms. With incremental set, the minterms are streamed
+    in Gray-code order through the event-driven simulation instead.
+
+    Attributes:
+    tables: Truth table of each output, keys are the output names. Bit m is the value of
+            the output when the j-th cone input is bit j of m
+    cone_inputs: Names of the inputs of the cone of each output, in the order of the input list
+    skipped: Outputs whose cone has too many inputs
+    '''
+
+    def __init__(self, circuit_under_test: circuit, max_cone_inputs = 20, incremental = False):
+        '''
+        Enumerates the cones of the outputs of a levelized circuit
+
+        param[in] circuit_under_test: Levelized circuit
+        param[in] max_cone_inputs: Largest number of cone inputs enumerated
+        param[in] incremental: Stream Gray-code vectors through the event-driven simulation
+        '''
+        if circuit_under_test.levelized_nodes == None:
+            raise CirNotLevelized()
+
+        self.circuit_under_test = circuit_under_test
+        self.tables = {}
+        self.cone_inputs = {}
+        self.skipped = []
+
+        input_position = {}
+        for k in range(len(circuit_under_test.input_list)):
+            input_position[circuit_under_test.input_list[k].name] = k
+
+        index = circuit_under_test.create_structural_index()
+        cones = {} #outputs of each set of cone inputs
+        for output_node in circuit_under_test.output_list:
+            cone = index.fanin_cone[index.position[circuit_under_test.node_index[output_node.name]]]
+            inputs = sorted([n for n in self.__cone_nodes(cone) if n.type == node_type.input_node],
+                            key = lambda n: input_position[n.name])
+            if len(inputs) > max_cone_inputs:
+                self.skipped.append(output_node.name)
+                continue
+            self.cone_inputs[output_node.name] = [n.name for n in inputs]
+            key = tuple(self.cone_inputs[output_node.name])
+            if key not in cones:
+                cones[key] = [inputs, 0, []]
+            cones[key][1] |= cone
+            cones[key][2].append(output_node)
+
+        for inputs, cone, outputs in cones.values():
+            if incremental:
+                self.__enumerate_incremental(inputs, outputs)
+            else:
+                self.__enumerate_bit_sliced(inputs, self.__cone_nodes(cone), outputs)
+
+    def __cone_nodes(self, cone):
+        '''
+        Returns the nodes of a cone bitset of the structural index, in the ascending order of levels
+        '''
+        nodes = self.circuit_under_test.nodes
+        return [nodes[i] for i in self.circuit_under_test.create_structural_index().cone_indices(cone)]
+
+    def __enumerate_bit_sliced(self, inputs, cone, outputs):
+        '''
+        Evaluates the gates of the cone, given in the order of levels, over the minterm words
+        '''
+        mask = (1 << (2 ** len(inputs))) - 1
+        words = {}
+        input_words = minterm_words(len(inputs))
+        for j in range(len(inputs)):
+            words[inputs[j]] = input_words[j]
+
+        for n in cone:
+            if n.gate != None:
+                words[n] = word_gate_function[n.gate.type]([words[i] for i in n.gate.input_nodes], mask)
+
+        for output_node in outputs:
+            self.tables[output_node.name] = words[output_node]
+
+    def __enumerate_incremental(self, inputs, outputs):
+        '''
+        Streams the minterms in Gray-code order through the event-driven simulation, only
+        the fanout of the flipped input is evaluated at every step. The inputs outside
+        the cone are set to 0
+        '''
+        c = self.circuit_under_test
+        c.reset_circuit()
+        input_vector = {}
+        for n in c.input_list:
+            input_vector[n.name] = node_value.zero
+        tables = [0] * len(outputs)
+
+        for minterm, flipped, vector in gray_code_vectors(len(inputs)):
+            if flipped == None:
+                c.simulate_event_driven(input_vector)
+            else:
+                c.simulate_event_driven({inputs[flipped].name: vector[flipped]})
+            for k in range(len(outputs)):
+                if outputs[k].value == node_value.one:
+                    tables[k] |= 1 << minterm
+
+        for k in range(len(outputs)):
+            self.tables[outputs[k].name] = tables[k]
+
+    def evaluate(self, output_name, input_vector):
+        '''
+        Returns the value of an output from its truth table, input_vector is a dictionary
+        with the input node names as the keys, only the cone inputs are needed
+        '''
+        minterm = 0
+        for j in range(len(self.cone_inputs[output_name])):
+            if input_vector[self.cone_inputs[output_name][j]] == node_value.one:
+                minterm |= 1 << j
+        return (self.tables[output_name] >> minterm) & 1
+
+    def write(self, file_name):
+        '''
+        Writes the truth tables, one output per line: the output name, the cone inputs
+        separated by commas and the truth table in hexadecimal
+        '''
+        with open(file_name, "w") as f:
+            for output_name in self.tables:
+                f.write(f"{output_name} {','.join(self.cone_inputs[output_name])} {self.tables[output_name]:x}\n")
@@ -0,0 +1,249 @@
+from .circuit import *
+from .fault_simulation import fault_simulator
+
+#equivalent (input fault, output fault) pairs of each gate type
+equivalent_faults = {gate_type.AND_gate : [(fault_types.sa0, fault_types.sa0)],
+                     gate_type.NAND_gate: [(fault_types.sa0, fault_types.sa1)],
+                     gate_type.OR_gate  : [(fault_types.sa1, fault_types.sa1)],
+                     gate_type.NOR_gate : [(fault_types.sa1, fault_types.sa0)],
+                     gate_type.NOT_gate : [(fault_types.sa0, fault_types.sa1), (fault_types.sa1, fault_types.sa0)],
+                     gate_type.BUFF_gate: [(fault_types.sa0, fault_types.sa0), (fault_types.sa1, fault_types.sa1)],
+                     gate_type.XOR_gate : [],
+                     gate_type.XNOR_gate: []}
+
+#(input fault, output fault) of each gate type where the output fault dominates the input fault
+dominant_faults = {gate_type.AND_gate : (fault_types.sa1, fault_types.sa1),
+                   gate_type.NAND_gate: (fault_types.sa1, fault_types.sa0),
+                   gate_type.OR_gate  : (fault_types.sa0, fault_types.sa0),
+                   gate_type.NOR_gate : (fault_types.sa0, fault_types.sa1)}
+
+class fault_universe:
+    '''
+    This class numbers all the faults of a circuit with dense integer IDs and collapses
+    them using gate-level fault equivalence and, optionally, fault dominance.
+
+    Fault IDs follow the order of the nodes list, sa0 faults before sa1 faults, which
+    is also the order used by fault_simulator, so the IDs can be passed to it directly.
+
+    Attributes:
+    faults: All the faults of the circuit, indexed by fault ID(fault)
+    fault_index: ID of each fault, keys are the fault strings
+    representative: ID of the representative of the equivalence class of each fault
+    collapsed_ids: IDs of the faults left after collapsing(int)
+    dominated_by: Representatives whose detection implies the detection of a class
+                  dropped by dominance, keys are the representatives of the dropped classes
+    '''
+
+    def __init__(self, circuit_under_test: circuit, dominance = False):
+        '''
+        Builds the fault universe of a levelized circuit
+
+        param[in] circuit_under_test: Levelized circuit
+        param[in] dominance: Drop the faults dominating another fault as well
+        '''
+        circuit_under_test.create_fault_list()
+        self.circuit_under_test = circuit_under_test
+        self.faults = []
+        self.fault_index = {}
+
+        for n in circuit_under_test.nodes:
+            for f_type in [fault_types.sa0, fault_types.sa1]:
+                for f in n.fault_list[f_type]:
+                    self.fault_index[f.fault_string] = len(self.faults)
+                    self.faults.append(f)
+
+        self.__parent = list(range(len(self.faults)))
+        self.__collapse_equivalent_faults()
+
+        self.representative = [self.__find(i) for i in range(len(self.faults))]
+        self.num_equivalence_classes = len(set(self.representative))
+
+        self.dominated_by = {}
+        if dominance:
+            self.__collapse_dominant_faults()
+
+        self.collapsed_ids = [i for i in range(len(self.faults))
+                              if (self.representative[i] == i) and (i not in self.dominated_by)]
+
+    def __find(self, fault_id):
+        '''
+        Returns the representative of the class of the fault
+        '''
+        while self.__parent[fault_id] != fault_id:
+            self.__parent[fault_id] = self.__parent[self.__parent[fault_id]]
+            fault_id = self.__parent[fault_id]
+        return fault_id
+
+    def __union(self, fault_id_1, fault_id_2):
+        '''
+        Merges the classes of two faults, the smaller ID is kept as the representative
+        '''
+        root_1 = self.__find(fault_id_1)
+        root_2 = self.__find(fault_id_2)
+        if root_1 < root_2:
+            self.__parent[root_2] = root_1
+        elif root_2 < root_1:
+            self.__parent[root_1] = root_2
+
+    def __stem_fault(self, n, f_type):
+        '''
+        Returns the ID of the stem fault of a node
+        '''
+        return self.fault_index[n.fault_list[f_type][0].fault_string]
+
+    def __branch_fault(self, n, output_node, f_type):
+        '''
+        Returns the ID of the fault on the branch from node n to the gate of output_node
+        '''
+        for f in n.fault_list[f_type]:
+            if isinstance(f.fault_output, node) and (f.fault_output is output_node):
+                return self.fault_index[f.fault_string]
+        return None
+
+    def __collapse_equivalent_faults(self):
+        '''
+        Merges the equivalent faults of every gate and the stem and branch faults of
+        nodes with a single fanout
+        '''
+        for n in self.circuit_under_test.nodes:
+            if n.gate != None:
+                for input_node in n.gate.input_nodes:
+                    for input_type, output_type in equivalent_faults[n.gate.type]:
+                        self.__union(self.__branch_fault(input_node, n, input_type),
+                                     self.__stem_fault(n, output_type))
+
+            if len(n.fanout_nodes) != 1:
+                continue
+
+            for f_type in [fault_types.sa0, fault_types.sa1]:
+                branch = self.__branch_fault(n, n.fanout_nodes[0], f_type)
+                if (n.type == node_type.output_node) or n.input_is_output:
+                    #the stem is observed at the output, only the "out" pseudo-branch
+                    #is read by the single fanout gate alone
+                    for f in n.fault_list[f_type]:
+                        if isinstance(f.fault_output, str):
+                            self.__union(self.fault_index[f.fault_string], branch)
+                else:
+                    self.__union(self.__stem_fault(n, f_type), branch)
+
+    def __collapse_dominant_faults(self):
+        '''
+        Drops the class of the output fault of a gate whose detection is implied by the
+        detection of an input fault, as long as the class of that input fault is kept
+        '''
+        for level in self.circuit_under_test.levelized_nodes:
+            for n in self.circuit_under_test.levelized_nodes[level]:
+                if (n.gate == None) or (n.gate.type not in dominant_faults) or (n.gate.num_inputs < 2):
+                    continue
+
+                input_type, output_type = dominant_faults[n.gate.type]
+                output_class = self.representative[self.__stem_fault(n, output_type)]
+                if output_class in self.dominated_by:
+                    continue
+
+                input_classes = []
+                for input_node in n.gate.input_nodes:
+                    input_class = self.representative[self.__branch_fault(input_node, n, input_type)]
+                    if (input_class != output_class) and (input_class not in input_classes):
+                        input_classes.append(input_class)
+
+                for input_class in input_classes:
+                    if input_class not in self.dominated_by:
+                        self.dominated_by[output_class] = input_classes
+                        break
+
+    @property
+    def num_faults(self):
+        '''
+        Number of faults before collapsing
+        '''
+        return len(self.faults)
+
+    @property
+    def num_collapsed(self):
+        '''
+        Number of faults after collapsing
+        '''
+        return len(self.collapsed_ids)
+
+    def get_fault_id(self, key):
+        '''
+        Returns the ID of a fault given its ID or its fault string
+        '''
+        if isinstance(key, str):
+            if key not in self.fault_index:
+                raise FaultReprError(fault_input = key)
+            return self.fault_index[key]
+        return key
+
+    def get_fault(self, key):
+        '''
+        Returns the fault object given its ID or its fault string
+        '''
+        return self.faults[self.get_fault_id(key)]
+
+    def select_fault(self, key):
+        '''
+        Selects a fault in the circuit given its ID or its fault string
+        '''
+        self.circuit_under_test.select_fault_object(self.get_fault(key))
+
+    def expand(self, results, iv_list = None, simulator: fault_simulator = None):
+        '''
+        Expands detection results of the collapsed faults to the full fault list. results
+        is a dictionary with the collapsed fault IDs as keys and True if the fault is
+        detected. Returns a dictionary with all the fault strings as keys.
+
+        A fault dropped by dominance is reported as detected if any fault it dominates is
+        detected. Otherwise it was never simulated: if iv_list, the input vectors that
+        gave the results, is given the remaining dropped faults are fault simulated with
+        these vectors, else they are reported as not detected and the coverage of the
+        expanded results is only a lower bound
+
+        param[in] results: Detection of the collapsed faults, keys are the fault IDs
+        param[in] iv_list: Input vectors the results were obtained with
+        param[in] simulator: Fault simulator of the circuit, created if not given
+        '''
+        class_detected = {}
+
+        def is_detected(fault_class):
+            if fault_class in class_detected:
+                return class_detected[fault_class]
+            if fault_class in self.dominated_by:
+                class_detected[fault_class] = False
+                for dominated_class in self.dominated_by[fault_class]:
+                    if is_detected(dominated_class):
+                        class_detected[fault_class] = True
+                        break
+            else:
+                class_detected[fault_class] = bool(results.get(fault_class, False))
+            return class_detected[fault_class]
+
+        for fault_class in self.dominated_by:
+            is_detected(fault_class)
+
+        if iv_list:
+            #dropped faults not implied by a detected fault, the IDs of the representatives
+            #are the fault IDs of the fault simulator
+            undetected = [c for c in self.dominated_by if not class_detected[c]]
+            if undetected:
+                if simulator == None:
+                    simulator = fault_simulator(self.circuit_under_test)
+                detection = simulator.simulate(iv_list, undetected)
+                for fault_class in undetected:
+                    class_detected[fault_class] = detection[fault_class] != 0
+
+        expanded = {}
+        for i in range(len(self.faults)):
+            expanded[self.faults[i].fault_string] = is_detected(self.representative[i])
+
+        return expanded
+
+    def print_summary(self):
+        '''
+        Prints the number of faults before and after collapsing
+        '''
+        print("Total number of faults: ", self.num_faults)
+        print("Number of faults after equivalence collapsing: ", self.num_equivalence_classes)
+        print("Number of faults after collapsing: ", self.num_collapsed)
+        print("Collapse ratio: {}".format(round(self.num_collapsed / self.num_faults, 3)))
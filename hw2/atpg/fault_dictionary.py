@@ -0,0 +1,256 @@
+import zlib
+import heapq
+from array import array
+from collections import Counter
+from itertools import chain
+from .circuit import *
+from .fault_simulation import *
+
+class fault_dictionary:
+    '''
+    Fault dictionary of a test set, used to diagnose a failing circuit from the outputs
+    that failed on the tester. Every fault is fault simulated once against all the test
+    vectors, keeping the outputs showing D or D' for every vector.
+
+    Two signatures are kept per fault:
+    pass/fail: bit t is set if the t-th vector detects the fault at any output (int)
+    full response: bit o * num_vectors + t is set if the o-th output fails for the t-th
+                   vector, stored compressed with zlib (bytes)
+
+    Faults with the same full response can not be told apart by the test set and form a
+    class, the classes are indexed by the hash of their full response. Classes are ranked
+    by the number of (vector, output) results that differ from the observed ones:
+    failures(class) + failures(observed) - 2 * failures in common. The classes failing at
+    each (vector, output) are kept in an inverted index, so the failures in common are
+    counted only for the classes sharing a failure with the observed response, without
+    decompressing any response. The other classes are ranked by their number of failures
+    alone and are looked at in its ascending order.
+
+    Attributes:
+    fault_strings: Fault strings of the faults in the dictionary
+    output_names: Names of the outputs, in the order of the output list
+    num_vectors: Number of test vectors
+    pass_fail: Pass/fail signature of each fault, in the order of fault_strings
+    fault_class: Class of each fault, in the order of fault_strings
+    class_faults: Indices in fault_strings of the faults of each class
+    responses: Compressed full response of each class
+    num_failures: Number of failing (vector, output) results of each class
+    '''
+
+    def __init__(self, circuit_under_test: circuit, iv_list, fault_ids = None, block_size = 64,
+                 simulator: fault_simulator = None):
+        '''
+        Builds the dictionary of a levelized circuit
+
+        param[in] circuit_under_test: Levelized circuit
+        param[in] iv_list: Test vectors, only 0 and 1 are supported
+        param[in] fault_ids: Indices of the faults in the fault simulator, all the faults if not given
+        param[in] block_size: Number of vectors fault simulated at once
+        param[in] simulator: Fault simulator of the circuit, created if not given
+        '''
+        if simulator == None:
+            simulator = fault_simulator(circuit_under_test)
+        if fault_ids == None:
+            fault_ids = range(len(simulator.fault_strings))
+        fault_ids = list(fault_ids)
+
+        self.fault_strings = [simulator.fault_strings[f] for f in fault_ids]
+        self.fault_index = {}
+        for k in range(len(self.fault_strings)):
+            self.fault_index[self.fault_strings[k]] = k
+        self.output_names = [n.name for n in circuit_under_test.output_list]
+        self.output_position = {}
+        for o in range(len(self.output_names)):
+            self.output_position[self.output_names[o]] = o
+        self.num_vectors = len(iv_list)
+
+        #detection words of every fault per output, only for the outputs that fail
+        output_words = [{} for f in fault_ids]
+        for start in range(0, self.num_vectors, block_size):
+            good, mask = simulator.good_simulation(iv_list[start:start + block_size])
+            for k in range(len(fault_ids)):
+                words = simulator.simulate_fault_outputs(fault_ids[k], good, mask)
+                for o in range(len(words)):
+                    if words[o]:
+                        output_words[k][o] = output_words[k].get(o, 0) | (words[o] << start)
+
+        self.pass_fail = []
+        self.fault_class = []
+        self.class_faults = []
+        self.responses = []
+        self.num_failures = array("i")
+        self.__class_pass_fail = [] #pass/fail signature of each class
+        self.__response_index = {} #classes of each hash of the full response
+        self.__failing_classes = {} #classes failing at each bit of the full response
+        for k in range(len(fault_ids)):
+            pass_fail = 0
+            for word in output_words[k].values():
+                pass_fail |= word
+            self.pass_fail.append(pass_fail)
+
+            key = self.__response_key(output_words[k])
+            response = self.__compress(output_words[k])
+            fault_class = None
+            for c in self.__response_index.get(key, ()):
+                if self.responses[c] == response:
+                    fault_class = c
+            if fault_class == None:
+                fault_class = len(self.responses)
+                self.__response_index.setdefault(key, []).append(fault_class)
+                self.responses.append(response)
+                self.class_faults.append([])
+                self.__class_pass_fail.append(pass_fail)
+                num_failures = 0
+                for o, word in output_words[k].items():
+                    num_failures += word.bit_count()
+                    for vector in self.__vectors(word):
+                        self.__failing_classes.setdefault(o * self.num_vectors + vector, []).append(fault_class)
+                self.num_failures.append(num_failures)
+            output_words[k] = None
+            self.fault_class.append(fault_class)
+            self.class_faults[fault_class].append(k)
+
+        #classes in the ascending order of their number of failures
+        self.__by_failures = sorted(range(len(self.responses)), key = lambda c: self.num_failures[c])
+
+    def __vectors(self, word):
+        '''
+        Returns the indices of the vectors whose bit is set in the word
+        '''
+        vectors = []
+        while word:
+            vectors.append((word & -word).bit_length() - 1)
+            word &= word - 1
+        return vectors
+
+    def __response_key(self, output_words):
+        '''
+        Returns the hash of the full response given as the detection words of the failing outputs
+        '''
+        return hash(tuple(sorted(output_words.items())))
+
+    def __full_response(self, output_words):
+        '''
+        Returns the full response from the detection words of the failing outputs
+        '''
+        response = 0
+        for o in output_words:
+            response |= output_words[o] << (o * self.num_vectors)
+        return response
+
+    def __compress(self, output_words):
+        '''
+        Returns the compressed full response from the detection words of the failing outputs
+        '''
+        response = self.__full_response(output_words)
+        return zlib.compress(response.to_bytes((len(self.output_names) * self.num_vectors + 7) // 8, "little"))
+
+    def __decompress(self, response):
+        '''
+        Returns the full response as an int
+        '''
+        return int.from_bytes(zlib.decompress(response), "little")
+
+    def __observed_bits(self, failures):
+        '''
+        Returns the bits of the full response set by the failures given to diagnose and the
+        pass/fail signature of the failures
+        '''
+        bits = set()
+        pass_fail = 0
+        for vector in failures:
+            if (vector < 0) or (vector >= self.num_vectors):
+                raise ValueError(f"Vector {vector} is not in the test set of {self.num_vectors} vectors")
+            for output_name in failures[vector]:
+                bits.add(self.output_position[output_name] * self.num_vectors + vector)
+                pass_fail |= 1 << vector
+        return bits, pass_fail
+
+    def diagnose(self, failures, max_candidates = 10):
+        '''
+        Returns the classes of faults explaining the observed failures best, as a list of
+        (fault strings, vector mismatches, output mismatches) in the ascending order of output
+        mismatches, then of vector mismatches. Vector mismatches is the number of vectors whose
+        pass/fail result differs, output mismatches the number of (vector, output) results that
+        differ. A class with the same full response comes first, followed by the next best
+        classes since a missing or extra failure on the tester can match another fault exactly.
+
+        The failures in common with the observed ones are counted with the inverted index for
+        the classes sharing a failure. A class sharing none has output mismatches equal to its
+        number of failures plus the observed ones, so these classes are taken in the ascending
+        order of their number of failures until they can not beat the max_candidates-th class
+
+        param[in] failures: Dictionary with the index of the failing vectors as the keys and
+                            the names of the failing outputs as values, vectors not given passed
+        param[in] max_candidates: Largest number of classes returned
+        '''
+        bits, observed_pass_fail = self.__observed_bits(failures)
+        num_observed = len(bits)
+        failing_classes = self.__failing_classes
+        common = Counter(chain.from_iterable([failing_classes[b] for b in bits if b in failing_classes]))
+
+        num_failures = self.num_failures
+        mismatches = [(num_failures[c] + num_observed - 2 * n, c) for c, n in common.items()]
+        best = heapq.nsmallest(max_candidates, mismatches)
+        cutoff = best[-1][0] if len(best) == max_candidates else None
+        candidates = [m for m in mismatches if (cutoff == None) or (m[0] <= cutoff)]
+
+        #classes without a failure in common, in the ascending order of their mismatches
+        found = len(best)
+        for c in self.__by_failures:
+            output_mismatches = num_failures[c] + num_observed
+            if (cutoff != None) and (output_mismatches > cutoff):
+                break
+            if c in common:
+                continue
+            candidates.append((output_mismatches, c))
+            found += 1
+            if (found >= max_candidates) and ((cutoff == None) or (output_mismatches < cutoff)):
+                cutoff = heapq.nsmallest(max_candidates, candidates)[-1][0]
+
+        class_pass_fail = self.__class_pass_fail
+        ranked = sorted((output_mismatches, (class_pass_fail[c] ^ observed_pass_fail).bit_count(), c)
+                        for output_mismatches, c in candidates)
+        return [([self.fault_strings[k] for k in self.class_faults[c]], vector_mismatches, output_mismatches)
+                for output_mismatches, vector_mismatches, c in ranked[:max_candidates]]
+
+    def response(self, fault_string):
+        '''
+        Returns the failures of the fault in the format of diagnose
+        '''
+        k = self.fault_index[fault_string]
+        response = self.__decompress(self.responses[self.fault_class[k]])
+        failures = {}
+        vector_mask = (1 << self.num_vectors) - 1
+        for o in range(len(self.output_names)):
+            word = (response >> (o * self.num_vectors)) & vector_mask
+            while word:
+                vector = (word & -word).bit_length() - 1
+                failures.setdefault(vector, []).append(self.output_names[o])
+                word &= word - 1
+        return dict(sorted(failures.items()))
+
+    def equivalent_faults(self, fault_string):
+        '''
+        Returns the faults with the same full response as the fault, the fault included
+        '''
+        fault_class = self.fault_class[self.fault_index[fault_string]]
+        return [self.fault_strings[k] for k in self.class_faults[fault_class]]
+
+    @property
+    def num_bytes(self):
+        '''
+        Size of the compressed full responses
+        '''
+        return sum(len(response) for response in self.responses)
+
+    def print_summary(self):
+        '''
+        Prints the size and the diagnostic resolution of the dictionary
+        '''
+        num_distinguished = sum(1 for faults in self.class_faults if len(faults) == 1)
+        print(f"Faults: {len(self.fault_strings)}, test vectors: {self.num_vectors}, outputs: {len(self.output_names)}")
+        print(f"Full response classes: {len(self.responses)}, pass/fail classes: {len(set(self.__class_pass_fail))}")
+        print(f"Faults distinguished from all the others: {num_distinguished}")
+        print(f"Largest class: {max([len(faults) for faults in self.class_faults] + [0])} faults")
+        print(f"Compressed full responses: {self.num_bytes} bytes")
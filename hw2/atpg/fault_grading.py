@@ -0,0 +1,203 @@
+from .circuit import *
+from .fault_simulation import *
+from .parallel_fault_simulation import *
+
+class fault_grading_session:
+    '''
+    Grades a test set against the full fault list of a circuit. Input vectors are
+    fault simulated in blocks and a fault is dropped as soon as a vector detects it,
+    so it is never simulated again.
+
+    Attributes:
+    simulator: Fault simulator of the circuit(fault_simulator or parallel_fault_simulator)
+    first_detection: Index of the first input vector detecting each fault, None if not detected
+    coverage_curve: List of (number of input vectors applied, percentage of faults detected)
+    num_vectors: Number of input vectors applied
+    num_detected: Number of faults detected
+    '''
+
+    def __init__(self, circuit_under_test: circuit, block_size = 64, target_coverage = None, max_undetected = None,
+                 num_workers = 1):
+        '''
+        Creates a fault grading session
+
+        param[in] circuit_under_test: Levelized circuit
+        param[in] block_size: Number of input vectors fault simulated at once
+        param[in] target_coverage: Stop once this percentage of faults is detected
+        param[in] max_undetected: Stop once at most this many faults are undetected
+        param[in] num_workers: Number of worker processes fault simulating the blocks,
+                               None for the number of CPUs. Call close when done
+        '''
+        if num_workers == 1:
+            self.simulator = fault_simulator(circuit_under_test)
+        else:
+            self.simulator = parallel_fault_simulator(circuit_under_test, num_workers)
+        self.block_size = block_size
+        self.target_coverage = target_coverage
+        self.max_undetected = max_undetected
+
+        self.num_faults = len(self.simulator.fault_strings)
+        self.first_detection = [None] * self.num_faults
+        self.undetected = list(range(self.num_faults))
+        self.coverage_curve = []
+        self.num_vectors = 0
+        self.num_detected = 0
+        self.__pending = []
+
+    @property
+    def coverage(self):
+        '''
+        Percentage of faults detected so far
+        '''
+        if self.num_faults == 0:
+            return 100.0
+        return (self.num_detected / self.num_faults) * 100
+
+    @property
+    def done(self):
+        '''
+        True if the target coverage or the undetected fault budget is reached
+        '''
+        if len(self.undetected) == 0:
+            return True
+        if (self.target_coverage != None) and (self.coverage >= self.target_coverage):
+            return True
+        if (self.max_undetected != None) and (len(self.undetected) <= self.max_undetected):
+            return True
+        return False
+
+    def apply(self, input_vector):
+        '''
+        Adds an input vector to the session. Input vectors are buffered and fault
+        simulated once a block is full. Returns the coverage curve points of the
+        simulated block, an empty list if nothing was simulated
+        '''
+        if self.done:
+            return []
+
+        self.__pending.append(input_vector)
+        if len(self.__pending) < self.block_size:
+            return []
+        return self.flush()
+
+    def flush(self):
+        '''
+        Fault simulates the buffered input vectors. Returns the coverage curve points
+        of the block
+        '''
+        iv_list = self.__pending
+        self.__pending = []
+        if (len(iv_list) == 0) or self.done:
+            return []
+
+        detection = self.simulator.simulate(iv_list, self.undetected)
+
+        #number of new faults detected by each input vector of the block
+        new_detections = [0] * len(iv_list)
+        undetected = []
+        for fault_id in self.undetected:
+            word = detection[fault_id]
+            if word:
+                pattern = (word & -word).bit_length() - 1
+                self.first_detection[fault_id] = self.num_vectors + pattern
+                new_detections[pattern] += 1
+            else:
+                undetected.append(fault_id)
+
+        curve = []
+        num_undetected = len(self.undetected)
+        for pattern in range(len(iv_list)):
+            self.num_vectors += 1
+            self.num_detected += new_detections[pattern]
+            num_undetected -= new_detections[pattern]
+            curve.append((self.num_vectors, self.coverage))
+            if self.__target_reached(num_undetected):
+                #the rest of the block is not needed, drop the detections it made
+                for fault_id in self.undetected:
+                    if (self.first_detection[fault_id] != None) and (self.first_detection[fault_id] >= self.num_vectors):
+                        self.first_detection[fault_id] = None
+                        undetected.append(fault_id)
+                break
+
+        self.undetected = undetected
+        self.coverage_curve.extend(curve)
+        return curve
+
+    def close(self):
+        '''
+        Stops the worker processes of a session with more than one worker
+        '''
+        if isinstance(self.simulator, parallel_fault_simulator):
+            self.simulator.close()
+
+    def __target_reached(self, num_undetected):
+        '''
+        Checks the stop conditions for the given number of undetected faults
+        '''
+        if num_undetected == 0:
+            return True
+        if (self.target_coverage != None) and \
+           (((self.num_faults - num_undetected) / self.num_faults) * 100 >= self.target_coverage):
+            return True
+        if (self.max_undetected != None) and (num_undetected <= self.max_undetected):
+            return True
+        return False
+
+    def grade(self, iv_iterable):
+        '''
+        Applies the input vectors from any iterable, stopping early once done. This is a
+        generator yielding the coverage curve points (number of input vectors applied,
+        percentage of faults detected) as the blocks are simulated
+        '''
+        for iv in iv_iterable:
+            for point in self.apply(iv):
+                yield point
+            if self.done:
+                return
+
+        for point in self.flush():
+            yield point
+
+    def run(self, iv_iterable):
+        '''
+        Applies all the input vectors and returns the coverage
+        '''
+        for point in self.grade(iv_iterable):
+            pass
+        return self.coverage
+
+    def detected_faults(self):
+        '''
+        Returns a dictionary with the detected fault strings as keys and the index of the
+        first input vector detecting the fault as values
+        '''
+        results = {}
+        for fault_id in range(self.num_faults):
+            if self.first_detection[fault_id] != None:
+                results[self.simulator.fault_strings[fault_id]] = self.first_detection[fault_id]
+        return results
+
+    def undetected_faults(self):
+        '''
+        Returns the list of fault strings not detected so far
+        '''
+        return [self.simulator.fault_strings[fault_id] for fault_id in self.undetected]
+
+    def print_coverage_curve(self, step = 1):
+        '''
+        Prints the coverage curve, every step-th point and the last point are printed
+        '''
+        print("| Vectors | Coverage(%) |")
+        for i in range(len(self.coverage_curve)):
+            if (i % step == 0) or (i == len(self.coverage_curve) - 1):
+                num_vectors, coverage = self.coverage_curve[i]
+                print("| {:>7} | {:>11.2f} |".format(num_vectors, coverage))
+
+    def print_summary(self):
+        '''
+        Prints the summary of the session
+        '''
+        print("Total number of faults: ", self.num_faults)
+        print("Total number of vectors applied: ", self.num_vectors)
+        print("Total number of faults detected: ", self.num_detected)
+        print("Percentage of faults detected: {}%".format(self.coverage))
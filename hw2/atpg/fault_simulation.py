@@ -0,0 +1,294 @@
+import heapq
+import time
+from .circuit import *
+from .bit_parallel import *
+
+#kind of the fault site, used by the fault simulator
+stem_fault = -1
+out_fault = -2
+
+class fault_simulator:
+    '''
+    Parallel-pattern single-fault propagation (PPSFP) fault simulator. The good
+    machine is simulated once for a block of input vectors using packed words, then
+    every fault is injected and only the difference from the good machine is
+    propagated through the fanout cone of the fault site.
+
+    The simulator only keeps node indices and gate types, the fault objects of the
+    circuit are referred to by their position in fault_strings.
+
+    Attributes:
+    fault_strings: Fault strings of all the faults in the circuit(string)
+    fault_index: Index of each fault in fault_strings, keys are the fault strings
+    input_index: Index of the input nodes in the nodes list(int)
+    output_index: Index of the output nodes in the nodes list(int)
+    observable: True for the faults whose site reaches a primary output, in the order of fault_strings
+    profile: Profile filled by simulate_fault, None when profiling is disabled
+    '''
+
+    def __init__(self, circuit_under_test: circuit):
+        '''
+        Creates the fault simulator from a levelized circuit
+
+        param[in] circuit_under_test: Levelized circuit
+        '''
+        if circuit_under_test.levelized_nodes == None:
+            raise CirNotLevelized()
+        circuit_under_test.create_fault_list()
+
+        node_index = circuit_under_test.node_index
+        num_nodes = len(circuit_under_test.nodes)
+
+        self.input_index = [node_index[n.name] for n in circuit_under_test.input_list]
+        self.output_index = [node_index[n.name] for n in circuit_under_test.output_list]
+        self.level = [0] * num_nodes
+        self.gate_type = [None] * num_nodes
+        self.fanin = [()] * num_nodes
+        self.fanout = [[node_index[f.name] for f in n.fanout_nodes] for n in circuit_under_test.nodes]
+        self.schedule = []
+
+        for n in circuit_under_test.schedule:
+            i = node_index[n.name]
+            self.level[i] = n.level
+            if n.level == 0:
+                continue
+            self.gate_type[i] = n.gate.type
+            self.fanin[i] = tuple(node_index[input_node.name] for input_node in n.gate.input_nodes)
+            self.schedule.append((i, n.gate.type, self.fanin[i]))
+
+        #every fault is stored as (site, fault type, kind), kind is the index of the
+        #gate reading the faulty branch, stem_fault or out_fault
+        self.faults = []
+        self.fault_strings = []
+        self.fault_index = {}
+        for n in circuit_under_test.nodes:
+            for f_type in [fault_types.sa0, fault_types.sa1]:
+                for f in n.fault_list[f_type]:
+                    if f.fault_output == None:
+                        kind = stem_fault
+                    elif isinstance(f.fault_output, str):
+                        kind = out_fault
+                    else:
+                        kind = node_index[f.fault_output.name]
+                    self.fault_index[f.fault_string] = len(self.faults)
+                    self.faults.append((node_index[n.name], f_type, kind))
+                    self.fault_strings.append(f.fault_string)
+
+        #faults whose site reaches no output are never detected and are not propagated
+        index = circuit_under_test.create_structural_index()
+        position = index.position
+        self.observable = []
+        for site, f_type, kind in self.faults:
+            reader = site if kind in [stem_fault, out_fault] else kind
+            self.observable.append(index.reachable_outputs[position[reader]] != 0)
+
+        self.profile = None
+
+    def enable_profiling(self, profile: simulation_profile = None):
+        '''
+        Starts filling a profile in simulate_fault, a new profile is created if not given.
+        Returns the profile. Worker processes of parallel_fault_simulator keep their own copy
+        of the simulator, so only serial simulations are profiled
+        '''
+        if profile == None:
+            profile = simulation_profile("fault simulation")
+        self.profile = profile
+        return profile
+
+    def disable_profiling(self):
+        '''
+        Stops profiling, returns the profile that was filled
+        '''
+        profile = self.profile
+        self.profile = None
+        return profile
+
+    def good_simulation(self, iv_list):
+        '''
+        Simulates the good machine for all the input vectors in iv_list at once.
+        Returns the packed words of all the nodes and the mask of the block
+        '''
+        return self.good_simulation_words(pack_input_vectors(iv_list, len(self.input_index)), len(iv_list))
+
+    def good_simulation_words(self, input_words, num_patterns):
+        '''
+        Same as good_simulation for input vectors already packed, one word per input in
+        the order of the input list (see pack_input_vectors)
+        '''
+        mask = (1 << num_patterns) - 1
+        words = [0] * len(self.level)
+        for i in range(len(self.input_index)):
+            words[self.input_index[i]] = input_words[i] & mask
+
+        for output_index, g_type, input_index in self.schedule:
+            words[output_index] = word_gate_function[g_type]([words[i] for i in input_index], mask)
+
+        return words, mask
+
+    def simulate_fault(self, fault_id, good, mask):
+        '''
+        Injects the fault and propagates the faulty values through the fanout cone
+        of the fault site. Returns the detection word, bit i is set if the fault is
+        detected by the i-th input vector of the block
+
+        param[in] fault_id: Index of the fault in fault_strings
+        param[in] good: Packed words of the good machine simulation
+        param[in] mask: Mask of the block
+        '''
+        if self.profile == None:
+            faulty = self.__propagate(fault_id, good, mask)
+        else:
+            faulty = self.__propagate_profiled(fault_id, good, mask)
+        detected = 0
+        for o in self.output_index:
+            if o in faulty:
+                detected |= faulty[o] ^ good[o]
+
+        return detected
+
+    def simulate_fault_outputs(self, fault_id, good, mask):
+        '''
+        Same as simulate_fault, but returns the detection word of every output, in the
+        order of the output list. Bit i of the word of an output is set if the output
+        shows D or D' for the i-th input vector of the block
+        '''
+        faulty = self.__propagate(fault_id, good, mask)
+        return [(faulty[o] ^ good[o]) if o in faulty else 0 for o in self.output_index]
+
+    def __inject(self, fault_id, good, mask):
+        '''
+        Returns the injection of an observable fault as (site, stuck word, faulty words,
+        gates reading the faulty branch, gates evaluated first), None if the fault is not
+        activated by any of the input vectors
+        '''
+        site, f_type, kind = self.faults[fault_id]
+        stuck_word = 0 if f_type == fault_types.sa0 else mask
+        if stuck_word == good[site]:
+            return None
+
+        faulty = {}
+        if kind == stem_fault:
+            faulty[site] = stuck_word
+            faulty_readers = ()
+            start_gates = self.fanout[site]
+        elif kind == out_fault:
+            faulty_readers = self.fanout[site]
+            start_gates = faulty_readers
+        else:
+            faulty_readers = (kind,)
+            start_gates = faulty_readers
+
+        return site, stuck_word, faulty, faulty_readers, start_gates
+
+    def __propagate(self, fault_id, good, mask):
+        '''
+        Injects the fault and returns the faulty words of the nodes whose value differs
+        from the good machine for some input vector of the block, keys are the node indices
+        '''
+        if not self.observable[fault_id]:
+            return {}
+        injection = self.__inject(fault_id, good, mask)
+        if injection == None:
+            return {}
+        site, stuck_word, faulty, faulty_readers, start_gates = injection
+
+        gate_type = self.gate_type
+        fanin = self.fanin
+        fanout = self.fanout
+        level = self.level
+
+        events = [(level[g], g) for g in start_gates]
+        heapq.heapify(events)
+        queued = set(start_gates)
+        while events:
+            g = heapq.heappop(events)[1]
+            input_words = [faulty.get(i, good[i]) for i in fanin[g]]
+            if g in faulty_readers:
+                for j in range(len(input_words)):
+                    if fanin[g][j] == site:
+                        input_words[j] = stuck_word
+
+            output_word = word_gate_function[gate_type[g]](input_words, mask)
+            if output_word != good[g]:
+                faulty[g] = output_word
+                for h in fanout[g]:
+                    if h not in queued:
+                        queued.add(h)
+                        heapq.heappush(events, (level[h], h))
+
+        return faulty
+
+    def __propagate_profiled(self, fault_id, good, mask):
+        '''
+        Same as __propagate, adds every gate evaluation to the profile. A toggle is an
+        evaluation whose faulty word differs from the good machine word, a fault injection
+        check is the check of a gate reading the faulty branch
+        '''
+        profile = self.profile
+        counters = profile.counters
+        counters["faults"] += 1
+        if not self.observable[fault_id]:
+            return {}
+        injection = self.__inject(fault_id, good, mask)
+        if injection == None:
+            counters["faults_not_activated"] += 1
+            return {}
+        site, stuck_word, faulty, faulty_readers, start_gates = injection
+
+        gate_type = self.gate_type
+        fanin = self.fanin
+        fanout = self.fanout
+        level = self.level
+
+        events = [(level[g], g) for g in start_gates]
+        heapq.heapify(events)
+        queued = set(start_gates)
+        while events:
+            g = heapq.heappop(events)[1]
+            start = time.perf_counter()
+            counters["fault_injection_checks"] += 1
+            input_words = [faulty.get(i, good[i]) for i in fanin[g]]
+            if g in faulty_readers:
+                for j in range(len(input_words)):
+                    if fanin[g][j] == site:
+                        input_words[j] = stuck_word
+                        counters["fault_injections"] += 1
+
+            output_word = word_gate_function[gate_type[g]](input_words, mask)
+            profile.add(level[g], gate_type[g], 1, int(output_word != good[g]), time.perf_counter() - start)
+            if output_word != good[g]:
+                faulty[g] = output_word
+                for h in fanout[g]:
+                    if h not in queued:
+                        queued.add(h)
+                        heapq.heappush(events, (level[h], h))
+
+        return faulty
+
+    def simulate(self, iv_list, fault_ids = None):
+        '''
+        Fault simulates all the input vectors in iv_list. Returns a dictionary with the
+        fault index as the key and the detection word as the value, bit i of the
+        detection word is set if the i-th input vector detects the fault
+
+        param[in] iv_list: List of input vectors, only 0 and 1 are supported
+        param[in] fault_ids: Faults to be simulated, all faults if not given
+        '''
+        return self.simulate_words(pack_input_vectors(iv_list, len(self.input_index)), len(iv_list), fault_ids)
+
+    def simulate_words(self, input_words, num_patterns, fault_ids = None):
+        '''
+        Same as simulate for input vectors already packed, one word per input in the order
+        of the input list, for example the blocks of a random_pattern_source
+        '''
+        if fault_ids == None:
+            fault_ids = range(len(self.faults))
+
+        good, mask = self.good_simulation_words(input_words, num_patterns)
+        if self.profile != None:
+            self.profile.counters["vectors"] += num_patterns
+        results = {}
+        for fault_id in fault_ids:
+            results[fault_id] = self.simulate_fault(fault_id, good, mask)
+
+        return results
@@ -0,0 +1,96 @@
+from array import array
+from .errors import *
+
+def levelize(names, fanin_offsets, fanin_index):
+    '''
+    Levelizes a netlist given in CSR form, the nodes fed in of node i are
+    fanin_index[fanin_offsets[i]:fanin_offsets[i + 1]]. Nodes without fanin are at
+    level 0, every other node is one level above its highest fanin. The levels are
+    found with an iterative topological sort (Kahn) in O(V + E).
+
+    Returns the level of each node, the node IDs sorted by level (nodes of the same
+    level keep the order of the IDs) and the level offsets, the nodes of level l are
+    order[level_offsets[l]:level_offsets[l + 1]]. Raises CombinationalCycle with the
+    nodes on the cycles if the netlist is not acyclic.
+
+    param[in] names: Name of each node, used to report cycles
+    param[in] fanin_offsets, fanin_index: Fanin of each node in CSR form
+    '''
+    num_nodes = len(names)
+
+    #fanout in CSR form, a node fed twice to the same gate appears twice
+    fanout_offsets = array("i", [0]) * (num_nodes + 1)
+    for j in fanin_index:
+        fanout_offsets[j + 1] += 1
+    for i in range(num_nodes):
+        fanout_offsets[i + 1] += fanout_offsets[i]
+    fanout_index = array("i", [0]) * len(fanin_index)
+    position = fanout_offsets[:-1]
+    for i in range(num_nodes):
+        for k in range(fanin_offsets[i], fanin_offsets[i + 1]):
+            j = fanin_index[k]
+            fanout_index[position[j]] = i
+            position[j] += 1
+
+    levels = array("i", [0]) * num_nodes
+    pending = array("i", [fanin_offsets[i + 1] - fanin_offsets[i] for i in range(num_nodes)])
+    ready = [i for i in range(num_nodes) if pending[i] == 0]
+    num_visited = 0
+    while ready:
+        i = ready.pop()
+        num_visited += 1
+        next_level = levels[i] + 1
+        for k in range(fanout_offsets[i], fanout_offsets[i + 1]):
+            j = fanout_index[k]
+            if next_level > levels[j]:
+                levels[j] = next_level
+            pending[j] -= 1
+            if pending[j] == 0:
+                ready.append(j)
+
+    if num_visited < num_nodes:
+        raise CombinationalCycle([names[i] for i in _cycle_nodes(pending, fanout_offsets, fanout_index)])
+
+    #counting sort of the node IDs by level
+    num_levels = max(levels) + 1 if num_nodes else 0
+    level_offsets = array("i", [0]) * (num_levels + 1)
+    for i in range(num_nodes):
+        level_offsets[levels[i] + 1] += 1
+    for level in range(num_levels):
+        level_offsets[level + 1] += level_offsets[level]
+    order = array("i", [0]) * num_nodes
+    position = level_offsets[:-1]
+    for i in range(num_nodes):
+        order[position[levels[i]]] = i
+        position[levels[i]] += 1
+
+    return levels, order, level_offsets
+
+def _cycle_nodes(pending, fanout_offsets, fanout_index):
+    '''
+    Returns the nodes left by the topological sort that are on a cycle or between two
+    cycles. The nodes left only because they are fed by a cycle are removed by
+    repeatedly dropping the nodes that feed no other node left
+    '''
+    left = set(i for i in range(len(pending)) if pending[i] > 0)
+    fanout_left = {}
+    for i in left:
+        fanout_left[i] = sum(1 for k in range(fanout_offsets[i], fanout_offsets[i + 1]) if fanout_index[k] in left)
+
+    fanin_left = {}
+    for i in left:
+        for k in range(fanout_offsets[i], fanout_offsets[i + 1]):
+            j = fanout_index[k]
+            if j in left:
+                fanin_left.setdefault(j, []).append(i)
+
+    dropped = [i for i in left if fanout_left[i] == 0]
+    while dropped:
+        j = dropped.pop()
+        left.discard(j)
+        for i in fanin_left.get(j, ()):
+            fanout_left[i] -= 1
+            if fanout_left[i] == 0:
+                dropped.append(i)
+
+    return sorted(left)
@@ -0,0 +1,110 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from .circuit import *
+from .fault_simulation import *
+
+#fault simulator of a worker process, set once when the worker starts
+_worker_simulator = None
+
+def _init_worker(simulator):
+    '''
+    Keeps the fault simulator in the worker process, so it is sent only once per worker
+    '''
+    global _worker_simulator
+    _worker_simulator = simulator
+
+def _simulate_chunk(good, mask, fault_ids):
+    '''
+    Fault simulates a chunk of faults in a worker process. Returns the detection words
+    in the order of fault_ids
+    '''
+    return [_worker_simulator.simulate_fault(fault_id, good, mask) for fault_id in fault_ids]
+
+class parallel_fault_simulator:
+    '''
+    Fault simulator running the faults on a pool of worker processes. The circuit is
+    parsed and levelized once, the workers get a copy of the fault_simulator, which only
+    holds lists of node indices and gate types. For every block of input vectors the
+    good machine is simulated once and the fault list is split into chunks, every
+    worker propagates the faults of a chunk against the same good machine words.
+
+    Faults are dealt to the chunks in turn, neighbouring faults have fanout cones of
+    similar size, so the chunks take about the same time. There are chunks_per_worker
+    chunks per worker, so a worker finishing early takes another chunk.
+
+    The results are identical to fault_simulator.simulate.
+
+    Attributes:
+    simulator: Fault simulator of the circuit(fault_simulator)
+    num_workers: Number of worker processes
+    fault_strings, fault_index: Same as in fault_simulator
+    '''
+
+    def __init__(self, circuit_under_test: circuit, num_workers = None, chunks_per_worker = 4):
+        '''
+        Creates the simulator, the worker processes are started on the first simulation
+
+        param[in] circuit_under_test: Levelized circuit
+        param[in] num_workers: Number of worker processes, the number of CPUs if not given
+        param[in] chunks_per_worker: Number of chunks of the fault list per worker
+        '''
+        self.simulator = fault_simulator(circuit_under_test)
+        self.num_workers = num_workers if num_workers != None else (os.cpu_count() or 1)
+        self.chunks_per_worker = chunks_per_worker
+        self.fault_strings = self.simulator.fault_strings
+        self.fault_index = self.simulator.fault_index
+        self.__pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        '''
+        Stops the worker processes
+        '''
+        if self.__pool != None:
+            self.__pool.shutdown()
+            self.__pool = None
+
+    def good_simulation(self, iv_list):
+        '''
+        Same as fault_simulator.good_simulation
+        '''
+        return self.simulator.good_simulation(iv_list)
+
+    def simulate(self, iv_list, fault_ids = None):
+        '''
+        Fault simulates all the input vectors in iv_list, like fault_simulator.simulate.
+        Returns a dictionary with the fault index as the key and the detection word as
+        the value
+
+        param[in] iv_list: List of input vectors, only 0 and 1 are supported
+        param[in] fault_ids: Faults to be simulated, all faults if not given
+        '''
+        if fault_ids == None:
+            fault_ids = range(len(self.fault_strings))
+        fault_ids = list(fault_ids)
+
+        if (self.num_workers <= 1) or (len(fault_ids) < self.num_workers):
+            return self.simulator.simulate(iv_list, fault_ids)
+
+        if self.__pool == None:
+            self.__pool = ProcessPoolExecutor(max_workers = self.num_workers, initializer = _init_worker,
+                                              initargs = (self.simulator,))
+
+        good, mask = self.simulator.good_simulation(iv_list)
+        num_chunks = min(len(fault_ids), self.num_workers * self.chunks_per_worker)
+        chunks = [fault_ids[k::num_chunks] for k in range(num_chunks)]
+        futures = [self.__pool.submit(_simulate_chunk, good, mask, chunk) for chunk in chunks]
+
+        detection = [0] * len(fault_ids)
+        for k in range(num_chunks):
+            detection[k::num_chunks] = futures[k].result()
+
+        results = {}
+        for i in range(len(fault_ids)):
+            results[fault_ids[i]] = detection[i]
+        return results
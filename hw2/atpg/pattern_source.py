@@ -0,0 +1,127 @@
+import random
+from statistics import NormalDist
+from .circuit import *
+from .bit_parallel import *
+
+class random_pattern_source:
+    '''
+    Seeded source of random input vectors. Vectors are generated in bulk as packed
+    words, one random word per input for a block of vectors, the same packing as
+    pack_input_vectors: bit i of the j-th word is the value of the j-th input in the
+    i-th input vector. Vectors are only generated when they are consumed, so any number
+    of vectors can be streamed without keeping them in memory.
+
+    Attributes:
+    num_inputs: Number of inputs of a vector
+    seed: Seed of the random number generator, the same seed gives the same vectors
+    block_size: Number of vectors per block
+    num_vectors: Number of vectors generated so far
+    '''
+
+    def __init__(self, num_inputs, seed = None, block_size = 64):
+        '''
+        Creates the pattern source
+
+        param[in] num_inputs: Number of inputs of a vector
+        param[in] seed: Seed of the random number generator
+        param[in] block_size: Number of vectors per block
+        '''
+        self.num_inputs = num_inputs
+        self.seed = seed
+        self.block_size = block_size
+        self.num_vectors = 0
+        self.random = random.Random(seed)
+
+    def next_block(self, num_patterns = None):
+        '''
+        Returns the packed words of the next block of num_patterns vectors, block_size
+        vectors if not given
+        '''
+        if num_patterns == None:
+            num_patterns = self.block_size
+        self.num_vectors += num_patterns
+        getrandbits = self.random.getrandbits
+        return [getrandbits(num_patterns) for i in range(self.num_inputs)]
+
+    def blocks(self, num_vectors = None):
+        '''
+        Generator yielding (packed words, number of vectors in the block) until num_vectors
+        vectors are generated, without end if num_vectors is not given
+        '''
+        remaining = num_vectors
+        while (remaining == None) or (remaining > 0):
+            num_patterns = self.block_size if remaining == None else min(self.block_size, remaining)
+            yield self.next_block(num_patterns), num_patterns
+            if remaining != None:
+                remaining -= num_patterns
+
+    def vectors(self, num_vectors = None):
+        '''
+        Generator yielding the vectors one at a time as lists of node values, in the format
+        of create_input_vector, for the simulations that do not take packed words
+        '''
+        for words, num_patterns in self.blocks(num_vectors):
+            for pattern in range(num_patterns):
+                yield [(w >> pattern) & 1 for w in words]
+
+def node_counts(circuit_under_test: circuit):
+    '''
+    Returns the (zero_count, one_count) of every node, in the order of the nodes list
+    '''
+    return [(n.zero_count, n.one_count) for n in circuit_under_test.nodes]
+
+def signal_probability_half_width(circuit_under_test: circuit, confidence = 0.95, counts_before = None):
+    '''
+    Returns the largest half width of the confidence intervals of the signal probabilities
+    PN(1) = one_count / (zero_count + one_count) of the nodes. The normal approximation
+    is used, with one sample of each value added so that nodes never seen at 0 or 1 do
+    not give an interval of width zero
+
+    param[in] circuit_under_test: Circuit whose nodes hold the zero and one counts
+    param[in] confidence: Confidence level of the interval
+    param[in] counts_before: Counts of the nodes at the start of a run (see node_counts),
+                             only the samples of the run are used if given
+    '''
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    half_width = 0
+    for i, n in enumerate(circuit_under_test.nodes):
+        zero_count, one_count = n.zero_count, n.one_count
+        if counts_before != None:
+            zero_count -= counts_before[i][0]
+            one_count -= counts_before[i][1]
+        num_samples = zero_count + one_count + 2
+        p = (one_count + 1) / num_samples
+        half_width = max(half_width, z * (p * (1 - p) / num_samples) ** 0.5)
+    return half_width
+
+def simulate_random_patterns(circuit_under_test: circuit, source: random_pattern_source, num_vectors = None,
+                             half_width = None, confidence = 0.95):
+    '''
+    Simulates random vectors from the source with the bit-parallel simulation, one block
+    at a time, updating the zero and one counts of the nodes. Stops after num_vectors
+    vectors or, if half_width is given, as soon as the signal probability of every node
+    is known within +/- half_width with the given confidence, whichever comes first.
+    The stop rule only uses the vectors of this run: the counts the nodes already had
+    (from earlier simulations) are kept but not counted as samples. Returns the number
+    of vectors simulated
+
+    param[in] circuit_under_test: Levelized circuit
+    param[in] source: Source of the random vectors
+    param[in] num_vectors: Maximum number of vectors
+    param[in] half_width: Half width of the confidence interval of the signal probabilities
+    param[in] confidence: Confidence level of the interval
+    '''
+    if (num_vectors == None) and (half_width == None):
+        raise ValueError("num_vectors or half_width is needed to stop the simulation")
+
+    input_names = [n.name for n in circuit_under_test.input_list]
+    counts_before = node_counts(circuit_under_test)
+    num_simulated = 0
+    for words, num_patterns in source.blocks(num_vectors):
+        circuit_under_test.simulate_parallel(dict(zip(input_names, words)), num_patterns, update_nodes = True)
+        num_simulated += num_patterns
+        if (half_width != None) and \
+           (signal_probability_half_width(circuit_under_test, confidence, counts_before) <= half_width):
+            break
+
+    return num_simulated
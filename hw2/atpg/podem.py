@@ -0,0 +1,483 @@
+import time
+import heapq
+import random
+from .circuit import *
+from .fault_simulation import *
+from .fault_collapsing import *
+from .testability import *
+
+#result of test generation for a fault
+class test_status:
+    detected = 0
+    redundant = 1
+    aborted = 2
+
+    str_repr = {detected: "detected", redundant: "redundant", aborted: "aborted"}
+
+#controlling value of the gates that have one
+controlling_value = {gate_type.AND_gate : node_value.zero,
+                     gate_type.NAND_gate: node_value.zero,
+                     gate_type.OR_gate  : node_value.one,
+                     gate_type.NOR_gate : node_value.one}
+
+inverting_gates = [gate_type.NAND_gate, gate_type.NOR_gate, gate_type.NOT_gate, gate_type.XNOR_gate]
+
+def evaluate_three_valued(g_type, values):
+    '''
+    Evaluates a gate for 0, 1 and X(undefined) values, as the gate_type functions do: a
+    controlling value on any input sets the output and an X on an XOR input always gives X
+    '''
+    if g_type in controlling_value:
+        c = controlling_value[g_type]
+        if c in values:
+            output = c
+        elif node_value.undefined in values:
+            return node_value.undefined
+        else:
+            output = 1 - c
+    elif g_type in [gate_type.XOR_gate, gate_type.XNOR_gate]:
+        if node_value.undefined in values:
+            return node_value.undefined
+        output = 0
+        for v in values:
+            output ^= v
+    else:
+        output = values[0]
+        if output == node_value.undefined:
+            return output
+
+    if g_type in inverting_gates:
+        output = 1 - output
+    return output
+
+class podem:
+    '''
+    PODEM test pattern generator. Only primary inputs are assigned, the values of the
+    other nodes are implied by simulating the good and the faulty machine with 0, 1
+    and X. A node is D (D') when the good value is 1 (0) and the faulty value is 0 (1).
+    The objectives are to activate the fault and then to propagate the fault effect
+    through the D-frontier gate with the lowest SCOAP observability, they are backtraced
+    to a primary input using the SCOAP controllability: the easiest input when one input
+    sets the gate output, the hardest one when all the inputs are needed.
+
+    The search is complete, a fault is redundant when both values of every decision
+    were tried. It is aborted when the backtrack limit or the time limit is reached.
+
+    Attributes:
+    simulator: Fault simulator of the circuit, its fault IDs are used(fault_simulator)
+    backtrack_limit: Number of backtracks after which a fault is aborted
+    time_limit: Seconds after which a fault is aborted, None for no limit
+    num_backtracks: Number of backtracks of the last fault
+    '''
+
+    def __init__(self, circuit_under_test: circuit, backtrack_limit = 100, time_limit = None):
+        '''
+        Creates the test pattern generator of a levelized circuit
+
+        param[in] circuit_under_test: Levelized circuit
+        param[in] backtrack_limit: Number of backtracks after which a fault is aborted
+        param[in] time_limit: Seconds after which a fault is aborted
+        '''
+        self.simulator = fault_simulator(circuit_under_test)
+        self.index = circuit_under_test.create_structural_index()
+        self.backtrack_limit = backtrack_limit
+        self.time_limit = time_limit
+        self.num_backtracks = 0
+
+        measures = testability_analysis(circuit_under_test)
+        self.c0 = measures.c0
+        self.c1 = measures.c1
+        self.co = measures.co
+        self.is_output = [False] * len(circuit_under_test.nodes)
+        for i in self.simulator.output_index:
+            self.is_output[i] = True
+
+    def generate(self, key):
+        '''
+        Generates a test cube for a fault given its ID or its fault string. Returns the
+        status (test_status) and, for detected faults, the test cube: the values of the
+        inputs in the order of the input list, inputs that are not needed are X(undefined)
+        '''
+        if isinstance(key, str):
+            if key not in self.simulator.fault_index:
+                raise FaultReprError(fault_input = key)
+            key = self.simulator.fault_index[key]
+
+        self.__setup(key)
+        self.num_backtracks = 0
+        deadline = None if self.time_limit == None else time.perf_counter() + self.time_limit
+        decisions = [] #(input index, value, both values tried, trail length before the decision)
+
+        while True:
+            result, objective = self.__check()
+
+            if result == test_status.detected:
+                return test_status.detected, [self.good[i] for i in self.simulator.input_index]
+
+            if result == test_status.redundant:
+                #backtrack to the last decision whose other value was not tried
+                while decisions and decisions[-1][2]:
+                    self.__undo(decisions.pop()[3])
+                if not decisions:
+                    return test_status.redundant, None
+
+                self.num_backtracks += 1
+                if self.num_backtracks > self.backtrack_limit:
+                    return test_status.aborted, None
+
+                i, value, flipped, mark = decisions.pop()
+                self.__undo(mark)
+                decisions.append((i, 1 - value, True, mark))
+                self.__assign(i, 1 - value)
+                continue
+
+            if (deadline != None) and (time.perf_counter() > deadline):
+                return test_status.aborted, None
+
+            i, value = self.__backtrace(*objective)
+            decisions.append((i, value, False, len(self.trail)))
+            self.__assign(i, value)
+
+    def __setup(self, fault_id):
+        '''
+        Sets all the values to X and finds the fanout cone of the fault site
+        '''
+        s = self.simulator
+        self.site, f_type, self.kind = s.faults[fault_id]
+        self.stuck = node_value.zero if f_type == fault_types.sa0 else node_value.one
+
+        if self.kind == stem_fault:
+            self.readers = ()
+        elif self.kind == out_fault:
+            self.readers = set(s.fanout[self.site])
+        else:
+            self.readers = (self.kind,)
+
+        self.good = [node_value.undefined] * len(s.level)
+        self.faulty = [node_value.undefined] * len(s.level)
+        self.trail = []
+
+        self.start_gates = list(s.fanout[self.site] if self.kind == stem_fault else self.readers)
+        cone = 0
+        for g in self.start_gates:
+            cone |= self.index.fanout_cone[self.index.position[g]]
+        self.cone = self.index.cone_indices(cone)
+        self.cone_outputs = [g for g in self.cone if self.is_output[g]]
+
+        if self.kind == stem_fault:
+            self.faulty[self.site] = self.stuck
+            if self.is_output[self.site]:
+                self.cone_outputs.append(self.site)
+
+    def __faulty_input(self, g, j):
+        '''
+        Returns the faulty value of node j as read by the gate of node g
+        '''
+        if (j == self.site) and (g in self.readers):
+            return self.stuck
+        return self.faulty[j]
+
+    def __assign(self, i, value):
+        '''
+        Assigns a value to an input and implies the values of the nodes in its fanout
+        cone, in the order of levels. Every change is recorded in the trail
+        '''
+        s = self.simulator
+        good = self.good
+        faulty = self.faulty
+
+        self.trail.append((i, good[i], faulty[i]))
+        good[i] = value
+        if (self.kind != stem_fault) or (i != self.site):
+            faulty[i] = value
+
+        events = [(s.level[g], g) for g in s.fanout[i]]
+        heapq.heapify(events)
+        queued = set(s.fanout[i])
+        while events:
+            g = heapq.heappop(events)[1]
+            fanin = s.fanin[g]
+            good_value = evaluate_three_valued(s.gate_type[g], [good[j] for j in fanin])
+            if (self.kind == stem_fault) and (g == self.site):
+                faulty_value = self.stuck
+            else:
+                faulty_value = evaluate_three_valued(s.gate_type[g], [self.__faulty_input(g, j) for j in fanin])
+
+            if (good_value != good[g]) or (faulty_value != faulty[g]):
+                self.trail.append((g, good[g], faulty[g]))
+                good[g] = good_value
+                faulty[g] = faulty_value
+                for h in s.fanout[g]:
+                    if h not in queued:
+                        queued.add(h)
+                        heapq.heappush(events, (s.level[h], h))
+
+    def __undo(self, mark):
+        '''
+        Restores the values changed after the trail had mark entries
+        '''
+        while len(self.trail) > mark:
+            i, good_value, faulty_value = self.trail.pop()
+            self.good[i] = good_value
+            self.faulty[i] = faulty_value
+
+    def __has_fault_effect(self, g):
+        '''
+        Returns True if an input of the gate of node g is D or D'
+        '''
+        for j in self.simulator.fanin[g]:
+            good_value = self.good[j]
+            faulty_value = self.__faulty_input(g, j)
+            if (good_value != node_value.undefined) and (faulty_value != node_value.undefined) and \
+               (good_value != faulty_value):
+                return True
+        return False
+
+    def __x_path_exists(self, gates):
+        '''
+        Returns True if a path of nodes that can still carry the fault effect goes from
+        one of the gates (the D-frontier) to a primary output
+        '''
+        if (self.kind == stem_fault) and self.is_output[self.site]:
+            return True
+        visited = set(g for g in gates if (self.good[g] == node_value.undefined) or
+                      (self.faulty[g] == node_value.undefined) or (self.good[g] != self.faulty[g]))
+        stack = list(visited)
+        while stack:
+            g = stack.pop()
+            if self.is_output[g]:
+                return True
+            for h in self.simulator.fanout[g]:
+                if (h not in visited) and \
+                   ((self.good[h] == node_value.undefined) or (self.faulty[h] == node_value.undefined) or \
+                    (self.good[h] != self.faulty[h])):
+                    visited.add(h)
+                    stack.append(h)
+        return False
+
+    def __check(self):
+        '''
+        Returns test_status.detected if the fault effect reaches an output, test_status.redundant
+        if the current assignment can not detect the fault, otherwise None and the next
+        objective (node index, value)
+        '''
+        good = self.good
+        faulty = self.faulty
+        for o in self.cone_outputs:
+            if (good[o] != node_value.undefined) and (faulty[o] != node_value.undefined) and (good[o] != faulty[o]):
+                return test_status.detected, None
+
+        if (good[self.site] == self.stuck) or (not self.cone_outputs):
+            return test_status.redundant, None
+        if good[self.site] == node_value.undefined:
+            if not self.__x_path_exists(self.start_gates):
+                return test_status.redundant, None
+            return None, (self.site, 1 - self.stuck)
+
+        d_frontier = [g for g in self.cone
+                      if ((good[g] == node_value.undefined) or (faulty[g] == node_value.undefined)) and
+                      self.__has_fault_effect(g)]
+        if (not d_frontier) or (not self.__x_path_exists(d_frontier)):
+            return test_status.redundant, None
+
+        #propagate through the D-frontier gate easiest to observe
+        g = min(d_frontier, key = lambda g: self.co[g])
+        g_type = self.simulator.gate_type[g]
+        value = 1 - controlling_value[g_type] if g_type in controlling_value else node_value.zero
+        controllability = self.c1 if value == node_value.one else self.c0
+        x_inputs = [j for j in self.simulator.fanin[g] if good[j] == node_value.undefined]
+        if not x_inputs:
+            #the gate output is X only in the faulty machine, there is no objective to backtrace
+            return None, (None, value)
+        return None, (max(x_inputs, key = lambda j: controllability[j]), value)
+
+    def __backtrace(self, k, value):
+        '''
+        Maps an objective to an unassigned input and a value, following the inputs with
+        an X value and choosing them by their SCOAP controllability
+        '''
+        s = self.simulator
+        good = self.good
+        if k != None:
+            while s.gate_type[k] != None:
+                g_type = s.gate_type[k]
+                if g_type in inverting_gates:
+                    value = 1 - value
+                x_inputs = [j for j in s.fanin[k] if good[j] == node_value.undefined]
+                if not x_inputs:
+                    break
+
+                if g_type in controlling_value:
+                    controllability = self.c1 if value == node_value.one else self.c0
+                    if value == controlling_value[g_type]:
+                        k = min(x_inputs, key = lambda j: controllability[j])
+                    else:
+                        k = max(x_inputs, key = lambda j: controllability[j])
+                elif g_type in [gate_type.XOR_gate, gate_type.XNOR_gate]:
+                    if len(x_inputs) == 1:
+                        for j in s.fanin[k]:
+                            if good[j] != node_value.undefined:
+                                value ^= good[j]
+                        k = x_inputs[0]
+                    else:
+                        k = min(x_inputs, key = lambda j: min(self.c0[j], self.c1[j]))
+                        value = node_value.zero if self.c0[k] <= self.c1[k] else node_value.one
+                else:
+                    k = x_inputs[0]
+            else:
+                if good[k] == node_value.undefined:
+                    return k, value
+
+        #no X path to an input from the objective, any unassigned input keeps the search complete
+        for i in s.input_index:
+            if good[i] == node_value.undefined:
+                return i, node_value.zero
+
+class test_generation_session:
+    '''
+    Generates a test set for the full fault list of a circuit. Blocks of random input
+    vectors are fault simulated first, then PODEM targets every collapsed fault left.
+    Every generated vector is fault simulated, so faults it detects by chance are
+    dropped. The status of a collapsed fault is shared by all the faults of its
+    equivalence class.
+
+    Attributes:
+    engine: Test pattern generator(podem)
+    universe: Fault universe of the circuit, equivalence collapsed(fault_universe)
+    test_set: Generated input vectors, in the order of the input list
+    test_cubes: Input vectors of the test set before the X inputs of the PODEM cubes are filled
+    status: Status of each fault, indexed by fault ID(test_status)
+    num_random_vectors: Number of vectors of the test set kept from the random phase
+    '''
+
+    def __init__(self, circuit_under_test: circuit, backtrack_limit = 100, time_limit = 1.0,
+                 time_budget = None, random_blocks = 8, seed = None):
+        '''
+        Creates a test generation session
+
+        param[in] circuit_under_test: Levelized circuit
+        param[in] backtrack_limit: Number of backtracks after which a fault is aborted
+        param[in] time_limit: Seconds after which a fault is aborted
+        param[in] time_budget: Seconds after which all the faults left are aborted
+        param[in] random_blocks: Maximum number of blocks of 64 random vectors, the random
+                                 phase also stops at the first block detecting no new fault
+        param[in] seed: Seed of the random vectors and of the values of the X inputs
+        '''
+        self.circuit_under_test = circuit_under_test
+        self.engine = podem(circuit_under_test, backtrack_limit, time_limit)
+        self.universe = fault_universe(circuit_under_test)
+        self.time_budget = time_budget
+        self.random_blocks = random_blocks
+        self.random = random.Random(seed)
+
+        self.test_set = []
+        self.test_cubes = []
+        self.status = [None] * self.universe.num_faults
+        self.num_random_vectors = 0
+        self.run_time = 0
+
+    def __drop_detected(self, iv_list, fault_ids):
+        '''
+        Fault simulates the input vectors, marks the faults detected and returns the
+        indices of the vectors detecting at least one of them
+        '''
+        results = self.engine.simulator.simulate(iv_list, fault_ids)
+        useful = 0
+        for fault_id in results:
+            if results[fault_id]:
+                self.status[fault_id] = test_status.detected
+                #keep the first vector detecting the fault
+                useful |= results[fault_id] & -results[fault_id]
+        return [i for i in range(len(iv_list)) if (useful >> i) & 1]
+
+    def run(self):
+        '''
+        Generates the test set. Returns the list of input vectors
+        '''
+        start = time.perf_counter()
+        targets = list(self.universe.collapsed_ids)
+        num_inputs = len(self.engine.simulator.input_index)
+
+        for block in range(self.random_blocks):
+            iv_list = [[self.random.randint(0, 1) for i in range(num_inputs)] for j in range(64)]
+            useful = self.__drop_detected(iv_list, targets)
+            targets = [f for f in targets if self.status[f] == None]
+            self.test_set.extend(iv_list[i] for i in useful)
+            self.test_cubes.extend(iv_list[i] for i in useful)
+            if (not useful) or (not targets):
+                break
+        self.num_random_vectors = len(self.test_set)
+
+        for fault_id in targets:
+            if self.status[fault_id] != None:
+                continue
+            if (self.time_budget != None) and (time.perf_counter() - start > self.time_budget):
+                self.status[fault_id] = test_status.aborted
+                continue
+
+            status, cube = self.engine.generate(fault_id)
+            if status != test_status.detected:
+                self.status[fault_id] = status
+                continue
+
+            iv = [self.random.randint(0, 1) if v == node_value.undefined else v for v in cube]
+            self.test_set.append(iv)
+            self.test_cubes.append(cube)
+            #aborted faults may still be detected by chance
+            self.__drop_detected([iv], [f for f in targets if self.status[f] in [None, test_status.aborted]])
+
+        for i in range(self.universe.num_faults):
+            self.status[i] = self.status[self.universe.representative[i]]
+
+        self.run_time = time.perf_counter() - start
+        return self.test_set
+
+    def count(self, status):
+        '''
+        Returns the number of faults with the given status(test_status)
+        '''
+        return self.status.count(status)
+
+    def faults(self, status):
+        '''
+        Returns the fault strings of the faults with the given status(test_status)
+        '''
+        return [self.universe.faults[i].fault_string for i in range(self.universe.num_faults)
+                if self.status[i] == status]
+
+    @property
+    def fault_coverage(self):
+        '''
+        Percentage of faults detected
+        '''
+        return (self.count(test_status.detected) / self.universe.num_faults) * 100
+
+    @property
+    def fault_efficiency(self):
+        '''
+        Percentage of faults detected or proven redundant
+        '''
+        resolved = self.count(test_status.detected) + self.count(test_status.redundant)
+        return (resolved / self.universe.num_faults) * 100
+
+    def write_test_set(self, file_name):
+        '''
+        Writes the test set, one input vector per line in the order of the input list.
+        The first line is a comment with the input node names
+        '''
+        with open(file_name, "w") as f:
+            f.write("# " + " ".join(n.name for n in self.circuit_under_test.input_list) + "\n")
+            for iv in self.test_set:
+                f.write("".join(str(v) for v in iv) + "\n")
+
+    def print_summary(self):
+        '''
+        Prints the number of faults of each status and the size of the test set
+        '''
+        print("Total number of faults: ", self.universe.num_faults)
+        for status in test_status.str_repr:
+            print(f"Number of faults {test_status.str_repr[status]}: ", self.count(status))
+        print("Fault coverage of all the faults: {}%".format(round(self.fault_coverage, 2)))
+        print("Fault efficiency of all the faults: {}%".format(round(self.fault_efficiency, 2)))
+        print("Number of test vectors: ", len(self.test_set), f"({self.num_random_vectors} random)")
+        print("Run time: {}s".format(round(self.run_time, 2)))
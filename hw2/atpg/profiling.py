@@ -0,0 +1,149 @@
+import json
+from .circuit_types import *
+
+#measures kept for every level and every gate type
+profile_measures = ["evaluations", "toggles", "time"]
+
+class simulation_profile:
+    '''
+    Counters and timers of a simulation engine, filled only while profiling is enabled
+    (circuit.enable_profiling or fault_simulator.enable_profiling). Every engine keeps a
+    separate instrumented loop, so a disabled profile costs one check per simulation call
+    (per vector for circuit, per fault and block for fault_simulator), never one per gate.
+
+    For every level and every gate type the profile keeps the number of gate
+    evaluations, the number of evaluations that changed the value of the gate (toggles)
+    and the wall time of the evaluations in seconds. For the fault simulator a toggle is
+    an evaluation whose faulty word differs from the good machine word.
+
+    Attributes:
+    levels: Measures of each level, keys are the levels
+    gate_types: Measures of each gate type, keys are the gate strings (AND, XOR, ...)
+    counters: Other counts of the engine, keys are the counter names:
+              vectors: Input vectors simulated
+              fault_injection_checks: Checks of the selected fault when a gate reads a node value
+              fault_injections: Checks that replaced the node value by the faulty value
+              faults: Faults simulated
+              faults_not_activated: Faults skipped because no vector activates them
+    '''
+
+    def __init__(self, engine = None):
+        '''
+        Creates an empty profile
+
+        param[in] engine: Name of the profiled engine, kept in the exported profile
+        '''
+        self.engine = engine
+        self.levels = {}
+        self.gate_types = {}
+        self.counters = {"vectors": 0, "fault_injection_checks": 0, "fault_injections": 0,
+                         "faults": 0, "faults_not_activated": 0}
+
+    def add(self, level, g_type, evaluations, toggles, elapsed):
+        '''
+        Adds evaluations of gates of one type at one level
+
+        param[in] level: Level of the gates
+        param[in] g_type: Type of the gates(gate_type)
+        param[in] evaluations: Number of gate evaluations
+        param[in] toggles: Number of evaluations that changed the value of the gate
+        param[in] elapsed: Wall time of the evaluations in seconds
+        '''
+        for table, key in [(self.levels, level), (self.gate_types, gate_string[g_type])]:
+            if key not in table:
+                table[key] = {"evaluations": 0, "toggles": 0, "time": 0.0}
+            measures = table[key]
+            measures["evaluations"] += evaluations
+            measures["toggles"] += toggles
+            measures["time"] += elapsed
+
+    def reset(self):
+        '''
+        Clears all the counters and timers
+        '''
+        self.__init__(self.engine)
+
+    def total(self, measure):
+        '''
+        Returns the sum of a measure over all the levels
+        '''
+        return sum(m[measure] for m in self.levels.values())
+
+    def to_dict(self):
+        '''
+        Returns the profile as a dictionary of plain values, the levels are sorted
+        '''
+        return {"engine": self.engine,
+                "levels": dict((str(level), dict(self.levels[level])) for level in sorted(self.levels)),
+                "gate_types": dict((g, dict(self.gate_types[g])) for g in sorted(self.gate_types)),
+                "counters": dict(self.counters)}
+
+    def save(self, file_name):
+        '''
+        Writes the profile to a JSON file
+        '''
+        with open(file_name, "w") as f:
+            json.dump(self.to_dict(), f, indent = 2)
+
+    @staticmethod
+    def load(file_name):
+        '''
+        Reads a profile written by save
+        '''
+        with open(file_name) as f:
+            data = json.load(f)
+        profile = simulation_profile(data["engine"])
+        profile.levels = dict((int(level), data["levels"][level]) for level in data["levels"])
+        profile.gate_types = data["gate_types"]
+        profile.counters.update(data["counters"])
+        return profile
+
+    def print_summary(self):
+        '''
+        Prints the measures of every gate type and every level, with the share of the
+        total time
+        '''
+        total_time = self.total("time") or 1.0
+        print(f"Profile of {self.engine}: " + ", ".join(f"{c} {self.counters[c]}" for c in self.counters))
+        for title, table in [("Gate type", self.gate_types), ("Level", self.levels)]:
+            print(f"| {title:<9} | Evaluations |   Toggles | Activity |   Time(ms) |  Time(%) |")
+            for key in sorted(table):
+                m = table[key]
+                activity = m["toggles"] / m["evaluations"] if m["evaluations"] else 0.0
+                print("| {:<9} | {:>11} | {:>9} | {:>8.3f} | {:>10.3f} | {:>8.1f} |".format(
+                    key, m["evaluations"], m["toggles"], activity, m["time"] * 1000, m["time"] * 100 / total_time))
+
+def diff_profiles(old: simulation_profile, new: simulation_profile):
+    '''
+    Compares two profiles, for example of the same circuit before and after a change
+    of an engine. Returns a list of (table, key, measure, old value, new value) for every
+    measure that differs, table is "levels", "gate_types" or "counters"
+    '''
+    differences = []
+    for table in ["levels", "gate_types"]:
+        old_table = getattr(old, table)
+        new_table = getattr(new, table)
+        for key in sorted(set(old_table) | set(new_table), key = str):
+            for measure in profile_measures:
+                old_value = old_table.get(key, {}).get(measure, 0)
+                new_value = new_table.get(key, {}).get(measure, 0)
+                if old_value != new_value:
+                    differences.append((table, key, measure, old_value, new_value))
+
+    for counter in sorted(set(old.counters) | set(new.counters)):
+        old_value = old.counters.get(counter, 0)
+        new_value = new.counters.get(counter, 0)
+        if old_value != new_value:
+            differences.append(("counters", counter, "count", old_value, new_value))
+
+    return differences
+
+def print_profile_diff(differences):
+    '''
+    Prints the output of diff_profiles
+    '''
+    print("| Table      | Key                    | Measure     |          Old |          New |   Change |")
+    for table, key, measure, old_value, new_value in differences:
+        change = "{:+7.1f}%".format((new_value - old_value) * 100 / old_value) if old_value else "     new"
+        print("| {:<10} | {:<22} | {:<11} | {:>12.6g} | {:>12.6g} | {:>8} |".format(
+            table, str(key), measure, old_value, new_value, change))
@@ -0,0 +1,370 @@
+import struct
+from abc import ABC, abstractmethod
+from array import array
+from .circuit_types import *
+from .errors import *
+
+#codes of the node values in the byte encoding, 0/1/D/D' keep their value and X is 4
+byte_code = {node_value.zero: 0, node_value.one: 1, node_value.d: 2, node_value.d_bar: 3, node_value.undefined: 4}
+byte_value = [node_value.zero, node_value.one, node_value.d, node_value.d_bar, node_value.undefined]
+#codes of the node values in the 2-bit encoding, four values per byte, without D and D'
+two_bit_code = {node_value.zero: 0, node_value.one: 1, node_value.undefined: 2}
+two_bit_value = [node_value.zero, node_value.one, node_value.undefined, None]
+
+#bits of a byte of a packed word spread to one byte per bit, and to two bits per bit
+_byte_spread = [bytes((b >> k) & 1 for k in range(8)) for b in range(256)]
+_two_bit_spread = [sum(((b >> k) & 1) << (2 * k) for k in range(8)).to_bytes(2, "little") for b in range(256)]
+
+#magic number and header of the binary result files, followed by the node names
+#separated by new lines, then by chunks of a vector count and one byte code per node
+#and vector, vector by vector
+result_file_magic = b"ATPGRES1"
+result_file_header = struct.Struct("<8sII")
+result_chunk_header = struct.Struct("<I")
+
+def _spread_word(word, num_patterns, spread, num_bytes):
+    '''
+    Returns the first num_bytes bytes of the spread bytes of a packed word of num_patterns bits
+    '''
+    data = word.to_bytes((num_patterns + 7) // 8, "little")
+    return b"".join([spread[b] for b in data])[:num_bytes]
+
+class result_sink(ABC):
+    '''
+    Receiver of the node values of simulated input vectors, see test_circuit. The nodes
+    are declared once with begin, then every input vector is added with add (a list of
+    node values in the order of the node names) or a block of vectors with add_block
+    (a packed word of 0 and 1 per node, bit i is the value for the i-th vector). A sink
+    can be passed to several simulations as long as the node names do not change.
+    Sinks implement add, add_block unpacks the vectors and adds them one by one unless
+    a sink overrides it.
+
+    Attributes:
+    node_names: Names of the nodes, in the order of the values
+    num_vectors: Number of vectors received
+    '''
+
+    def __init__(self):
+        self.node_names = None
+        self.num_vectors = 0
+
+    def begin(self, node_names):
+        '''
+        Declares the nodes of the values. Raises ValueError if the sink already received
+        the values of different nodes
+        '''
+        node_names = list(node_names)
+        if self.node_names == None:
+            self.node_names = node_names
+            self._start()
+        elif self.node_names != node_names:
+            raise ValueError("The sink already holds the values of different nodes")
+
+    def _start(self):
+        '''
+        Called by begin for the first declaration of the nodes
+        '''
+        pass
+
+    @abstractmethod
+    def add(self, values):
+        '''
+        Adds the node values of one input vector
+        '''
+
+    def add_block(self, words, num_patterns):
+        '''
+        Adds the node values of num_patterns input vectors given as packed words
+        '''
+        for pattern in range(num_patterns):
+            self.add([(w >> pattern) & 1 for w in words])
+
+    def close(self):
+        '''
+        Flushes anything pending, the sink can not be used afterwards
+        '''
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class columnar_result_store(result_sink):
+    '''
+    Keeps the results in memory, one packed column per node. With the byte encoding
+    every value takes one byte and all the values are supported, with the 2-bit encoding
+    four values share a byte and only 0, 1 and X are supported (fault free simulation).
+    Blocks of a bit-parallel simulation are stored without unpacking the vectors one by one.
+
+    Attributes:
+    encoding: "byte" or "2bit"
+    columns: Packed values of each node(bytearray), in the order of node_names
+    '''
+
+    def __init__(self, encoding = "byte"):
+        '''
+        Creates an empty store
+
+        param[in] encoding: "byte" or "2bit"
+        '''
+        if encoding not in ["byte", "2bit"]:
+            raise ValueError(f"Unknown encoding {encoding}, use byte or 2bit")
+        super().__init__()
+        self.encoding = encoding
+        self.columns = None
+        self.column_index = {}
+
+    def _start(self):
+        self.columns = [bytearray() for n in self.node_names]
+        for k in range(len(self.node_names)):
+            self.column_index[self.node_names[k]] = k
+
+    def add(self, values):
+        codes = byte_code if self.encoding == "byte" else two_bit_code
+        for value in values:
+            if value not in codes:
+                raise ValueNotEncodable(node_value.str_repr.get(value, value), self.encoding)
+
+        if self.encoding == "byte":
+            for column, value in zip(self.columns, values):
+                column.append(codes[value])
+        else:
+            shift = (self.num_vectors & 3) * 2
+            for column, value in zip(self.columns, values):
+                if shift == 0:
+                    column.append(codes[value])
+                else:
+                    column[-1] |= codes[value] << shift
+        self.num_vectors += 1
+
+    def add_block(self, words, num_patterns):
+        if self.encoding == "byte":
+            for column, word in zip(self.columns, words):
+                column += _spread_word(word, num_patterns, _byte_spread, num_patterns)
+        elif self.num_vectors & 3 == 0:
+            #the unused bits of the last byte are 0, the code of 0, and are or-ed over by add
+            num_bytes = (num_patterns + 3) // 4
+            for column, word in zip(self.columns, words):
+                column += _spread_word(word, num_patterns, _two_bit_spread, num_bytes)
+        else:
+            super().add_block(words, num_patterns)
+            return
+        self.num_vectors += num_patterns
+
+    def value(self, node_name, vector):
+        '''
+        Returns the value of the node for the given input vector number
+        '''
+        column = self.columns[self.column_index[node_name]]
+        if self.encoding == "byte":
+            return byte_value[column[vector]]
+        return two_bit_value[(column[vector >> 2] >> ((vector & 3) * 2)) & 3]
+
+    def column(self, node_name):
+        '''
+        Returns the values of the node for all the input vectors
+        '''
+        column = self.columns[self.column_index[node_name]]
+        if self.encoding == "byte":
+            return [byte_value[code] for code in column]
+        return [two_bit_value[(column[vector >> 2] >> ((vector & 3) * 2)) & 3] for vector in range(self.num_vectors)]
+
+    def vector(self, vector):
+        '''
+        Returns the values of all the nodes for the given input vector number
+        '''
+        return [self.value(node_name, vector) for node_name in self.node_names]
+
+    @property
+    def num_bytes(self):
+        '''
+        Memory taken by the values
+        '''
+        return sum(len(column) for column in self.columns) if self.columns != None else 0
+
+    def print_table(self):
+        '''
+        Prints the results in the same table format as print_tables
+        '''
+        if self.num_vectors == 0:
+            return
+        print("".join("| {:<5} ".format(node_name) for node_name in self.node_names) + "|")
+        columns = [self.column(node_name) for node_name in self.node_names]
+        for values in zip(*columns):
+            print("".join("| {:<5} ".format(node_value.str_repr[value]) for value in values) + "|")
+
+class result_stream_writer(result_sink):
+    '''
+    Streams the results to a file, vector by vector, so nothing but the current chunk is
+    kept in memory. The pending vectors are written every chunk_size vectors.
+
+    The csv format has a header line with the node names and one line per vector with
+    the values as 0, 1, D, D' or X. The binary format stores one byte code per value
+    (byte_code), see result_file_magic for the layout. read_result_file reads both formats.
+
+    Attributes:
+    file_name: Path of the file written
+    file_format: "csv" or "binary"
+    chunk_size: Number of vectors written at once
+    '''
+
+    def __init__(self, file_name, file_format = "csv", chunk_size = 4096):
+        '''
+        Creates the writer, the file is created when the nodes are declared
+
+        param[in] file_name: Path of the file written
+        param[in] file_format: "csv" or "binary"
+        param[in] chunk_size: Number of vectors written at once
+        '''
+        if file_format not in ["csv", "binary"]:
+            raise ValueError(f"Unknown format {file_format}, use csv or binary")
+        super().__init__()
+        self.file_name = file_name
+        self.file_format = file_format
+        self.chunk_size = chunk_size
+        self.__file = None
+        self.__pending = []
+        self.__num_pending = 0
+
+    def _start(self):
+        if self.file_format == "csv":
+            self.__file = open(self.file_name, "w")
+            self.__file.write(",".join(self.node_names) + "\n")
+        else:
+            self.__file = open(self.file_name, "wb")
+            names = "\n".join(self.node_names).encode()
+            self.__file.write(result_file_header.pack(result_file_magic, len(self.node_names), len(names)))
+            self.__file.write(names)
+
+    def add(self, values):
+        if self.file_format == "csv":
+            self.__pending.append(",".join([node_value.str_repr[value] for value in values]))
+        else:
+            self.__pending.append(bytes([byte_code[value] for value in values]))
+        self.num_vectors += 1
+        self.__num_pending += 1
+        if self.__num_pending >= self.chunk_size:
+            self.flush()
+
+    def add_block(self, words, num_patterns):
+        #one byte per value and node, then the vectors are the rows of the transposed columns
+        columns = [_spread_word(word, num_patterns, _byte_spread, num_patterns) for word in words]
+        for row in zip(*columns):
+            if self.file_format == "csv":
+                self.__pending.append(",".join(map(str, row)))
+            else:
+                self.__pending.append(bytes(row))
+        self.num_vectors += num_patterns
+        self.__num_pending += num_patterns
+        if self.__num_pending >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        '''
+        Writes the pending vectors
+        '''
+        if self.__num_pending == 0:
+            return
+        if self.file_format == "csv":
+            self.__file.write("\n".join(self.__pending) + "\n")
+        else:
+            self.__file.write(result_chunk_header.pack(self.__num_pending))
+            self.__file.write(b"".join(self.__pending))
+        self.__pending = []
+        self.__num_pending = 0
+
+    def close(self):
+        if self.__file != None:
+            self.flush()
+            self.__file.close()
+            self.__file = None
+
+def read_result_file(file_name):
+    '''
+    Reads a file written by result_stream_writer. Returns the node names and a generator
+    yielding the node values of every vector. The generator opens the file on its first
+    vector and closes it when exhausted or closed, a generator never iterated does not
+    keep the file open
+    '''
+    with open(file_name, "rb") as f:
+        magic = f.read(len(result_file_magic))
+        if magic == result_file_magic:
+            f.seek(0)
+            magic, num_nodes, names_length = result_file_header.unpack(f.read(result_file_header.size))
+            node_names = f.read(names_length).decode().split("\n") if num_nodes else []
+
+    if magic != result_file_magic:
+        value_of = dict((node_value.str_repr[value], value) for value in node_value.str_repr)
+        with open(file_name) as f:
+            node_names = f.readline().rstrip("\n").split(",")
+        def csv_vectors():
+            with open(file_name) as f:
+                f.readline()
+                for line in f:
+                    yield [value_of[s] for s in line.rstrip("\n").split(",")]
+        return node_names, csv_vectors()
+
+    def binary_vectors():
+        with open(file_name, "rb") as f:
+            f.seek(result_file_header.size + names_length)
+            while True:
+                header = f.read(result_chunk_header.size)
+                if len(header) < result_chunk_header.size:
+                    return
+                num_vectors = result_chunk_header.unpack(header)[0]
+                data = f.read(num_vectors * num_nodes)
+                for k in range(num_vectors):
+                    yield [byte_value[code] for code in data[k * num_nodes:(k + 1) * num_nodes]]
+    return node_names, binary_vectors()
+
+class count_sink(result_sink):
+    '''
+    Keeps only the number of times every node takes every value, blocks of a bit-parallel
+    simulation are counted with one population count per node
+
+    Attributes:
+    counts: Count of each node value per node(array), keys are the node values
+    '''
+
+    def __init__(self):
+        super().__init__()
+        self.counts = None
+        self.column_index = {}
+
+    def _start(self):
+        self.counts = dict((value, array("q", [0]) * len(self.node_names)) for value in byte_value)
+        for k in range(len(self.node_names)):
+            self.column_index[self.node_names[k]] = k
+
+    def add(self, values):
+        counts = self.counts
+        k = 0
+        for value in values:
+            counts[value][k] += 1
+            k += 1
+        self.num_vectors += 1
+
+    def add_block(self, words, num_patterns):
+        zero_counts = self.counts[node_value.zero]
+        one_counts = self.counts[node_value.one]
+        for k in range(len(words)):
+            num_ones = words[k].bit_count()
+            one_counts[k] += num_ones
+            zero_counts[k] += num_patterns - num_ones
+        self.num_vectors += num_patterns
+
+    def count(self, node_name, value):
+        '''
+        Returns the number of vectors for which the node had the value
+        '''
+        return self.counts[value][self.column_index[node_name]]
+
+    def print_table(self):
+        '''
+        Prints the counts of every node
+        '''
+        print("| Node       " + "".join("| {:>8} ".format("N" + node_value.str_repr[value]) for value in byte_value) + "|")
+        for k in range(len(self.node_names)):
+            print("| {:<10} ".format(self.node_names[k]) + "".join("| {:>8} ".format(self.counts[value][k]) for value in byte_value) + "|")
@@ -0,0 +1,822 @@
+import asyncio
+import hashlib
+import ipaddress
+import json
+import os
+import random
+import socket
+import stat
+import threading
+import time
+from collections import OrderedDict
+from .circuit import *
+from .fault_simulation import *
+
+#largest request or response line, input vectors are sent inline
+max_line_length = 1 << 26
+
+#directory of the bundled bench files, the default circuit root of the service
+default_circuit_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "project1", "bench_files")
+
+def _pack_vectors(vectors, num_inputs):
+    '''
+    Packs input vectors given as strings of 0 and 1 into one word per input, bit i of the
+    j-th word is the j-th character of the i-th vector
+    '''
+    if not vectors:
+        return [0] * num_inputs
+    return [int("".join([v[j] for v in reversed(vectors)]), 2) for j in range(num_inputs)]
+
+def _unpack_vectors(words, offset, num_vectors):
+    '''
+    Returns num_vectors strings of 0 and 1 from the packed words starting at bit offset,
+    the j-th character of the i-th string is bit offset + i of the j-th word
+    '''
+    if num_vectors == 0:
+        return []
+    mask = (1 << num_vectors) - 1
+    columns = [format((w >> offset) & mask, f"0{num_vectors}b")[::-1] for w in words]
+    return ["".join(bits) for bits in zip(*columns)]
+
+def _address_string(address):
+    '''
+    Returns a printable form of a service address, a Unix socket path or (host, port)
+    '''
+    return address if isinstance(address, str) else f"{address[0]}:{address[1]}"
+
+def _is_loopback(host):
+    '''
+    Returns True if every address the host name resolves to is a loopback address
+    '''
+    if not host:
+        return False
+    try:
+        addresses = [info[4][0] for info in socket.getaddrinfo(host, None)]
+    except socket.gaierror:
+        return False
+    return bool(addresses) and all(ipaddress.ip_address(a.split("%")[0]).is_loopback for a in addresses)
+
+def _remove_socket(socket_path):
+    '''
+    Removes a stale Unix socket. Raises SocketPathInUse if the path is another kind of file,
+    symbolic links included
+    '''
+    try:
+        status = os.lstat(socket_path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(status.st_mode):
+        raise SocketPathInUse(socket_path)
+    os.remove(socket_path)
+
+class cached_circuit:
+    '''
+    A levelized circuit kept loaded by the simulation service. The fault simulator is
+    only created by the first fault grading request. Fault grading runs in a worker thread,
+    the fault grading requests of a circuit are served one at a time.
+
+    Attributes:
+    circuit_bench_file: Path of the bench file the circuit was loaded from
+    digest: sha256 of the bench file
+    circuit_under_test: Levelized circuit
+    input_names: Names of the inputs, in the order of the characters of the input vectors
+    output_names: Names of the outputs, in the order of the characters of the results
+    pending: Coalesced simulate requests waiting for the next batch, (vectors, future)
+    '''
+
+    def __init__(self, circuit_bench_file, digest, use_cache = True):
+        '''
+        Loads and levelizes a circuit
+
+        param[in] circuit_bench_file: Path of the bench file
+        param[in] digest: sha256 of the bench file
+        param[in] use_cache: Keep the parsed bench file in the binary netlist cache
+        '''
+        self.circuit_bench_file = circuit_bench_file
+        self.digest = digest
+        self.circuit_under_test = circuit(circuit_bench_file, use_cache)
+        self.circuit_under_test.levelize_circuit()
+        self.input_names = [n.name for n in self.circuit_under_test.input_list]
+        self.output_names = [n.name for n in self.circuit_under_test.output_list]
+        self.output_index = [self.circuit_under_test.node_index[name] for name in self.output_names]
+        self.pending = []
+        self.__fault_simulator = None
+        self.__fault_grade_lock = threading.Lock()
+
+    @property
+    def fault_simulator(self):
+        '''
+        Fault simulator of the circuit, created on first use
+        '''
+        if self.__fault_simulator == None:
+            self.__fault_simulator = fault_simulator(self.circuit_under_test)
+        return self.__fault_simulator
+
+    def check_vectors(self, vectors):
+        '''
+        Returns the input vectors as strings of 0 and 1, vectors can be given as strings or
+        as lists of 0 and 1. Raises ServiceRequestError for a vector that is not valid
+        '''
+        if not isinstance(vectors, list):
+            raise ServiceRequestError("vectors must be a list of input vectors")
+        checked = []
+        for v in vectors:
+            if isinstance(v, list):
+                v = "".join([str(value) for value in v])
+            if (not isinstance(v, str)) or (len(v) != len(self.input_names)) or v.strip("01"):
+                raise ServiceRequestError(f"Input vector {v} is not {len(self.input_names)} values of 0 and 1")
+            checked.append(v)
+        return checked
+
+    def simulate(self, vector_lists):
+        '''
+        Simulates several lists of input vectors in one bit-parallel simulation. Returns
+        the output values of every list, one string per input vector
+        '''
+        vectors = [v for vector_list in vector_lists for v in vector_list]
+        packed = _pack_vectors(vectors, len(self.input_names))
+        input_words = dict(zip(self.input_names, packed))
+        words = self.circuit_under_test.simulate_parallel(input_words, len(vectors))
+        output_words = [words[i] for i in self.output_index]
+
+        results = []
+        offset = 0
+        for vector_list in vector_lists:
+            results.append(_unpack_vectors(output_words, offset, len(vector_list)))
+            offset += len(vector_list)
+        return results
+
+    def fault_grade(self, vectors, block_size = 64, list_undetected = False):
+        '''
+        Fault simulates the input vectors against all the faults with fault dropping.
+        Returns the number of faults, the number detected and the fault coverage, with the
+        undetected fault strings if list_undetected is set
+        '''
+        with self.__fault_grade_lock:
+            simulator = self.fault_simulator
+            undetected = list(range(len(simulator.fault_strings)))
+            for start in range(0, len(vectors), block_size):
+                if not undetected:
+                    break
+                block = [[int(c) for c in v] for v in vectors[start:start + block_size]]
+                detection = simulator.simulate(block, undetected)
+                undetected = [fault_id for fault_id in undetected if detection[fault_id] == 0]
+
+        num_faults = len(simulator.fault_strings)
+        result = {"num_faults": num_faults, "num_detected": num_faults - len(undetected),
+                  "coverage": ((num_faults - len(undetected)) / num_faults) * 100 if num_faults else 100.0}
+        if list_undetected:
+            result["undetected"] = [simulator.fault_strings[f] for f in undetected]
+        return result
+
+    def describe(self):
+        '''
+        Returns the file, digest, inputs and outputs of the circuit
+        '''
+        return {"circuit": self.circuit_bench_file, "digest": self.digest, "inputs": self.input_names,
+                "outputs": self.output_names, "num_nodes": len(self.circuit_under_test.nodes),
+                "num_levels": self.circuit_under_test.num_levels}
+
+class circuit_cache:
+    '''
+    Loaded and levelized circuits, keyed by the sha256 of their bench file, so a bench
+    file reached by another path or copied shares the entry and an edited bench file is
+    loaded again. The digest of a path is computed again only when the modification time
+    or the size of the file changes. The least recently used circuit is evicted once more
+    than max_circuits are loaded.
+
+    Only bench files inside circuit_root, or listed in allowed_files, are opened: a path
+    is resolved against circuit_root, symbolic links included, and refused otherwise.
+    A file that can not be parsed is reported as not a valid bench file, without the
+    parser message that could show its contents.
+
+    Attributes:
+    max_circuits: Largest number of circuits kept loaded
+    circuit_root: Directory of the bench files that can be loaded
+    allowed_files: Bench files outside circuit_root that can be loaded
+    entries: Loaded circuits(cached_circuit), keys are the digests, least recently used first
+    hits: Number of requests served by a loaded circuit
+    misses: Number of requests that loaded a circuit
+    evictions: Number of circuits evicted
+    '''
+
+    def __init__(self, max_circuits = 8, use_cache = True, circuit_root = None, allowed_files = None):
+        '''
+        Creates an empty cache
+
+        param[in] max_circuits: Largest number of circuits kept loaded
+        param[in] use_cache: Keep the parsed bench files in the binary netlist cache
+        param[in] circuit_root: Directory of the bench files that can be loaded, the bundled
+                                bench files if not given
+        param[in] allowed_files: Bench files outside circuit_root that can be loaded
+        '''
+        if circuit_root == None:
+            circuit_root = default_circuit_root
+        self.max_circuits = max_circuits
+        self.circuit_root = os.path.realpath(circuit_root)
+        self.allowed_files = set(os.path.realpath(f) for f in (allowed_files or []))
+        self.use_cache = use_cache
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__digests = {} #(modification time, size, digest) of each path
+
+    def resolve(self, circuit_bench_file):
+        '''
+        Returns the real path of a bench file, relative paths are inside circuit_root.
+        Raises ServiceRequestError if the file is neither inside circuit_root nor allowed
+        '''
+        path = os.path.realpath(os.path.join(self.circuit_root, circuit_bench_file))
+        if (os.path.commonpath([self.circuit_root, path]) != self.circuit_root) and (path not in self.allowed_files):
+            raise ServiceRequestError(f"{circuit_bench_file} is not in the circuit directory of the service")
+        return path
+
+    def file_digest(self, circuit_bench_file):
+        '''
+        Returns the sha256 of a bench file. Raises ServiceRequestError if the file is not
+        allowed or can not be read
+        '''
+        path = self.resolve(circuit_bench_file)
+        try:
+            status = os.stat(path)
+            known = self.__digests.get(path)
+            if (known != None) and (known[0] == status.st_mtime_ns) and (known[1] == status.st_size):
+                return known[2]
+            with open(path, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+        except OSError as e:
+            raise ServiceRequestError(f"Can not read {circuit_bench_file}: {e.strerror}")
+        self.__digests[path] = (status.st_mtime_ns, status.st_size, digest)
+        return digest
+
+    def get(self, circuit_bench_file):
+        '''
+        Returns the loaded circuit(cached_circuit) of a bench file, loading it if needed
+        '''
+        digest = self.file_digest(circuit_bench_file)
+        if digest in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(digest)
+            return self.entries[digest]
+
+        self.misses += 1
+        try:
+            entry = cached_circuit(self.resolve(circuit_bench_file), digest, self.use_cache)
+        except Exception:
+            raise ServiceRequestError(f"Can not load {circuit_bench_file}: not a valid bench file")
+        self.entries[digest] = entry
+        while len(self.entries) > self.max_circuits:
+            self.entries.popitem(last = False)
+            self.evictions += 1
+        return entry
+
+class simulation_server:
+    '''
+    Long-lived simulation service keeping the circuits loaded between requests, served
+    with asyncio over a Unix socket or a localhost TCP port.
+
+    The protocol is one JSON object per line in both directions. A request has an "op",
+    an optional "id" returned in the response and the fields of the op, paths of bench
+    files are resolved by the server inside its circuit root. A response is
+    {"id", "ok": true, "result"} or {"id", "ok": false, "error"}. Requests of a connection
+    are served concurrently, so the responses of pipelined requests can come in any order.
+
+    Ops:
+    ping: Returns "pong"
+    load: circuit. Loads the circuit, returns its digest, inputs and outputs
+    simulate: circuit, vectors. Returns the output values of every vector as strings of
+                0 and 1 in the order of the outputs, vectors are strings of 0 and 1 in the
+                order of the inputs
+    fault_grade: circuit, vectors, list_undetected(optional). Returns the fault coverage of
+                 the vectors against all the faults
+    stats: Returns the counters of the server and of the circuit cache
+
+    Simulate requests for the same circuit arriving while a batch is pending are coalesced
+    into one bit-parallel simulation of up to max_batch_vectors vectors, each request gets
+    its own slice of the output words back. The simulations run on the event loop, so the
+    requests arriving during one simulation form the next batch. Fault grading takes much
+    longer and runs in the default executor of the event loop (a thread pool), so it does
+    not hold up the simulate batches and pings of the other clients; the thread still
+    shares the interpreter with the event loop, which gets slower while it runs.
+
+    Attributes:
+    cache: Loaded circuits(circuit_cache)
+    batch_delay: Seconds a batch waits for more requests, 0 waits for one turn of the event loop
+    max_batch_vectors: Largest number of vectors simulated in one batch
+    num_requests: Number of requests served
+    num_simulate_requests: Number of simulate requests served
+    num_batches: Number of batched simulations run
+    '''
+
+    def __init__(self, max_circuits = 8, batch_delay = 0.0, max_batch_vectors = 4096, use_cache = True,
+                 circuit_root = None, allowed_files = None):
+        '''
+        Creates the server, call start to listen
+
+        param[in] max_circuits: Largest number of circuits kept loaded
+        param[in] batch_delay: Seconds a batch of simulate requests waits for more requests
+        param[in] max_batch_vectors: Largest number of vectors simulated in one batch
+        param[in] use_cache: Keep the parsed bench files in the binary netlist cache
+        param[in] circuit_root: Directory of the bench files clients can load, the bundled
+                                bench files if not given
+        param[in] allowed_files: Bench files outside circuit_root clients can load
+        '''
+        self.cache = circuit_cache(max_circuits, use_cache, circuit_root, allowed_files)
+        self.batch_delay = batch_delay
+        self.max_batch_vectors = max_batch_vectors
+        self.num_requests = 0
+        self.num_simulate_requests = 0
+        self.num_batches = 0
+        self.address = None
+        self.__server = None
+        self.__ops = {"ping": self.__ping, "load": self.__load, "simulate": self.__simulate,
+                      "fault_grade": self.__fault_grade, "stats": self.__stats}
+
+    async def start(self, socket_path = None, host = "127.0.0.1", port = 0, allow_remote = False):
+        '''
+        Starts listening on a Unix socket if socket_path is given, on a TCP port otherwise
+        (port 0 picks a free port). Returns the address, the socket path or (host, port).
+        Raises RemoteHostRefused if the host is not a loopback address and allow_remote is
+        not set, the service has no authentication.
+
+        A stale socket at socket_path is replaced, any other file raises SocketPathInUse.
+        The socket is bound and made readable and writable by the owner only (0600) before
+        listening, so other users can not connect
+        '''
+        if (socket_path == None) and (not allow_remote) and (not _is_loopback(host)):
+            raise RemoteHostRefused(host)
+        if socket_path != None:
+            _remove_socket(socket_path)
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.bind(socket_path)
+                os.chmod(socket_path, 0o600)
+            except OSError:
+                sock.close()
+                raise
+            self.__server = await asyncio.start_unix_server(self.__handle_connection, sock = sock,
+                                                            limit = max_line_length)
+            self.address = socket_path
+        else:
+            self.__server = await asyncio.start_server(self.__handle_connection, host, port, limit = max_line_length)
+            self.address = self.__server.sockets[0].getsockname()[:2]
+        return self.address
+
+    async def serve_forever(self):
+        '''
+        Serves the requests until the server is closed
+        '''
+        await self.__server.serve_forever()
+
+    async def close(self):
+        '''
+        Stops listening and removes the Unix socket
+        '''
+        if self.__server != None:
+            self.__server.close()
+            await self.__server.wait_closed()
+            self.__server = None
+            if isinstance(self.address, str):
+                try:
+                    _remove_socket(self.address)
+                except SocketPathInUse:
+                    pass
+
+    async def __handle_connection(self, reader, writer):
+        '''
+        Reads the requests of a connection and serves each one in its own task
+        '''
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.ensure_future(self.__respond(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.wait(tasks)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def __respond(self, line, writer):
+        '''
+        Serves one request line and writes the response line
+        '''
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ServiceRequestError("A request must be a JSON object")
+            request_id = request.get("id")
+            op = request.get("op")
+            if op not in self.__ops:
+                raise ServiceRequestError(f"Unknown op {op}, use one of {', '.join(self.__ops)}")
+            response = {"id": request_id, "ok": True, "result": await self.__ops[op](request)}
+        except ServiceRequestError as e:
+            response = {"id": request_id, "ok": False, "error": e.message}
+        except json.JSONDecodeError as e:
+            response = {"id": request_id, "ok": False, "error": f"Request is not valid JSON: {e}"}
+        except Exception as e:
+            response = {"id": request_id, "ok": False, "error": f"{type(e).__name__}: {e}"}
+        self.num_requests += 1
+
+        try:
+            writer.write((json.dumps(response) + "\n").encode())
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    def __circuit(self, request):
+        '''
+        Returns the loaded circuit of a request
+        '''
+        if not isinstance(request.get("circuit"), str):
+            raise ServiceRequestError("The request needs the path of the circuit bench file")
+        return self.cache.get(request["circuit"])
+
+    async def __ping(self, request):
+        '''
+        Serves ping, checks that the server is up
+        '''
+        return "pong"
+
+    async def __load(self, request):
+        '''
+        Serves load
+        '''
+        return self.__circuit(request).describe()
+
+    async def __simulate(self, request):
+        '''
+        Serves simulate, the request waits in the pending requests of the circuit until
+        its batch is simulated
+        '''
+        entry = self.__circuit(request)
+        vectors = entry.check_vectors(request.get("vectors"))
+        self.num_simulate_requests += 1
+        future = asyncio.get_running_loop().create_future()
+        entry.pending.append((vectors, future))
+        if len(entry.pending) == 1:
+            asyncio.ensure_future(self.__run_batches(entry))
+        return await future
+
+    async def __run_batches(self, entry: cached_circuit):
+        '''
+        Waits for more simulate requests, then simulates all the pending requests of the
+        circuit in batches of up to max_batch_vectors vectors
+        '''
+        await asyncio.sleep(self.batch_delay)
+        pending = entry.pending
+        entry.pending = []
+
+        start = 0
+        while start < len(pending):
+            end = start + 1
+            num_vectors = len(pending[start][0])
+            while (end < len(pending)) and (num_vectors + len(pending[end][0]) <= self.max_batch_vectors):
+                num_vectors += len(pending[end][0])
+                end += 1
+            batch = pending[start:end]
+            try:
+                results = entry.simulate([vectors for vectors, future in batch])
+                for (vectors, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+            except Exception as e:
+                for vectors, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            self.num_batches += 1
+            start = end
+
+    async def __fault_grade(self, request):
+        '''
+        Serves fault_grade in a worker thread, the event loop keeps serving the other requests
+        '''
+        entry = self.__circuit(request)
+        vectors = entry.check_vectors(request.get("vectors"))
+        list_undetected = bool(request.get("list_undetected", False))
+        return await asyncio.get_running_loop().run_in_executor(None, entry.fault_grade, vectors, 64, list_undetected)
+
+    async def __stats(self, request):
+        '''
+        Serves stats
+        '''
+        return {"requests": self.num_requests, "simulate_requests": self.num_simulate_requests,
+                "batches": self.num_batches, "cache_hits": self.cache.hits, "cache_misses": self.cache.misses,
+                "evictions": self.cache.evictions,
+                "circuits": [{"circuit": e.circuit_bench_file, "digest": e.digest} for e in self.cache.entries.values()]}
+
+def run_server(socket_path = None, host = "127.0.0.1", port = 0, allow_remote = False, **options):
+    '''
+    Runs a simulation server until interrupted, options are passed to simulation_server.
+    Only loopback hosts are accepted unless allow_remote is set
+    '''
+    async def serve():
+        server = simulation_server(**options)
+        address = await server.start(socket_path, host, port, allow_remote)
+        print(f"Simulation service listening on {_address_string(address)}", flush = True)
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+class simulation_client:
+    '''
+    Blocking client of the simulation service, sends one request at a time. Paths of
+    bench files are sent as given, the server resolves relative paths inside its circuit
+    root.
+
+    Attributes:
+    address: Unix socket path or (host, port) of the server
+    '''
+
+    def __init__(self, address, timeout = None):
+        '''
+        Connects to the server
+
+        param[in] address: Unix socket path or (host, port) of the server
+        param[in] timeout: Seconds to wait for a response, no limit if not given
+        '''
+        self.address = address
+        if isinstance(address, str):
+            self.__socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self.__socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.__socket.settimeout(timeout)
+        self.__socket.connect(address if isinstance(address, str) else tuple(address))
+        self.__file = self.__socket.makefile("rb")
+        self.__next_id = 0
+
+    def request(self, op, **fields):
+        '''
+        Sends a request and returns its result. Raises ServiceRequestError with the message
+        of the server if the request failed
+        '''
+        self.__next_id += 1
+        fields["op"] = op
+        fields["id"] = self.__next_id
+        self.__socket.sendall((json.dumps(fields) + "\n").encode())
+        line = self.__file.readline()
+        if not line:
+            raise ConnectionError(f"Simulation service at {_address_string(self.address)} closed the connection")
+        response = json.loads(line)
+        if not response["ok"]:
+            raise ServiceRequestError(response["error"])
+        return response["result"]
+
+    def ping(self):
+        '''
+        Returns "pong" if the server is up
+        '''
+        return self.request("ping")
+
+    def load(self, circuit_bench_file):
+        '''
+        Loads a circuit, returns its digest, inputs and outputs
+        '''
+        return self.request("load", circuit = circuit_bench_file)
+
+    def simulate(self, circuit_bench_file, vectors):
+        '''
+        Simulates input vectors (strings or lists of 0 and 1 in the order of the inputs).
+        Returns the output values of every vector as strings of 0 and 1
+        '''
+        return self.request("simulate", circuit = circuit_bench_file, vectors = vectors)
+
+    def fault_grade(self, circuit_bench_file, vectors, list_undetected = False):
+        '''
+        Fault simulates input vectors against all the faults, returns the fault coverage
+        '''
+        return self.request("fault_grade", circuit = circuit_bench_file, vectors = vectors,
+                            list_undetected = list_undetected)
+
+    def stats(self):
+        '''
+        Returns the counters of the server and of its circuit cache
+        '''
+        return self.request("stats")
+
+    def close(self):
+        '''
+        Closes the connection
+        '''
+        self.__file.close()
+        self.__socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class async_simulation_client:
+    '''
+    asyncio client of the simulation service, requests are pipelined on one connection
+    and matched to their responses by id. Call connect before sending requests.
+
+    Attributes:
+    address: Unix socket path or (host, port) of the server
+    '''
+
+    def __init__(self, address):
+        self.address = address
+        self.__reader = None
+        self.__writer = None
+        self.__responses = {} #future of each pending request, keys are the ids
+        self.__next_id = 0
+        self.__read_task = None
+
+    async def connect(self):
+        '''
+        Connects to the server
+        '''
+        if isinstance(self.address, str):
+            self.__reader, self.__writer = await asyncio.open_unix_connection(self.address, limit = max_line_length)
+        else:
+            self.__reader, self.__writer = await asyncio.open_connection(*self.address, limit = max_line_length)
+        self.__read_task = asyncio.ensure_future(self.__read_responses())
+        return self
+
+    async def __read_responses(self):
+        '''
+        Resolves the pending requests as their responses arrive
+        '''
+        try:
+            while True:
+                line = await self.__reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = self.__responses.pop(response["id"], None)
+                if (future == None) or future.done():
+                    continue
+                if response["ok"]:
+                    future.set_result(response["result"])
+                else:
+                    future.set_exception(ServiceRequestError(response["error"]))
+        finally:
+            for future in self.__responses.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Simulation service closed the connection"))
+            self.__responses = {}
+
+    async def request(self, op, **fields):
+        '''
+        Sends a request and returns its result. Raises ServiceRequestError with the message
+        of the server if the request failed
+        '''
+        self.__next_id += 1
+        fields["op"] = op
+        fields["id"] = self.__next_id
+        future = asyncio.get_running_loop().create_future()
+        self.__responses[self.__next_id] = future
+        self.__writer.write((json.dumps(fields) + "\n").encode())
+        await self.__writer.drain()
+        return await future
+
+    async def load(self, circuit_bench_file):
+        return await self.request("load", circuit = circuit_bench_file)
+
+    async def simulate(self, circuit_bench_file, vectors):
+        return await self.request("simulate", circuit = circuit_bench_file, vectors = vectors)
+
+    async def fault_grade(self, circuit_bench_file, vectors, list_undetected = False):
+        return await self.request("fault_grade", circuit = circuit_bench_file, vectors = vectors,
+                                  list_undetected = list_undetected)
+
+    async def stats(self):
+        return await self.request("stats")
+
+    async def close(self):
+        '''
+        Closes the connection once the responses of the pending requests arrived
+        '''
+        if self.__writer != None:
+            self.__writer.close()
+            try:
+                await self.__writer.wait_closed()
+            except ConnectionError:
+                pass
+            await self.__read_task
+            self.__writer = None
+
+    async def __aenter__(self):
+        return await self.connect()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+def _percentile(values, fraction):
+    '''
+    Returns the value below which the given fraction of the sorted values lie
+    '''
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0.0
+
+async def measure_service(address, circuit_bench_file, num_clients = 8, num_requests = 100, vectors_per_request = 1,
+                          seed = 0):
+    '''
+    Measures the throughput and the latency of simulate requests against a running server.
+    num_clients clients each send num_requests requests one after the other, all the
+    clients at once. Returns a dictionary of the measures, latencies in milliseconds
+
+    param[in] address: Unix socket path or (host, port) of the server
+    param[in] circuit_bench_file: Bench file of the simulated circuit
+    param[in] num_clients: Number of concurrent clients
+    param[in] num_requests: Number of requests of every client
+    param[in] vectors_per_request: Number of random input vectors of every request
+    param[in] seed: Seed of the random input vectors
+    '''
+    clients = [await async_simulation_client(address).connect() for k in range(num_clients)]
+    try:
+        num_inputs = len((await clients[0].load(circuit_bench_file))["inputs"])
+        generator = random.Random(seed)
+        requests = [[["".join(generator.choice("01") for j in range(num_inputs)) for v in range(vectors_per_request)]
+                     for r in range(num_requests)] for c in range(num_clients)]
+        before = await clients[0].stats()
+        latencies = []
+
+        async def run_client(client, client_requests):
+            for vectors in client_requests:
+                start = time.perf_counter()
+                await client.simulate(circuit_bench_file, vectors)
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[run_client(clients[c], requests[c]) for c in range(num_clients)])
+        elapsed = time.perf_counter() - start
+        after = await clients[0].stats()
+    finally:
+        for client in clients:
+            await client.close()
+
+    latencies.sort()
+    total = num_clients * num_requests
+    return {"circuit": os.path.basename(circuit_bench_file), "clients": num_clients, "requests": total,
+            "vectors_per_request": vectors_per_request, "seconds": elapsed,
+            "requests_per_second": total / elapsed if elapsed else 0.0,
+            "vectors_per_second": total * vectors_per_request / elapsed if elapsed else 0.0,
+            "latency_mean": sum(latencies) * 1000 / len(latencies) if latencies else 0.0,
+            "latency_p50": _percentile(latencies, 0.5) * 1000, "latency_p95": _percentile(latencies, 0.95) * 1000,
+            "latency_max": latencies[-1] * 1000 if latencies else 0.0,
+            "batches": after["batches"] - before["batches"]}
+
+def measure_cold_request(circuit_bench_file, vectors_per_request = 1, seed = 0):
+    '''
+    Returns the seconds a script takes to serve one simulate request without the service:
+    parse, levelize and simulate
+    '''
+    start = time.perf_counter()
+    c = circuit(circuit_bench_file)
+    c.levelize_circuit()
+    generator = random.Random(seed)
+    vectors = ["".join(generator.choice("01") for n in c.input_list) for v in range(vectors_per_request)]
+    words = _pack_vectors(vectors, len(c.input_list))
+    c.simulate_parallel(dict(zip([n.name for n in c.input_list], words)), len(vectors))
+    return time.perf_counter() - start
+
+def benchmark_service(circuit_bench_file, socket_path = None, num_clients = 8, num_requests = 100,
+                      vectors_per_request = 1, seed = 0, **options):
+    '''
+    Starts a server in this process, measures it with measure_service and adds the time of
+    one request served without the service (cold_request_ms). Options are passed to
+    simulation_server, the bench file is allowed whatever the circuit root
+    '''
+    options["allowed_files"] = list(options.get("allowed_files") or []) + [circuit_bench_file]
+
+    async def measure():
+        server = simulation_server(**options)
+        address = await server.start(socket_path)
+        try:
+            return await measure_service(address, circuit_bench_file, num_clients, num_requests,
+                                         vectors_per_request, seed)
+        finally:
+            await server.close()
+
+    results = asyncio.run(measure())
+    results["cold_request_ms"] = measure_cold_request(circuit_bench_file, vectors_per_request, seed) * 1000
+    return results
+
+def print_service_benchmark(results):
+    '''
+    Prints the output of benchmark_service or measure_service
+    '''
+    print(f"{results['circuit']}: {results['clients']} clients, {results['requests']} requests of "
+          f"{results['vectors_per_request']} vectors in {results['seconds']:.3f}s")
+    print(f"Throughput: {results['requests_per_second']:.0f} requests/s, {results['vectors_per_second']:.0f} vectors/s")
+    print(f"Latency(ms): mean {results['latency_mean']:.3f}, p50 {results['latency_p50']:.3f}, "
+          f"p95 {results['latency_p95']:.3f}, max {results['latency_max']:.3f}")
+    print(f"Batched simulations: {results['batches']} "
+          f"({results['requests'] / results['batches'] if results['batches'] else 0:.1f} requests per batch)")
+    if "cold_request_ms" in results:
+        print(f"Request without the service(parse, levelize, simulate): {results['cold_request_ms']:.3f}ms")
@@ -0,0 +1,432 @@
+import itertools
+import random
+from .circuit import *
+from .bit_parallel import *
+from .fault_simulation import *
+from .pattern_source import *
+from .result_sinks import *
+from .exhaustive import minterm_words
+
+def create_input_vector(num_inputs, choices = [node_value.zero, node_value.one]):
+    '''
+    Returns all the input vectors made of the choices, the first input changes the fastest.
+    All the vectors are kept in memory, use gray_code_vectors to stream them instead
+    '''
+    if num_inputs == 0:
+        return []
+    return [list(reversed(values)) for values in itertools.product(choices, repeat = num_inputs)]
+
+def int_to_binary_list(num, n):
+    """
+    Converts an integer to a binary representation in the form of a list of size n.
+
+    Args:
+        num (int): The integer to convert to binary.
+        n (int): The size of the resulting list.
+    
+    Returns:
+        list: A list of size n where each element is a binary digit (0 or 1).
+    """
+    if num >= 2 ** n:
+        raise ValueError(f"The number {num} exceeds the maximum representable value for n = {n}.")
+
+    # Convert the number to binary, remove the '0b' prefix, and pad with leading zeros
+    binary_str = f"{num:0{n}b}"
+    binary_list = [int(bit) for bit in binary_str]
+    
+    for i in range(len(binary_list)):
+        if binary_list[i] == 0:
+            binary_list[i] = node_value.zero
+        else:
+            binary_list[i] = node_value.one
+
+    return binary_list
+
+def monte_carlo_select(n):
+    """
+    Performs Monte Carlo simulations to select a number between 0 and 2^n - 1.
+
+    Args:
+        n (int): The number of bits, defining the range [0, 2^n - 1].
+        num_simulations (int): Number of Monte Carlo simulations (default: 100000).
+    
+    Returns:
+        int: A randomly selected number between 0 and 2^n - 1.
+    """
+    max_value = 2 ** n
+    selected_number = random.randint(0, max_value - 1)
+    return int_to_binary_list(selected_number, n)
+
+def print_tables(dict_list, convert_node_value = True):
+    '''
+    This functions prints the list of dictionary in a table format
+    '''
+    headers = dict_list[0].keys()
+    for h in headers:
+        print("| {:<5} ".format(h), end = "")
+    print("|")
+
+    for d in dict_list:
+        for h in d:
+            if convert_node_value:
+                print("| {:<5} ".format(node_value.str_repr[d[h]]), end = "")
+            else:
+                print("| {:<5} ".format(d[h]), end = "")
+        print("|")
+
+
+def _result_nodes(circuit_under_test: circuit):
+    '''
+    Returns the nodes in the order of the results of test_circuit, the inputs followed by
+    the gates in the ascending order of levels. Only levelized_nodes is used, so a
+    compact_netlist gives its node views
+    '''
+    result_nodes = list(circuit_under_test.input_list)
+    levelized_nodes = circuit_under_test.levelized_nodes
+    for level in levelized_nodes:
+        if level != 0:
+            result_nodes.extend(levelized_nodes[level])
+    return result_nodes
+
+def result_node_names(circuit_under_test: circuit):
+    '''
+    Returns the names of the nodes in the order of the results of test_circuit, the inputs
+    followed by the gates in the ascending order of levels
+    '''
+    return [n.name for n in _result_nodes(circuit_under_test)]
+
+def test_circuit(circuit_under_test: circuit, iv_list, print_result = True, parallel = False, word_size = 64,
+                 event_driven = False, sink: result_sink = None):
+    '''
+    This function tests the given circuit with the input vector in the iv_list.
+    If parallel is set, word_size input vectors are simulated at once using the
+    bit-parallel simulation, blocks with X inputs use the three-valued (dual-rail)
+    bit-parallel simulation.
+    If event_driven is set, only the gates affected by the inputs changed since the
+    previous input vector are evaluated and the number of gates evaluated for each
+    input vector is returned.
+
+    The node values of every input vector are given to the sink (columnar_result_store,
+    result_stream_writer or count_sink), in the order of result_node_names. Without a
+    sink the results are only kept, in a columnar_result_store, to be printed if
+    print_result is set
+    '''
+    if (sink == None) and print_result:
+        results = columnar_result_store()
+    else:
+        results = sink
+    if results != None:
+        results.begin(result_node_names(circuit_under_test))
+
+    if parallel:
+        _test_circuit_parallel(circuit_under_test, iv_list, results, word_size)
+    else:
+        num_evaluations = _test_circuit_scalar(circuit_under_test, iv_list, results, event_driven)
+
+    if (sink == None) and print_result:
+        results.print_table()
+
+    if event_driven and not parallel:
+        return num_evaluations
+
+def _test_circuit_scalar(circuit_under_test: circuit, iv_list, results: result_sink, event_driven):
+    '''
+    This function tests the given circuit with the input vectors in the iv_list one at a
+    time, the node values are given to results if it is not None
+    '''
+    input_vector = {}
+    
+    for n in circuit_under_test.input_list:
+        input_vector[n.name] = node_value.undefined
+
+    result_nodes = _result_nodes(circuit_under_test)
+    num_evaluations = []
+    
+    for iv in iv_list:
+        i = 0
+        for n in input_vector:
+            input_vector[n] = iv[i]
+            i = i + 1
+        if event_driven:
+            num_evaluations.append(circuit_under_test.simulate_event_driven(input_vector))
+        else:
+            circuit_under_test.simulate(input_vector)
+        if results != None:
+            results.add([n.value for n in result_nodes])
+
+    return num_evaluations
+
+def _test_circuit_parallel(circuit_under_test: circuit, iv_list, results: result_sink, word_size):
+    '''
+    This function tests the given circuit with the input vectors in the iv_list using
+    the bit-parallel simulation, word_size input vectors are simulated at once. The
+    packed words of every block are given to results if it is not None. Blocks with X
+    inputs are simulated with the three-valued simulation and given vector by vector
+    '''
+    num_inputs = len(circuit_under_test.input_list)
+    input_names = [n.name for n in circuit_under_test.input_list]
+    result_index = [circuit_under_test.node_index[node_name] for node_name in result_node_names(circuit_under_test)]
+
+    for start in range(0, len(iv_list), word_size):
+        iv_block = iv_list[start:start + word_size]
+        if any(node_value.undefined in iv for iv in iv_block):
+            zero_words, one_words = pack_three_valued_vectors(iv_block, num_inputs)
+            zeros, ones = circuit_under_test.simulate_three_valued(dict(zip(input_names, zip(zero_words, one_words))),
+                                                                   len(iv_block), update_nodes = True)
+            if results != None:
+                for pattern in range(len(iv_block)):
+                    results.add([unpack_rails(zeros[i], ones[i], pattern) for i in result_index])
+            continue
+
+        packed_inputs = pack_input_vectors(iv_block, num_inputs)
+        input_words = {}
+        for i in range(num_inputs):
+            input_words[circuit_under_test.input_list[i].name] = packed_inputs[i]
+
+        words = circuit_under_test.simulate_parallel(input_words, len(iv_block), update_nodes = True)
+
+        if results != None:
+            results.add_block([words[i] for i in result_index], len(iv_block))
+
+def test_fault_simulation(circuit_under_test: circuit, input_vector, fault_string):
+    '''
+    This function activates the specified fault and check if the fault can be detected
+    '''
+
+    circuit_under_test.create_fault_list()
+    circuit_under_test.select_fault(fault_string)
+    test_circuit(circuit_under_test, [input_vector], print_result = False)
+
+    fault_detected = False
+    for n in circuit_under_test.output_list:
+        if n.value in [node_value.d, node_value.d_bar]:
+            fault_detected = True
+    
+    return fault_detected
+
+def test_full_fault_list_detection(circuit_under_test: circuit, input_vector):
+    '''
+    This function tests if all the faults in the circuit are detected by the test vector.
+    The good machine is simulated once and only the fanout cone of each fault is
+    re-simulated, see fault_simulator
+    '''
+    simulator = fault_simulator(circuit_under_test)
+    detection = simulator.simulate([input_vector])
+    results = {}
+    num_faults_detected = 0
+
+    for fault_id in detection:
+        if detection[fault_id]:
+            num_faults_detected += 1
+            results[simulator.fault_strings[fault_id]] = "Y"
+        else:
+            results[simulator.fault_strings[fault_id]] = "N"
+
+    index_row_1 = 0
+    index_row_2 = 0
+    entries_per_row = 15
+    input_list = list(results.keys())
+    print("Total number of faults: ", len(input_list))
+    print("Total number of faults detected: ", num_faults_detected)
+    print("Percentage of faults detected: {}%".format((num_faults_detected / len(results)) * 100))
+    for i in range(entries_per_row, len(input_list), entries_per_row):
+        print("Fault     ", end = "")
+        while index_row_1 < i:
+            print("| {:^10} ".format(input_list[index_row_1]), end = "")
+            index_row_1 += 1
+        print("|")
+        print("Detected? ", end = "")
+        while index_row_2 < i:
+            print("| {:^10} ".format(results[input_list[index_row_2]]), end = "")
+            index_row_2 += 1
+        print("|\n")
+
+
+    if index_row_1 < len(input_list):
+        print("Fault     ", end = "")
+        while index_row_1 < len(input_list):
+            print("| {:^10} ".format(input_list[index_row_1]), end = "")
+            index_row_1 += 1
+        print("|")
+        print("Detected? ", end = "")
+        while index_row_2 < len(input_list):
+            print("| {:^10} ".format(results[input_list[index_row_2]]), end = "")
+            index_row_2 += 1
+        print("|")
+
+def print_scoap_simulation_comparison(circuit_under_test: circuit, print_by_level = False, analytic = False):
+    '''
+    This function prints each nodes controllability, number of zeros, number of ones and correspoding probabilites from each run.
+    If analytic is set, the probabilities of the nodes are the COP signal probabilities
+    (testability_analysis, one pass over the levelized nodes) instead of the counts of a
+    Monte Carlo run, no simulation is needed
+    '''
+    if analytic:
+        #imported here, testability imports print_tables from this module
+        from .testability import testability_analysis
+        measures = testability_analysis(circuit_under_test)
+        p_label = "PC"
+    else:
+        p_label = "PN"
+
+    def probability(n):
+        '''
+        Returns the probabilities of 0 and 1 of the node
+        '''
+        if analytic:
+            p = measures.signal_probability(n.name)
+            return 1 - p, p
+        return n.zero_count / (n.zero_count + n.one_count), n.one_count / (n.zero_count + n.one_count)
+
+    dict_list = []
+    if print_by_level:
+        for level in circuit_under_test.levelized_nodes:
+            data_dict = {"Level": level,
+                         "PS(0)": 0,
+                         "PS(1)": 0,
+                         f"{p_label}(0)": 0,
+                         f"{p_label}(1)": 0}
+            for n in circuit_under_test.levelized_nodes[level]:
+                p0, p1 = probability(n)
+                data_dict["PS(0)"] += round((n.controllability.c0 / (n.controllability.c0 + n.controllability.c1)), 2)
+                data_dict["PS(1)"] += round((n.controllability.c1 / (n.controllability.c0 + n.controllability.c1)), 2)
+                data_dict[f"{p_label}(0)"] += round(p0, 2)
+                data_dict[f"{p_label}(1)"] += round(p1, 2)
+            
+            for h in ["PS(0)", "PS(1)", f"{p_label}(0)", f"{p_label}(1)"]:
+                data_dict[h] = round(data_dict[h] / len(circuit_under_test.levelized_nodes[level]), 2)
+            dict_list.append(data_dict)
+    else:
+        for level in circuit_under_test.levelized_nodes:
+            for n in circuit_under_test.levelized_nodes[level]:
+                p0, p1 = probability(n)
+                data_dict = {"Node": n.name,
+                            "C0": n.controllability.c0,
+                            "C1": n.controllability.c1}
+                if not analytic:
+                    data_dict["N0"] = n.zero_count
+                    data_dict["N1"] = n.one_count
+                data_dict["PS(0)"] = round((n.controllability.c0 / (n.controllability.c0 + n.controllability.c1)), 2)
+                data_dict["PS(1)"] = round((n.controllability.c1 / (n.controllability.c0 + n.controllability.c1)), 2)
+                data_dict[f"{p_label}(0)"] = round(p0, 2)
+                data_dict[f"{p_label}(1)"] = round(p1, 2)
+                dict_list.append(data_dict)
+    
+    if analytic:
+        print("Note: PS(x): Probability of x from SCOAP analysis i.e PS(x) = (cx / (c0 + c1))\n      PC(x): Probability of x from COP analysis")
+    else:
+        print("Note: PS(x): Probability of x from SCOAP analysis i.e PS(x) = (cx / (c0 + c1))\n      PN(x): Probability of x from Simulation i.e PN(x) = (nx / (n0 + n1))")
+    print_tables(dict_list, False)
+
+def perform_monte_carlo_test(circuit_under_test: circuit, num_tests, parallel = True, seed = None,
+                             half_width = None, confidence = 0.95):
+    '''
+    This test performs Monte carlo test on the circuit. Random input vectors are streamed
+    from a seeded random_pattern_source, so runs with the same seed are reproducible.
+    At most num_tests vectors are simulated, if half_width is given the test stops as soon
+    as the signal probability of every node is known within +/- half_width with the given
+    confidence, counting only the vectors of this test (see simulate_random_patterns).
+    Returns the number of input vectors simulated
+    '''
+    source = random_pattern_source(len(circuit_under_test.input_list), seed)
+    if parallel:
+        return simulate_random_patterns(circuit_under_test, source, num_tests, half_width, confidence)
+
+    counts_before = node_counts(circuit_under_test)
+    num_simulated = 0
+    for words, num_patterns in source.blocks(num_tests):
+        iv_list = [[(w >> pattern) & 1 for w in words] for pattern in range(num_patterns)]
+        test_circuit(circuit_under_test, iv_list, False)
+        num_simulated += num_patterns
+        if (half_width != None) and \
+           (signal_probability_half_width(circuit_under_test, confidence, counts_before) <= half_width):
+            break
+
+    return num_simulated
+
+def x_expansion_outputs(circuit_under_test: circuit, iv, max_x_inputs = 16):
+    '''
+    Reference three-valued simulation of one input vector: every X input is expanded to
+    0 and 1, all the 2^k fully specified vectors are simulated at once with the
+    bit-parallel simulation, and a node is 0 or 1 if it has that value for all of them,
+    X otherwise. Returns the values of all the nodes in the order of the nodes list.
+    Raises ValueError if the vector has more than max_x_inputs X inputs
+    '''
+    x_inputs = [j for j in range(len(iv)) if iv[j] == node_value.undefined]
+    if len(x_inputs) > max_x_inputs:
+        raise ValueError(f"{len(x_inputs)} X inputs, at most {max_x_inputs} are expanded")
+
+    num_patterns = 2 ** len(x_inputs)
+    mask = (1 << num_patterns) - 1
+    x_words = dict(zip(x_inputs, minterm_words(len(x_inputs))))
+    input_words = {}
+    for j in range(len(iv)):
+        if j in x_words:
+            input_words[circuit_under_test.input_list[j].name] = x_words[j]
+        else:
+            input_words[circuit_under_test.input_list[j].name] = mask if iv[j] == node_value.one else 0
+
+    words = circuit_under_test.simulate_parallel(input_words, num_patterns)
+    values = []
+    for word in words:
+        if word == 0:
+            values.append(node_value.zero)
+        elif word == mask:
+            values.append(node_value.one)
+        else:
+            values.append(node_value.undefined)
+    return values
+
+def check_three_valued_simulation(circuit_under_test: circuit, num_tests, x_probability = 0.3, seed = None,
+                                  max_x_inputs = 12, print_result = True):
+    '''
+    Cross-checks the three-valued simulations on random partially specified vectors:
+    the dual-rail simulation (simulate_three_valued) against the scalar gate functions
+    (gate_type), which must give the same value on every node, and against the X-expansion reference
+    (x_expansion_outputs). A three-valued simulation evaluates one gate at a time, so it
+    can give X where an X reconverges and the reference gives 0 or 1 (pessimism), but a
+    0 or 1 must always match the reference (a contradiction is an error).
+
+    Vectors have at most max_x_inputs X inputs, every input is X with x_probability.
+    Returns a dictionary with the number of vectors, of node values compared and of scalar
+    mismatches, contradictions and pessimistic values
+    '''
+    generator = random.Random(seed)
+    num_inputs = len(circuit_under_test.input_list)
+    input_names = [n.name for n in circuit_under_test.input_list]
+    iv_list = []
+    for t in range(num_tests):
+        iv = [generator.randint(0, 1) for j in range(num_inputs)]
+        x_inputs = [j for j in range(num_inputs) if generator.random() < x_probability]
+        for j in generator.sample(x_inputs, min(len(x_inputs), max_x_inputs)):
+            iv[j] = node_value.undefined
+        iv_list.append(iv)
+
+    zero_words, one_words = pack_three_valued_vectors(iv_list, num_inputs)
+    zeros, ones = circuit_under_test.simulate_three_valued(dict(zip(input_names, zip(zero_words, one_words))),
+                                                           len(iv_list))
+    result = {"vectors": len(iv_list), "values": 0, "scalar_mismatches": 0, "contradictions": 0, "pessimistic": 0}
+    for t in range(len(iv_list)):
+        #circuit.simulate does not take X inputs, the gate functions are evaluated directly
+        for n, value in zip(circuit_under_test.input_list, iv_list[t]):
+            n.value = value
+        for n in circuit_under_test.schedule[circuit_under_test.level_offsets[1]:]:
+            n.gate.get_output()
+        reference = x_expansion_outputs(circuit_under_test, iv_list[t], max_x_inputs)
+        for i in range(len(circuit_under_test.nodes)):
+            value = unpack_rails(zeros[i], ones[i], t)
+            result["values"] += 1
+            if value != circuit_under_test.nodes[i].value:
+                result["scalar_mismatches"] += 1
+            if value == node_value.undefined:
+                if reference[i] != node_value.undefined:
+                    result["pessimistic"] += 1
+            elif value != reference[i]:
+                result["contradictions"] += 1
+
+    if print_result:
+        print(f"{circuit_under_test.circuit_bench_file}: {result['vectors']} vectors, {result['values']} node values")
+        print(f"Mismatches with the scalar gate functions: {result['scalar_mismatches']}")
+        print(f"Contradictions with the X-expansion: {result['contradictions']}")
+        print(f"Pessimistic X values: {result['pessimistic']}")
+    return result
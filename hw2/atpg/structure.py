@@ -0,0 +1,203 @@
+from .errors import *
+from .circuit_types import *
+
+def _set_bits(bitset):
+    '''
+    Returns the positions of the set bits of a bitset, in ascending order
+    '''
+    bits = bin(bitset)[:1:-1]
+    return [k for k in range(len(bits)) if bits[k] == "1"]
+
+class structural_index:
+    '''
+    Structural information of a levelized circuit, computed once in one pass over the
+    nodes in the order of levels and one pass in the reverse order.
+
+    Cones are bitsets (python int) over the positions of the nodes in the schedule of
+    the circuit, so the set bits of a cone are in the ascending order of levels and a
+    cone can be evaluated in the order of its bits. The outputs reachable from a node
+    are a bitset over the positions in the output list.
+
+    A fanout-free region (FFR) is a tree of gates whose nodes feed exactly one gate,
+    rooted at a stem: a node feeding several gates, no gate, or a primary output. A
+    fault inside an FFR is observed only through its stem.
+
+    Attributes:
+    position: Position of each node in the schedule, indexed like the nodes list
+    order: Index in the nodes list of the node at each position of the schedule
+    fanin: Positions of the nodes fed in of the node at each position
+    fanout: Positions of the gates fed by the node at each position
+    fanout_cone: Transitive fanout of the node at each position, the node included(bitset)
+    fanin_cone: Transitive fanin of the node at each position, the node included(bitset)
+    reachable_outputs: Outputs reachable from the node at each position(bitset over the output list)
+    stem: Position of the stem of the FFR of the node at each position
+    stems: Positions of all the stems
+    '''
+
+    def __init__(self, circuit_under_test):
+        '''
+        Builds the index of a levelized circuit
+
+        param[in] circuit_under_test: Levelized circuit
+        '''
+        if circuit_under_test.levelized_nodes == None:
+            raise CirNotLevelized()
+
+        self.circuit_under_test = circuit_under_test
+        node_index = circuit_under_test.node_index
+        schedule = circuit_under_test.schedule
+        num_nodes = len(schedule)
+
+        self.order = [node_index[n.name] for n in schedule]
+        self.position = [0] * num_nodes
+        for pos in range(num_nodes):
+            self.position[self.order[pos]] = pos
+        position = self.position
+
+        self.fanin = [tuple(position[node_index[i.name]] for i in n.gate.input_nodes) if n.gate != None else ()
+                      for n in schedule]
+        self.fanout = [tuple(sorted(position[node_index[f.name]] for f in n.fanout_nodes)) for n in schedule]
+        self.output_position = {}
+        output_bit = [0] * num_nodes
+        for k in range(len(circuit_under_test.output_list)):
+            output_node = circuit_under_test.output_list[k]
+            self.output_position[output_node.name] = k
+            output_bit[position[node_index[output_node.name]]] |= 1 << k
+
+        #forward pass, fanin cones
+        self.fanin_cone = [0] * num_nodes
+        for pos in range(num_nodes):
+            cone = 1 << pos
+            for i in self.fanin[pos]:
+                cone |= self.fanin_cone[i]
+            self.fanin_cone[pos] = cone
+
+        #reverse pass, fanout cones, reachable outputs and fanout-free regions
+        self.fanout_cone = [0] * num_nodes
+        self.reachable_outputs = [0] * num_nodes
+        self.stem = [0] * num_nodes
+        for pos in range(num_nodes - 1, -1, -1):
+            cone = 1 << pos
+            outputs = output_bit[pos]
+            for f in self.fanout[pos]:
+                cone |= self.fanout_cone[f]
+                outputs |= self.reachable_outputs[f]
+            self.fanout_cone[pos] = cone
+            self.reachable_outputs[pos] = outputs
+            if (len(self.fanout[pos]) == 1) and (output_bit[pos] == 0):
+                self.stem[pos] = self.stem[self.fanout[pos][0]]
+            else:
+                self.stem[pos] = pos
+        self.stems = [pos for pos in range(num_nodes) if self.stem[pos] == pos]
+
+    def __position(self, node_name):
+        '''
+        Returns the position of a node given its name
+        '''
+        return self.position[self.circuit_under_test.node_index[node_name]]
+
+    def __nodes(self, positions):
+        '''
+        Returns the nodes at the given positions
+        '''
+        nodes = self.circuit_under_test.nodes
+        return [nodes[self.order[pos]] for pos in positions]
+
+    def cone_positions(self, bitset):
+        '''
+        Returns the positions of the nodes of a cone bitset, in the ascending order of levels
+        '''
+        return _set_bits(bitset)
+
+    def cone_indices(self, bitset):
+        '''
+        Returns the indices in the nodes list of the nodes of a cone bitset, in the
+        ascending order of levels
+        '''
+        return [self.order[pos] for pos in _set_bits(bitset)]
+
+    def fanout_nodes(self, node_name):
+        '''
+        Returns the nodes whose gates are fed by the node
+        '''
+        return self.__nodes(self.fanout[self.__position(node_name)])
+
+    def fanout_cone_nodes(self, node_name):
+        '''
+        Returns the nodes in the transitive fanout of the node, the node included, in the
+        ascending order of levels
+        '''
+        return self.__nodes(_set_bits(self.fanout_cone[self.__position(node_name)]))
+
+    def fanin_cone_nodes(self, node_name):
+        '''
+        Returns the nodes in the transitive fanin of the node, the node included, in the
+        ascending order of levels
+        '''
+        return self.__nodes(_set_bits(self.fanin_cone[self.__position(node_name)]))
+
+    def in_fanout_cone(self, node_name, other_node_name):
+        '''
+        Returns True if the other node is in the transitive fanout of the node
+        '''
+        return bool((self.fanout_cone[self.__position(node_name)] >> self.__position(other_node_name)) & 1)
+
+    def reachable_output_nodes(self, node_name):
+        '''
+        Returns the primary outputs reachable from the node
+        '''
+        output_list = self.circuit_under_test.output_list
+        return [output_list[k] for k in _set_bits(self.reachable_outputs[self.__position(node_name)])]
+
+    def is_observable(self, node_name):
+        '''
+        Returns True if the node reaches a primary output
+        '''
+        return self.reachable_outputs[self.__position(node_name)] != 0
+
+    def fault_reachable_outputs(self, selected_fault):
+        '''
+        Returns the bitset of the primary outputs a fault can reach, over the output list.
+        A fault on a branch reaches the outputs reachable from the gate reading the branch,
+        other faults the outputs reachable from the fault node
+        '''
+        fault_node_position = self.__position(selected_fault.fault_node.name)
+        if (selected_fault.fault_output == None) or isinstance(selected_fault.fault_output, str):
+            return self.reachable_outputs[fault_node_position]
+        return self.reachable_outputs[self.__position(selected_fault.fault_output.name)]
+
+    def fault_stem(self, selected_fault):
+        '''
+        Returns the stem node of the FFR through which the fault is observed
+        '''
+        if (selected_fault.fault_output == None) or isinstance(selected_fault.fault_output, str):
+            pos = self.__position(selected_fault.fault_node.name)
+        else:
+            pos = self.__position(selected_fault.fault_output.name)
+        return self.__nodes([self.stem[pos]])[0]
+
+    def ffr_stem(self, node_name):
+        '''
+        Returns the stem of the FFR of the node
+        '''
+        return self.__nodes([self.stem[self.__position(node_name)]])[0]
+
+    def ffr_nodes(self, stem_name):
+        '''
+        Returns the nodes of the FFR rooted at the stem, in the ascending order of levels
+        '''
+        stem = self.__position(stem_name)
+        return self.__nodes([pos for pos in _set_bits(self.fanin_cone[stem]) if self.stem[pos] == stem])
+
+    def print_summary(self):
+        '''
+        Prints the number of stems, the size of the largest FFR and the nodes not reaching an output
+        '''
+        sizes = {}
+        for pos in range(len(self.stem)):
+            sizes[self.stem[pos]] = sizes.get(self.stem[pos], 0) + 1
+        unobservable = [pos for pos in range(len(self.stem)) if self.reachable_outputs[pos] == 0]
+        print(f"Number of nodes: {len(self.stem)}")
+        print(f"Number of fanout-free regions: {len(self.stems)}")
+        print(f"Largest fanout-free region: {max(sizes.values()) if sizes else 0} nodes")
+        print(f"Nodes not reaching an output: {self.__nodes(unobservable)}")
@@ -0,0 +1,271 @@
+from array import array
+from .circuit import *
+from .simulation import print_tables
+
+#SCOAP observability of a node that does not reach any output
+unobservable = float("inf")
+
+class testability_analysis:
+    '''
+    Analytic testability measures of every node of a levelized circuit, each computed
+    in one pass over the levelized nodes and stored in arrays indexed like the nodes list:
+
+    c0, c1: SCOAP 0 and 1 controllability (forward pass)
+    co: SCOAP observability, unobservable for nodes that do not reach an output (backward pass)
+    p1: COP signal probability, the probability of the node being 1 (forward pass)
+    obs: COP observability, the probability that a change of the node reaches an output
+         (backward pass)
+
+    COP assumes the inputs of every gate are independent, so reconvergent fanout makes it
+    an estimate. The observability of a stem with several branches is 1 - prod(1 - branch
+    observability).
+
+    Attributes:
+    node_index: Index of each node, keys are the node names
+    input_probabilities: Probability of each input being 1, in the order of the input list
+    '''
+
+    def __init__(self, circuit_under_test: circuit, input_probabilities = None):
+        '''
+        Computes all the measures of a levelized circuit
+
+        param[in] circuit_under_test: Levelized circuit
+        param[in] input_probabilities: Probability of each input being 1, in the order of
+                                       the input list, 0.5 for all the inputs if not given
+        '''
+        if circuit_under_test.levelized_nodes == None:
+            raise CirNotLevelized()
+
+        self.circuit_under_test = circuit_under_test
+        self.node_index = circuit_under_test.node_index
+        num_nodes = len(circuit_under_test.nodes)
+        self.input_index = [self.node_index[n.name] for n in circuit_under_test.input_list]
+        self.output_index = [self.node_index[n.name] for n in circuit_under_test.output_list]
+        if input_probabilities == None:
+            input_probabilities = [0.5] * len(self.input_index)
+        self.input_probabilities = list(input_probabilities)
+
+        #gates in the ascending order of levels, as (output index, gate type, input indices)
+        self.schedule = []
+        for n in circuit_under_test.schedule[circuit_under_test.level_offsets[1]:]:
+            self.schedule.append((self.node_index[n.name], n.gate.type,
+                                  [self.node_index[i.name] for i in n.gate.input_nodes]))
+
+        self.c0 = array("i", [0]) * num_nodes
+        self.c1 = array("i", [0]) * num_nodes
+        self.co = array("d", [unobservable]) * num_nodes
+        self.p1 = array("d", [0.0]) * num_nodes
+        self.obs = array("d", [0.0]) * num_nodes
+
+        self.__controllability()
+        self.__observability()
+        self.__signal_probability()
+        self.__cop_observability()
+
+    def __controllability(self):
+        '''
+        SCOAP controllability, forward pass
+        '''
+        c0 = self.c0
+        c1 = self.c1
+        for i in self.input_index:
+            c0[i] = 1
+            c1[i] = 1
+
+        for i, g_type, fanin in self.schedule:
+            if g_type in [gate_type.AND_gate, gate_type.NAND_gate]:
+                zero = min(c0[j] for j in fanin) + 1
+                one = sum(c1[j] for j in fanin) + 1
+            elif g_type in [gate_type.OR_gate, gate_type.NOR_gate]:
+                zero = sum(c0[j] for j in fanin) + 1
+                one = min(c1[j] for j in fanin) + 1
+            elif g_type in [gate_type.XOR_gate, gate_type.XNOR_gate]:
+                #cheapest way to get an even (zero) or odd (one) number of ones at the inputs
+                zero = c0[fanin[0]]
+                one = c1[fanin[0]]
+                for j in fanin[1:]:
+                    zero, one = min(zero + c0[j], one + c1[j]), min(zero + c1[j], one + c0[j])
+                zero += 1
+                one += 1
+            else:
+                zero = c0[fanin[0]] + 1
+                one = c1[fanin[0]] + 1
+
+            if g_type in [gate_type.NAND_gate, gate_type.NOR_gate, gate_type.XNOR_gate, gate_type.NOT_gate]:
+                zero, one = one, zero
+            c0[i] = zero
+            c1[i] = one
+
+    def __observability(self):
+        '''
+        SCOAP observability, backward pass. The observability of a node is the lowest
+        observability of its fanout branches, 0 at the outputs
+        '''
+        c0 = self.c0
+        c1 = self.c1
+        co = self.co
+        for i in self.output_index:
+            co[i] = 0
+
+        for i, g_type, fanin in reversed(self.schedule):
+            if co[i] == unobservable:
+                continue
+            if g_type in [gate_type.AND_gate, gate_type.NAND_gate]:
+                side = [c1[j] for j in fanin]
+            elif g_type in [gate_type.OR_gate, gate_type.NOR_gate]:
+                side = [c0[j] for j in fanin]
+            elif g_type in [gate_type.XOR_gate, gate_type.XNOR_gate]:
+                side = [min(c0[j], c1[j]) for j in fanin]
+            else:
+                side = [0]
+            total = sum(side)
+            for k in range(len(fanin)):
+                branch = co[i] + total - side[k] + 1
+                if branch < co[fanin[k]]:
+                    co[fanin[k]] = branch
+
+    def __signal_probability(self):
+        '''
+        COP signal probability, forward pass
+        '''
+        p1 = self.p1
+        for k in range(len(self.input_index)):
+            p1[self.input_index[k]] = self.input_probabilities[k]
+
+        for i, g_type, fanin in self.schedule:
+            if g_type in [gate_type.AND_gate, gate_type.NAND_gate]:
+                p = 1.0
+                for j in fanin:
+                    p *= p1[j]
+            elif g_type in [gate_type.OR_gate, gate_type.NOR_gate]:
+                p = 1.0
+                for j in fanin:
+                    p *= 1 - p1[j]
+                p = 1 - p
+            elif g_type in [gate_type.XOR_gate, gate_type.XNOR_gate]:
+                #probability of an odd number of ones
+                q = 1.0
+                for j in fanin:
+                    q *= 1 - 2 * p1[j]
+                p = (1 - q) / 2
+            else:
+                p = p1[fanin[0]]
+
+            if g_type in [gate_type.NAND_gate, gate_type.NOR_gate, gate_type.XNOR_gate, gate_type.NOT_gate]:
+                p = 1 - p
+            p1[i] = p
+
+    def __cop_observability(self):
+        '''
+        COP observability, backward pass. The observabilities of the fanout branches of a
+        node are combined as the probability that at least one of them is observed
+        '''
+        p1 = self.p1
+        obs = self.obs
+        #probability that none of the branches seen so far is observed
+        not_observed = [1.0] * len(obs)
+        for i in self.output_index:
+            not_observed[i] = 0.0
+
+        for i, g_type, fanin in reversed(self.schedule):
+            obs[i] = 1 - not_observed[i]
+            if obs[i] == 0:
+                continue
+            if g_type in [gate_type.AND_gate, gate_type.NAND_gate]:
+                side = [p1[j] for j in fanin]
+            elif g_type in [gate_type.OR_gate, gate_type.NOR_gate]:
+                side = [1 - p1[j] for j in fanin]
+            else:
+                side = [1.0] * len(fanin)
+            for k in range(len(fanin)):
+                branch = obs[i]
+                for m in range(len(fanin)):
+                    if m != k:
+                        branch *= side[m]
+                not_observed[fanin[k]] *= 1 - branch
+
+        for i in self.input_index:
+            obs[i] = 1 - not_observed[i]
+
+    def get(self, node_name):
+        '''
+        Returns a dictionary with all the measures of a node
+        '''
+        i = self.node_index[node_name]
+        return {"C0": self.c0[i], "C1": self.c1[i], "CO": self.scoap_observability(node_name),
+                "P0": 1 - self.p1[i], "P1": self.p1[i], "O": self.obs[i]}
+
+    def scoap_observability(self, node_name):
+        '''
+        Returns the SCOAP observability of the node, unobservable if it does not reach an output
+        '''
+        co = self.co[self.node_index[node_name]]
+        return co if co == unobservable else int(co)
+
+    def signal_probability(self, node_name):
+        '''
+        Returns the COP probability of the node being 1
+        '''
+        return self.p1[self.node_index[node_name]]
+
+    def observability(self, node_name):
+        '''
+        Returns the COP observability of the node
+        '''
+        return self.obs[self.node_index[node_name]]
+
+    def detection_probability(self, node_name, f_type):
+        '''
+        Returns the COP detection probability of the stuck-at fault on the node, the
+        probability of activating it times the observability of the node
+        '''
+        i = self.node_index[node_name]
+        activation = self.p1[i] if f_type == fault_types.sa0 else 1 - self.p1[i]
+        return activation * self.obs[i]
+
+    def print_comparison(self, print_by_level = False):
+        '''
+        Prints the COP signal probabilities next to the probabilities from simulation,
+        PN(x) = nx / (n0 + n1) from the zero and one counts of the nodes (for example after
+        perform_monte_carlo_test), and the mean absolute difference
+        '''
+        nodes = set(n for n in self.circuit_under_test.nodes if n.zero_count + n.one_count > 0)
+        if not nodes:
+            print("No simulation counts, simulate the circuit before comparing")
+            return
+
+        def row(n):
+            i = self.node_index[n.name]
+            pn1 = n.one_count / (n.zero_count + n.one_count)
+            return i, pn1, abs(self.p1[i] - pn1)
+
+        dict_list = []
+        if print_by_level:
+            for level in self.circuit_under_test.levelized_nodes:
+                level_nodes = [n for n in self.circuit_under_test.levelized_nodes[level] if n in nodes]
+                if not level_nodes:
+                    continue
+                rows = [row(n) for n in level_nodes]
+                dict_list.append({"Level": level,
+                                  "PC(1)": round(sum(self.p1[i] for i, pn1, error in rows) / len(rows), 2),
+                                  "PN(1)": round(sum(pn1 for i, pn1, error in rows) / len(rows), 2),
+                                  "Error": round(sum(error for i, pn1, error in rows) / len(rows), 3)})
+        else:
+            for n in self.circuit_under_test.schedule:
+                if n not in nodes:
+                    continue
+                i, pn1, error = row(n)
+                dict_list.append({"Node": n.name,
+                                  "PC(0)": round(1 - self.p1[i], 2),
+                                  "PC(1)": round(self.p1[i], 2),
+                                  "PN(0)": round(1 - pn1, 2),
+                                  "PN(1)": round(pn1, 2),
+                                  "Error": round(error, 3),
+                                  "O": round(self.obs[i], 3),
+                                  "CO": self.scoap_observability(n.name)})
+
+        print("Note: PC(x): Probability of x from COP analysis\n      PN(x): Probability of x from Simulation i.e PN(x) = (nx / (n0 + n1))")
+        print_tables(dict_list, False)
+        errors = [row(n)[2] for n in nodes]
+        print("Mean absolute error: {}".format(round(sum(errors) / len(errors), 4)))
+        print("Max absolute error: {}".format(round(max(errors), 4)))
@@ -0,0 +1,93 @@
+from .errors import *
+from .circuit_types import *
+
+#dual-rail bit-parallel evaluation of gates for 0, 1 and X. Every node is represented
+#by two packed words (python int), the zero rail has bit i set if the node can be 0
+#for the i-th input vector of the block and the one rail if it can be 1:
+#0 is (1, 0), 1 is (0, 1) and X is (1, 1). A gate output can be 1 (0) if some values
+#the inputs can take give 1 (0), evaluated for every input on its own, so a gate is
+#exact and a circuit is pessimistic only where an X reconverges
+def and_rails(zeros, ones):
+    zero = zeros[0]
+    one = ones[0]
+    for i in range(1, len(zeros)):
+        zero |= zeros[i]
+        one &= ones[i]
+    return zero, one
+
+def or_rails(zeros, ones):
+    zero = zeros[0]
+    one = ones[0]
+    for i in range(1, len(zeros)):
+        zero &= zeros[i]
+        one |= ones[i]
+    return zero, one
+
+def not_rails(zeros, ones):
+    return ones[0], zeros[0]
+
+def buff_rails(zeros, ones):
+    return zeros[0], ones[0]
+
+def nand_rails(zeros, ones):
+    zero, one = and_rails(zeros, ones)
+    return one, zero
+
+def nor_rails(zeros, ones):
+    zero, one = or_rails(zeros, ones)
+    return one, zero
+
+def xor_rails(zeros, ones):
+    zero = zeros[0]
+    one = ones[0]
+    for i in range(1, len(zeros)):
+        zero, one = (zero & zeros[i]) | (one & ones[i]), (zero & ones[i]) | (one & zeros[i])
+    return zero, one
+
+def xnor_rails(zeros, ones):
+    zero, one = xor_rails(zeros, ones)
+    return one, zero
+
+rails_gate_function = {gate_type.AND_gate : and_rails,
+                       gate_type.OR_gate  : or_rails,
+                       gate_type.NOT_gate : not_rails,
+                       gate_type.BUFF_gate: buff_rails,
+                       gate_type.NAND_gate: nand_rails,
+                       gate_type.NOR_gate : nor_rails,
+                       gate_type.XOR_gate : xor_rails,
+                       gate_type.XNOR_gate: xnor_rails}
+
+def pack_three_valued_vectors(iv_list, num_inputs):
+    '''
+    Packs a list of input vectors with 0, 1 and X values into the zero rails and the one
+    rails of the inputs. Bit i of the j-th word of a rail is the rail of the j-th input
+    in the i-th input vector
+    '''
+    zero_words = [0] * num_inputs
+    one_words = [0] * num_inputs
+    for i in range(len(iv_list)):
+        iv = iv_list[i]
+        bit = 1 << i
+        for j in range(num_inputs):
+            if iv[j] == node_value.zero:
+                zero_words[j] |= bit
+            elif iv[j] == node_value.one:
+                one_words[j] |= bit
+            elif iv[j] == node_value.undefined:
+                zero_words[j] |= bit
+                one_words[j] |= bit
+            else:
+                raise ValueNotThreeValued(iv[j])
+    return zero_words, one_words
+
+def unpack_rails(zero_word, one_word, pattern):
+    '''
+    Returns the node value of the given pattern from the rails of a node
+    '''
+    can_be_zero = (zero_word >> pattern) & 1
+    can_be_one = (one_word >> pattern) & 1
+    if can_be_zero and can_be_one:
+        return node_value.undefined
+    if can_be_one:
+        return node_value.one
+    return node_value.zero
@@ -0,0 +1,450 @@
+import time
+from .circuit import *
+from .fault_simulation import *
+from .fault_collapsing import fault_universe
+from .pattern_source import random_pattern_source
+from .testability import testability_analysis, unobservable
+from .podem import controlling_value, inverting_gates
+
+#weights are multiples of 1 / 2^weight_resolution, kept away from 0 and 1 so that
+#every input still takes both values
+weight_resolution = 4
+
+def quantize_weight(weight, resolution = weight_resolution):
+    '''
+    Returns the closest multiple of 1 / 2^resolution to the weight, between
+    1 / 2^resolution and 1 - 1 / 2^resolution
+    '''
+    steps = 1 << resolution
+    return min(steps - 1, max(1, round(weight * steps))) / steps
+
+class weighted_pattern_source(random_pattern_source):
+    '''
+    Seeded source of weighted random input vectors, every input is 1 with its own
+    probability (weight). The blocks are packed like those of random_pattern_source.
+    A weight k / 2^r is built from r random words, one per bit of k from the least
+    significant: a 1 bit ors the next random word in and a 0 bit ands it, so the
+    probability of a 1 doubles plus one half or halves at every step. A weight of 0.5
+    costs one random word per input, as the uniform source.
+
+    Attributes:
+    weights: Probability of each input being 1, in the order of the input list
+    '''
+
+    def __init__(self, num_inputs, weights = None, seed = None, block_size = 64, resolution = weight_resolution):
+        '''
+        Creates the pattern source
+
+        param[in] num_inputs: Number of inputs of a vector
+        param[in] weights: Probability of each input being 1, 0.5 for all the inputs if not given
+        param[in] seed: Seed of the random number generator
+        param[in] block_size: Number of vectors per block
+        param[in] resolution: Number of bits of the weights
+        '''
+        super().__init__(num_inputs, seed, block_size)
+        self.resolution = resolution
+        self.set_weights(weights)
+
+    def set_weights(self, weights):
+        '''
+        Changes the weights of the inputs, the weights are rounded to the resolution
+        '''
+        if weights == None:
+            weights = [0.5] * self.num_inputs
+        if len(weights) != self.num_inputs:
+            raise ValueError(f"{len(weights)} weights given for {self.num_inputs} inputs")
+        self.weights = [quantize_weight(w, self.resolution) for w in weights]
+        #bits of the numerator of every weight from the least significant, the zero bits
+        #below the lowest one bit are dropped, anding them into a word of zeros does nothing
+        self.__weight_bits = []
+        for w in self.weights:
+            k = round(w * (1 << self.resolution))
+            bits = [(k >> b) & 1 for b in range(self.resolution)]
+            self.__weight_bits.append(bits[bits.index(1):])
+
+    def next_block(self, num_patterns = None):
+        if num_patterns == None:
+            num_patterns = self.block_size
+        self.num_vectors += num_patterns
+        getrandbits = self.random.getrandbits
+        words = []
+        for bits in self.__weight_bits:
+            word = 0
+            for bit in bits:
+                if bit:
+                    word |= getrandbits(num_patterns)
+                else:
+                    word &= getrandbits(num_patterns)
+            words.append(word)
+        return words
+
+class fault_weight_analysis:
+    '''
+    Derives input weights from the testability measures and a list of faults, usually
+    the faults random vectors did not detect. For every fault the values needed at the
+    inputs are estimated without search, from SCOAP:
+
+    1. The fault is activated: the fault site is set to the opposite of the stuck value.
+    2. The fault is propagated along the path of lowest SCOAP observability to an output,
+       the side inputs of every gate on the path get their non-controlling value.
+    3. Every objective is backtraced to the inputs: a gate output needing all the inputs
+       at the non-controlling value needs it on all the inputs, otherwise the input with
+       the lowest SCOAP controllability of the needed value is chosen. A node keeps the
+       first value it is given.
+
+    The input values of a fault form a cube. The cubes of the hardest faults (lowest
+    COP detection probability) are grouped into weight sets, a cube joins the weight set
+    it conflicts with the least (inputs where the set mostly needs the other value),
+    a new set is started if every set conflicts on more than max_conflicts of the inputs
+    of the cube. The weight of an input in a set is the fraction of the cubes of the set
+    needing a 1 on it, with one half vote for each value, inputs no cube needs keep 0.5.
+
+    Attributes:
+    measures: Testability measures of the circuit(testability_analysis)
+    '''
+
+    def __init__(self, circuit_under_test: circuit, simulator: fault_simulator = None,
+                 measures: testability_analysis = None):
+        '''
+        Prepares the analysis of a levelized circuit
+
+        param[in] circuit_under_test: Levelized circuit
+        param[in] simulator: Fault simulator of the circuit, for its fault list and structure
+        param[in] measures: Testability measures, computed with uniform inputs if not given
+        '''
+        if simulator == None:
+            simulator = fault_simulator(circuit_under_test)
+        if measures == None:
+            measures = testability_analysis(circuit_under_test)
+        self.circuit_under_test = circuit_under_test
+        self.simulator = simulator
+        self.measures = measures
+        self.input_position = {}
+        for k in range(len(simulator.input_index)):
+            self.input_position[simulator.input_index[k]] = k
+        self.is_output = [False] * len(simulator.level)
+        for i in simulator.output_index:
+            self.is_output[i] = True
+
+    def detection_probability(self, fault_id):
+        '''
+        Returns the COP detection probability of a fault, branch faults use the measures
+        of their stem
+        '''
+        site, f_type, kind = self.simulator.faults[fault_id]
+        p1 = self.measures.p1[site]
+        return (p1 if f_type == fault_types.sa0 else 1 - p1) * self.measures.obs[site]
+
+    def __easiest_fanout(self, i):
+        '''
+        Returns the gate fed by node i with the lowest SCOAP observability, None if no
+        gate fed by it reaches an output
+        '''
+        co = self.measures.co
+        gates = [g for g in self.simulator.fanout[i] if co[g] != unobservable]
+        return min(gates, key = lambda g: co[g]) if gates else None
+
+    def fault_cube(self, fault_id):
+        '''
+        Returns the values needed at the inputs to detect the fault, as a dictionary with
+        the position of the input in the input list as the key
+        '''
+        s = self.simulator
+        site, f_type, kind = s.faults[fault_id]
+        objectives = [(site, node_value.one if f_type == fault_types.sa0 else node_value.zero)]
+
+        #propagation path, from the gate reading the fault site to an output. An out fault
+        #only changes the gates reading the output, the output keeps its good value
+        if kind == out_fault:
+            g = self.__easiest_fanout(site)
+        elif kind == stem_fault:
+            g = None if self.is_output[site] else self.__easiest_fanout(site)
+        else:
+            g = kind
+        path_node = site
+        while g != None:
+            g_type = s.gate_type[g]
+            if g_type in controlling_value:
+                non_controlling = 1 - controlling_value[g_type]
+                objectives.extend((j, non_controlling) for j in s.fanin[g] if j != path_node)
+            if self.is_output[g]:
+                break
+            path_node = g
+            g = self.__easiest_fanout(g)
+
+        return self.__backtrace(objectives)
+
+    def __backtrace(self, objectives):
+        '''
+        Backtraces the objectives (node index, value) to the inputs
+        '''
+        s = self.simulator
+        c0 = self.measures.c0
+        c1 = self.measures.c1
+        assigned = {}
+        cube = {}
+        stack = list(reversed(objectives))
+        while stack:
+            i, value = stack.pop()
+            if i in assigned:
+                continue
+            assigned[i] = value
+            g_type = s.gate_type[i]
+            if g_type == None:
+                cube[self.input_position[i]] = value
+                continue
+
+            fanin = s.fanin[i]
+            if g_type in inverting_gates:
+                value = 1 - value
+            if g_type in controlling_value:
+                c = controlling_value[g_type]
+                if value == c:
+                    #one input at the controlling value, the easiest one
+                    cost = c0 if c == node_value.zero else c1
+                    stack.append((min(fanin, key = lambda j: cost[j]), c))
+                else:
+                    stack.extend((j, 1 - c) for j in reversed(fanin))
+            elif g_type in [gate_type.XOR_gate, gate_type.XNOR_gate]:
+                #the cheaper value on all the inputs but the last, the last one sets the parity
+                parity = 0
+                for j in fanin[:-1]:
+                    v = node_value.zero if c0[j] <= c1[j] else node_value.one
+                    parity ^= v
+                    stack.append((j, v))
+                stack.append((fanin[-1], value ^ parity))
+            else:
+                stack.append((fanin[0], value))
+        return cube
+
+    def weight_sets(self, fault_ids, max_sets = 4, max_faults = 256, max_conflicts = 0.1):
+        '''
+        Returns up to max_sets weight sets for the faults, each a list of weights in the
+        order of the input list, the set of the hardest faults first. Only the max_faults
+        faults with the lowest detection probability are used
+
+        param[in] fault_ids: Faults to be detected
+        param[in] max_sets: Largest number of weight sets
+        param[in] max_faults: Largest number of faults whose cubes are grouped
+        param[in] max_conflicts: Fraction of the inputs of a cube that may conflict with a set it joins
+        '''
+        faults = sorted(fault_ids, key = self.detection_probability)[:max_faults]
+        num_inputs = len(self.simulator.input_index)
+        sets = [] #[zeros, ones] votes of every input, indexed by the value
+        for fault_id in faults:
+            cube = self.fault_cube(fault_id)
+            if not cube:
+                continue
+            best = None
+            best_conflicts = None
+            for votes in sets:
+                conflicts = 0
+                for j, value in cube.items():
+                    same = votes[value][j]
+                    other = votes[1 - value][j]
+                    if other > same:
+                        conflicts += 1
+                if (best == None) or (conflicts < best_conflicts):
+                    best = votes
+                    best_conflicts = conflicts
+            if ((best == None) or (best_conflicts > max_conflicts * len(cube))) and (len(sets) < max_sets):
+                best = [[0] * num_inputs, [0] * num_inputs]
+                sets.append(best)
+            for j, value in cube.items():
+                best[value][j] += 1
+
+        return [[quantize_weight((ones[j] + 0.5) / (ones[j] + zeros[j] + 1)) for j in range(num_inputs)]
+                for zeros, ones in sets]
+
+class weighted_random_session:
+    '''
+    Fault grades weighted random vectors with fault dropping, switching weight sets as the
+    coverage saturates:
+
+    1. Uniform random vectors are applied until saturation_window vectors in a row
+       detect no new fault.
+    2. Weight sets are derived from the faults still undetected (fault_weight_analysis)
+       and applied one after the other, each until it saturates, then uniform vectors
+       once more.
+    3. Once all the weight sets saturated, new weight sets are derived from the faults
+       still undetected, if any fault was detected since the last derivation; otherwise
+       the same sets are applied again.
+
+    With weighted not set only uniform vectors are applied, the baseline of the weighted
+    session with the same seed.
+
+    Attributes:
+    fault_ids: Faults graded
+    num_vectors: Number of vectors applied
+    num_detected: Number of faults detected
+    first_detection: Vector number of the first detection of each fault, keys are the fault IDs
+    coverage_curve: (number of vectors applied, fault coverage) after every block
+    phases: (number of vectors applied, weight set) at every switch, the weight set is
+            the index in weight_sets or None for uniform vectors
+    weight_sets: Weight sets last derived
+    num_derivations: Number of times weight sets were derived
+    '''
+
+    def __init__(self, circuit_under_test: circuit, fault_ids = None, weighted = True, seed = None, block_size = 64,
+                 saturation_window = 512, max_weight_sets = 4, max_faults = 256, simulator: fault_simulator = None):
+        '''
+        Creates the session
+
+        param[in] circuit_under_test: Levelized circuit
+        param[in] fault_ids: Faults graded, the equivalence collapsed faults if not given
+        param[in] weighted: Derive and apply weight sets, only uniform vectors if not set
+        param[in] seed: Seed of the random vectors
+        param[in] block_size: Number of vectors fault simulated at once
+        param[in] saturation_window: Number of vectors without a new detection after which
+                                     the weight set is switched
+        param[in] max_weight_sets: Largest number of weight sets derived at once
+        param[in] max_faults: Largest number of faults used to derive the weight sets
+        param[in] simulator: Fault simulator of the circuit
+        '''
+        if simulator == None:
+            simulator = fault_simulator(circuit_under_test)
+        if fault_ids == None:
+            fault_ids = fault_universe(circuit_under_test).collapsed_ids
+
+        self.circuit_under_test = circuit_under_test
+        self.simulator = simulator
+        self.fault_ids = list(fault_ids)
+        self.weighted = weighted
+        self.block_size = block_size
+        self.saturation_window = saturation_window
+        self.max_weight_sets = max_weight_sets
+        self.max_faults = max_faults
+        self.source = weighted_pattern_source(len(circuit_under_test.input_list), None, seed, block_size)
+        self.analysis = None
+
+        self.undetected = list(self.fault_ids)
+        self.first_detection = {}
+        self.num_vectors = 0
+        self.num_detected = 0
+        self.coverage_curve = []
+        self.phases = [(0, None)]
+        self.weight_sets = []
+        self.num_derivations = 0
+        self.run_time = 0
+        self.__rotation = [None] #weight sets applied in turn, None for uniform vectors
+        self.__current = 0 #position in the rotation
+        self.__last_detection = 0 #number of vectors applied at the last new detection
+        self.__detected_at_derivation = None
+
+    @property
+    def coverage(self):
+        '''
+        Percentage of the faults detected so far
+        '''
+        if not self.fault_ids:
+            return 100.0
+        return (self.num_detected / len(self.fault_ids)) * 100
+
+    def __switch(self):
+        '''
+        Moves to the next weight set of the rotation, deriving new weight sets at the end
+        of the rotation
+        '''
+        self.__current += 1
+        if self.__current >= len(self.__rotation):
+            if self.__detected_at_derivation != self.num_detected:
+                if self.analysis == None:
+                    self.analysis = fault_weight_analysis(self.circuit_under_test, self.simulator)
+                self.weight_sets = self.analysis.weight_sets(self.undetected, self.max_weight_sets, self.max_faults)
+                self.num_derivations += 1
+                self.__detected_at_derivation = self.num_detected
+                self.__rotation = list(range(len(self.weight_sets))) + [None]
+            self.__current = 0
+
+        weight_set = self.__rotation[self.__current]
+        self.source.set_weights(None if weight_set == None else self.weight_sets[weight_set])
+        self.phases.append((self.num_vectors, weight_set))
+        self.__last_detection = self.num_vectors
+
+    def run(self, max_vectors, target_coverage = None):
+        '''
+        Applies vectors until max_vectors vectors were applied, all the faults are detected
+        or the coverage reaches target_coverage. Can be called again to apply more vectors.
+        Returns the coverage
+        '''
+        start = time.perf_counter()
+        while (self.num_vectors < max_vectors) and self.undetected and \
+              ((target_coverage == None) or (self.coverage < target_coverage)):
+            num_patterns = min(self.block_size, max_vectors - self.num_vectors)
+            words = self.source.next_block(num_patterns)
+            detection = self.simulator.simulate_words(words, num_patterns, self.undetected)
+
+            undetected = []
+            for fault_id in self.undetected:
+                word = detection[fault_id]
+                if word:
+                    self.first_detection[fault_id] = self.num_vectors + (word & -word).bit_length() - 1
+                    self.__last_detection = self.num_vectors + word.bit_length()
+                else:
+                    undetected.append(fault_id)
+            self.num_detected += len(self.undetected) - len(undetected)
+            self.undetected = undetected
+            self.num_vectors += num_patterns
+            self.coverage_curve.append((self.num_vectors, self.coverage))
+
+            if self.weighted and (self.num_vectors - self.__last_detection >= self.saturation_window):
+                self.__switch()
+
+        self.run_time += time.perf_counter() - start
+        return self.coverage
+
+    def vectors_to_coverage(self, target_coverage):
+        '''
+        Returns the number of vectors after which the coverage reached target_coverage,
+        None if it was not reached
+        '''
+        if not self.fault_ids:
+            return 0
+        needed = -(-target_coverage * len(self.fault_ids) // 100)
+        if needed > self.num_detected:
+            return None
+        if needed <= 0:
+            return 0
+        return sorted(self.first_detection.values())[int(needed) - 1] + 1
+
+    def print_summary(self):
+        '''
+        Prints the coverage, the number of vectors and the weight set switches
+        '''
+        print("Number of faults: ", len(self.fault_ids))
+        print("Number of vectors applied: ", self.num_vectors)
+        print("Number of faults detected: ", self.num_detected)
+        print("Fault coverage: {}%".format(round(self.coverage, 2)))
+        print("Weight set switches: {}, derivations: {}".format(len(self.phases) - 1, self.num_derivations))
+        print("Run time: {}s".format(round(self.run_time, 2)))
+
+def compare_with_uniform(circuit_under_test: circuit, max_vectors, targets = (90.0, 95.0, 98.0, 99.0), seed = 0,
+                         **options):
+    '''
+    Runs a uniform and a weighted random session with the same seed and returns, for each,
+    the coverage reached and the number of vectors to reach every target coverage (None
+    if not reached within max_vectors). Options are passed to weighted_random_session
+    '''
+    simulator = fault_simulator(circuit_under_test)
+    fault_ids = fault_universe(circuit_under_test).collapsed_ids
+    results = {"circuit": circuit_under_test.circuit_bench_file, "num_faults": len(fault_ids),
+               "max_vectors": max_vectors, "targets": list(targets)}
+    for name, weighted in [("uniform", False), ("weighted", True)]:
+        session = weighted_random_session(circuit_under_test, fault_ids, weighted, seed, simulator = simulator, **options)
+        session.run(max_vectors)
+        results[name] = {"coverage": session.coverage, "num_vectors": session.num_vectors,
+                         "vectors_to_target": [session.vectors_to_coverage(t) for t in targets],
+                         "weight_set_switches": len(session.phases) - 1, "run_time": session.run_time}
+    return results
+
+def print_weighted_comparison(results):
+    '''
+    Prints the output of compare_with_uniform
+    '''
+    print(f"{results['circuit']}: {results['num_faults']} faults, up to {results['max_vectors']} vectors")
+    print("| Patterns |  Coverage | " + "".join("{:>9} | ".format(f"to {t:g}%") for t in results["targets"]) + "Switches |")
+    for name in ["uniform", "weighted"]:
+        r = results[name]
+        print("| {:<8} | {:>8.2f}% | ".format(name, r["coverage"]) +
+              "".join("{:>9} | ".format("-" if v == None else v) for v in r["vectors_to_target"]) +
+              "{:>8} |".format(r["weight_set_switches"]))
@@ -0,0 +1,27 @@
+import os
+import argparse
+from atpg import circuit, check_three_valued_simulation
+
+bench_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "project1", "bench_files")
+bench_files = ["hw1", "c17", "c432", "c499", "c880", "c1355"]
+
+#usage:
+#python check_three_valued.py [bench name or bench file ...] [--vectors n] [--x-probability p] [--max-x-inputs n]
+#exits with status 1 if the dual-rail simulation disagrees with the scalar simulation or contradicts the X-expansion
+parser = argparse.ArgumentParser(description = "Cross-checks the three-valued simulation against an exhaustive X-expansion")
+parser.add_argument("bench", nargs = "*", help = "bench names or bench files, the small ISCAS85 circuits if not given")
+parser.add_argument("--vectors", type = int, default = 200, help = "random partially specified vectors per circuit")
+parser.add_argument("--x-probability", type = float, default = 0.3, help = "probability of an X on every input")
+parser.add_argument("--max-x-inputs", type = int, default = 10, help = "largest number of X inputs of a vector")
+parser.add_argument("--seed", type = int, default = 0, help = "seed of the random vectors")
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    failed = False
+    for b in (args.bench or bench_files):
+        file = b if os.path.exists(b) else os.path.join(bench_dir, f"{b}.bench")
+        c = circuit(file)
+        c.levelize_circuit()
+        result = check_three_valued_simulation(c, args.vectors, args.x_probability, args.seed, args.max_x_inputs)
+        failed = failed or (result["scalar_mismatches"] != 0) or (result["contradictions"] != 0)
+    exit(1 if failed else 0)
@@ -0,0 +1,37 @@
+import os
+import time
+import tracemalloc
+from atpg import circuit
+from atpg.compact_netlist import compact_netlist
+
+bench_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "project1", "bench_files")
+bench_files = ["c17", "c432", "c499", "c880", "c1355", "c1908", "c2670", "c3540", "c5315", "c6288", "c7552"]
+
+def measure(load):
+    '''
+    Returns the time taken and the memory kept by load. The time is measured
+    without tracemalloc, which slows down allocations
+    '''
+    start = time.perf_counter()
+    netlist = load()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    netlist = load()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return netlist, elapsed, memory
+
+def load_circuit(circuit_bench_file):
+    circuit_under_test = circuit(circuit_bench_file)
+    circuit_under_test.levelize_circuit()
+    return circuit_under_test
+
+print("| Circuit | Nodes | circuit(ms) | compact(ms) | circuit(KB) | compact(KB) | Memory ratio |")
+for bench in bench_files:
+    circuit_bench_file = os.path.join(bench_dir, f"{bench}.bench")
+    circuit_under_test, circuit_time, circuit_memory = measure(lambda: load_circuit(circuit_bench_file))
+    netlist, compact_time, compact_memory = measure(lambda: compact_netlist.from_bench_file(circuit_bench_file))
+    print("| {:<7} | {:>5} | {:>11.1f} | {:>11.1f} | {:>11.1f} | {:>11.1f} | {:>12.1f} |".format(
+          bench, len(netlist.names), circuit_time * 1000, compact_time * 1000,
+          circuit_memory / 1024, compact_memory / 1024, circuit_memory / compact_memory))
@@ -0,0 +1,30 @@
+import os
+import sys
+from atpg import circuit, test_generation_session, test_compaction_session, fault_grading_session
+
+bench_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "project1", "bench_files")
+bench_files = ["c17", "c432", "c499", "c880", "c1355", "c1908", "c2670", "c3540", "c5315", "c6288", "c7552"]
+
+#usage: python generate_test_set.py [bench name or bench file ...]
+#the compacted test set of each circuit is written to <bench name>_tests.txt
+for bench in (sys.argv[1:] or bench_files):
+    circuit_bench_file = bench if os.path.exists(bench) else os.path.join(bench_dir, f"{bench}.bench")
+    circuit_under_test = circuit(circuit_bench_file)
+    circuit_under_test.levelize_circuit()
+
+    session = test_generation_session(circuit_under_test, backtrack_limit = 100, time_limit = 1.0, seed = 0)
+    session.run()
+    print(f"-----Test generation for {os.path.basename(circuit_bench_file)}-----")
+    session.print_summary()
+
+    #merge the PODEM cubes and drop the vectors detecting no fault in reverse order
+    compaction = test_compaction_session(circuit_under_test, session.test_cubes, fault_ids = session.universe.collapsed_ids,
+                                         reference_vectors = session.test_set, simulator = session.engine.simulator)
+    compaction.run()
+    compaction.print_summary()
+
+    #coverage of the compacted test set on all the faults, comparable with the coverage of the generation
+    grading = fault_grading_session(circuit_under_test)
+    grading.run(compaction.test_set)
+    print("Fault coverage of all the faults after compaction: {}%".format(round(grading.coverage, 2)))
+    compaction.write_test_set(f"{os.path.splitext(os.path.basename(circuit_bench_file))[0]}_tests.txt")
@@ -0,0 +1,42 @@
+import os
+import sys
+import time
+import random
+from atpg import circuit, fault_simulator, parallel_fault_simulator
+
+bench_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "project1", "bench_files")
+bench_files = ["c432", "c499", "c880", "c1355", "c1908", "c2670", "c3540", "c5315", "c6288", "c7552"]
+
+#usage: python parallel_fault_simulation_benchmark.py [number of vectors] [number of workers ...]
+num_vectors = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+worker_counts = [int(w) for w in sys.argv[2:]] or sorted(set([2, 4, os.cpu_count() or 1]))
+
+if __name__ == "__main__":
+    print(f"{os.cpu_count()} CPUs, {num_vectors} vectors, full fault list without fault dropping")
+    header = "| Circuit | Faults | serial(s) |"
+    for num_workers in worker_counts:
+        header += f" {num_workers} workers(s) | speedup |"
+    print(header)
+
+    for bench in bench_files:
+        circuit_under_test = circuit(os.path.join(bench_dir, f"{bench}.bench"))
+        circuit_under_test.levelize_circuit()
+        rng = random.Random(0)
+        iv_list = [[rng.randint(0, 1) for n in circuit_under_test.input_list] for i in range(num_vectors)]
+
+        serial = fault_simulator(circuit_under_test)
+        start = time.perf_counter()
+        expected = [serial.simulate(iv_list[k:k + 64]) for k in range(0, num_vectors, 64)]
+        serial_time = time.perf_counter() - start
+
+        row = "| {:<7} | {:>6} | {:>9.2f} |".format(bench, len(serial.fault_strings), serial_time)
+        for num_workers in worker_counts:
+            with parallel_fault_simulator(circuit_under_test, num_workers) as simulator:
+                simulator.simulate(iv_list[:1]) #start the workers before timing
+                start = time.perf_counter()
+                results = [simulator.simulate(iv_list[k:k + 64]) for k in range(0, num_vectors, 64)]
+                parallel_time = time.perf_counter() - start
+            if results != expected:
+                raise RuntimeError(f"{bench}: results of {num_workers} workers differ from the serial run")
+            row += " {:>13.2f} | {:>7.2f} |".format(parallel_time, serial_time / parallel_time)
+        print(row)
@@ -0,0 +1,50 @@
+import os
+import random
+import argparse
+from atpg import circuit, fault_simulator
+from atpg.profiling import simulation_profile, diff_profiles, print_profile_diff
+
+bench_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "project1", "bench_files")
+
+#usage: python profile_simulation.py bench [--vectors 64] [--output profile] [--diff old_profile]
+#writes <profile>_simulation.json and <profile>_fault_simulation.json, --diff compares with the
+#files written by an earlier run
+parser = argparse.ArgumentParser(description = "Profiles the scalar, event-driven and fault simulation of a circuit")
+parser.add_argument("bench", help = "bench name or bench file")
+parser.add_argument("--vectors", type = int, default = 64, help = "number of random vectors")
+parser.add_argument("--seed", type = int, default = 0, help = "seed of the random vectors")
+parser.add_argument("--output", help = "prefix of the profile files written")
+parser.add_argument("--diff", help = "prefix of the profile files to compare with")
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    circuit_bench_file = args.bench if os.path.exists(args.bench) else os.path.join(bench_dir, f"{args.bench}.bench")
+    circuit_under_test = circuit(circuit_bench_file)
+    circuit_under_test.levelize_circuit()
+    rng = random.Random(args.seed)
+    iv_list = [[rng.randint(0, 1) for n in circuit_under_test.input_list] for i in range(args.vectors)]
+    input_names = [n.name for n in circuit_under_test.input_list]
+
+    profiles = {}
+    profiles["simulation"] = circuit_under_test.enable_profiling()
+    for input_vector in iv_list:
+        circuit_under_test.simulate(dict(zip(input_names, input_vector)))
+    circuit_under_test.disable_profiling()
+
+    profiles["event_driven_simulation"] = circuit_under_test.enable_profiling(simulation_profile("event-driven simulation"))
+    for input_vector in iv_list:
+        circuit_under_test.simulate_event_driven(dict(zip(input_names, input_vector)))
+    circuit_under_test.disable_profiling()
+
+    simulator = fault_simulator(circuit_under_test)
+    profiles["fault_simulation"] = simulator.enable_profiling()
+    for k in range(0, len(iv_list), 64):
+        simulator.simulate(iv_list[k:k + 64])
+    simulator.disable_profiling()
+
+    for name in profiles:
+        profiles[name].print_summary()
+        if args.output != None:
+            profiles[name].save(f"{args.output}_{name}.json")
+        if args.diff != None:
+            print_profile_diff(diff_profiles(simulation_profile.load(f"{args.diff}_{name}.json"), profiles[name]))
@@ -0,0 +1,44 @@
+import os
+import sys
+import argparse
+from atpg.benchmark import run_benchmarks, save_results, load_results, compare_results, print_results, print_comparison
+
+bench_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "project1", "bench_files")
+bench_files = ["c17", "c432", "c499", "c880", "c1355", "c1908", "c2670", "c3540", "c5315", "c6288", "c7552"]
+
+#usage:
+#python run_benchmarks.py run [--output baseline.json] [bench name or bench file ...]
+#python run_benchmarks.py compare baseline.json [--threshold 0.1] [--output current.json] [bench name or bench file ...]
+#compare exits with status 1 if any metric regressed by more than the threshold
+parser = argparse.ArgumentParser(description = "Benchmarks the simulation engines on the ISCAS85 bench files")
+parser.add_argument("mode", choices = ["run", "compare"])
+parser.add_argument("baseline", nargs = "?", help = "baseline JSON file of compare")
+parser.add_argument("bench", nargs = "*", help = "bench names or bench files, all the ISCAS85 circuits if not given")
+parser.add_argument("--output", help = "JSON file the results are written to")
+parser.add_argument("--threshold", type = float, default = 0.1, help = "relative change flagged as a regression")
+parser.add_argument("--vectors", type = int, default = 1024, help = "vectors of the bit-parallel simulation")
+parser.add_argument("--scalar-vectors", type = int, default = 64, help = "vectors of the scalar simulation")
+parser.add_argument("--fault-vectors", type = int, default = 64, help = "vectors fault simulated against all the faults")
+parser.add_argument("--repeat", type = int, default = 3, help = "timed runs of every metric, the best is kept")
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    bench = args.bench
+    if args.mode == "run" and args.baseline != None:
+        bench = [args.baseline] + bench
+    elif args.mode == "compare" and args.baseline == None:
+        parser.error("compare needs a baseline file")
+
+    files = [b if os.path.exists(b) else os.path.join(bench_dir, f"{b}.bench") for b in (bench or bench_files)]
+    results = run_benchmarks(files, num_vectors = args.vectors, num_scalar_vectors = args.scalar_vectors,
+                             num_fault_vectors = args.fault_vectors, repeat = args.repeat)
+    print_results(results)
+    if args.output != None:
+        save_results(results, args.output)
+
+    if args.mode == "compare":
+        comparison = compare_results(load_results(args.baseline), results, args.threshold)
+        print_comparison(comparison)
+        regressions = [c for c in comparison if c[5]]
+        print(f"{len(regressions)} regressions beyond {args.threshold * 100:.0f}%")
+        sys.exit(1 if regressions else 0)
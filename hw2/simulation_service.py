@@ -0,0 +1,38 @@
+import os
+import argparse
+from atpg.service import run_server, benchmark_service, print_service_benchmark
+
+bench_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "project1", "bench_files")
+
+#usage:
+#python simulation_service.py serve [--socket path | --port port] [--circuit-root dir] [--max-circuits n] [--batch-delay seconds]
+#python simulation_service.py benchmark [bench name or bench file ...] [--clients n] [--requests n] [--vectors n]
+#serve runs until interrupted, benchmark starts a server in the process and measures simulate requests.
+#clients can only load the bench files inside the circuit root, the bundled bench files by default,
+#and a host other than a loopback address needs --allow-remote (the service has no authentication)
+parser = argparse.ArgumentParser(description = "Simulation service keeping the circuits loaded between requests")
+parser.add_argument("mode", choices = ["serve", "benchmark"])
+parser.add_argument("bench", nargs = "*", help = "bench names or bench files measured by benchmark")
+parser.add_argument("--socket", help = "Unix socket path, a localhost TCP port is used if not given")
+parser.add_argument("--host", default = "127.0.0.1", help = "host of the TCP port")
+parser.add_argument("--port", type = int, default = 0, help = "TCP port, 0 picks a free port")
+parser.add_argument("--allow-remote", action = "store_true", help = "allow a host that is not a loopback address")
+parser.add_argument("--circuit-root", help = "directory of the bench files clients can load")
+parser.add_argument("--max-circuits", type = int, default = 8, help = "circuits kept loaded")
+parser.add_argument("--batch-delay", type = float, default = 0.0, help = "seconds a batch waits for more requests")
+parser.add_argument("--max-batch-vectors", type = int, default = 4096, help = "vectors simulated in one batch")
+parser.add_argument("--clients", type = int, default = 8, help = "concurrent clients of benchmark")
+parser.add_argument("--requests", type = int, default = 100, help = "requests of every client of benchmark")
+parser.add_argument("--vectors", type = int, default = 1, help = "input vectors of every request of benchmark")
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    options = {"max_circuits": args.max_circuits, "batch_delay": args.batch_delay,
+               "max_batch_vectors": args.max_batch_vectors, "circuit_root": args.circuit_root}
+    if args.mode == "serve":
+        run_server(args.socket, args.host, args.port, args.allow_remote, **options)
+    else:
+        for b in (args.bench or ["c432", "c7552"]):
+            file = b if os.path.exists(b) else os.path.join(bench_dir, f"{b}.bench")
+            results = benchmark_service(file, args.socket, args.clients, args.requests, args.vectors, **options)
+            print_service_benchmark(results)
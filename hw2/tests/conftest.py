@@ -0,0 +1,68 @@
+import os
+import sys
+import random
+import pytest
+
+hw2_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, hw2_dir)
+
+from atpg import circuit, node_value
+
+bench_dir = os.path.join(hw2_dir, "..", "project1", "bench_files")
+
+#c17 is checked exhaustively, c432 with random vectors
+num_random_vectors = 96
+
+@pytest.fixture(params = ["c17", "c432"])
+def bench_file(request):
+    return os.path.join(bench_dir, f"{request.param}.bench")
+
+@pytest.fixture
+def circuit_under_test(bench_file):
+    c = circuit(bench_file)
+    c.levelize_circuit()
+    return c
+
+@pytest.fixture
+def vectors(circuit_under_test):
+    '''
+    Input vectors applied to the circuit, all of them if the circuit has a few inputs
+    '''
+    num_inputs = len(circuit_under_test.input_list)
+    if num_inputs <= 6:
+        return [[(k >> j) & 1 for j in range(num_inputs)] for k in range(1 << num_inputs)]
+    rng = random.Random(0)
+    return [[rng.randint(0, 1) for j in range(num_inputs)] for k in range(num_random_vectors)]
+
+@pytest.fixture
+def reference_values(bench_file, vectors):
+    '''
+    Value of every node for every input vector given by circuit.simulate, indexed like
+    the nodes list
+    '''
+    reference = circuit(bench_file)
+    reference.levelize_circuit()
+    input_names = [n.name for n in reference.input_list]
+    values = []
+    for iv in vectors:
+        reference.simulate(dict(zip(input_names, iv)))
+        values.append([n.value for n in reference.nodes])
+    return values
+
+def _scalar_fault_detection(circuit_under_test, iv, selected_fault):
+    '''
+    Returns True if circuit.simulate with the fault selected shows D or D' on an output
+    '''
+    circuit_under_test.select_fault_object(selected_fault)
+    try:
+        circuit_under_test.simulate(dict(zip([n.name for n in circuit_under_test.input_list], iv)))
+        return any(n.value in [node_value.d, node_value.d_bar] for n in circuit_under_test.output_list)
+    finally:
+        selected_fault.fault_node.selected_fault = None
+
+@pytest.fixture
+def scalar_fault_detection():
+    '''
+    Serial reference of the fault simulators: scalar_fault_detection(circuit, iv, fault)
+    '''
+    return _scalar_fault_detection
@@ -0,0 +1,62 @@
+import os
+import stat
+import pytest
+from atpg.bench_parser import load_bench_file, load_netlist, cache_file_path, default_cache_dir, private_cache_dir
+from atpg.errors import CacheDirNotPrivate
+
+def _same_netlist(netlist, other):
+    return (netlist.names == other.names) and (list(netlist.gate_types) == list(other.gate_types)) and \
+           (list(netlist.fanin_offsets) == list(other.fanin_offsets)) and \
+           (list(netlist.fanin_index) == list(other.fanin_index))
+
+def test_cached_netlist_matches_parsed_netlist(bench_file, tmp_path):
+    parsed = load_bench_file(bench_file)
+    assert _same_netlist(load_bench_file(bench_file, True, str(tmp_path)), parsed)
+    assert _same_netlist(load_bench_file(bench_file, True, str(tmp_path)), parsed)
+
+def test_truncated_cache_file_is_reparsed(bench_file, tmp_path):
+    parsed = load_bench_file(bench_file)
+    load_bench_file(bench_file, True, str(tmp_path))
+    cache_file = cache_file_path(bench_file, str(tmp_path))
+    with open(cache_file, "rb") as f:
+        data = f.read()
+
+    for size in [len(data) - 1, len(data) // 2, 16]:
+        with open(cache_file, "wb") as f:
+            f.write(data[:size])
+        assert load_netlist(cache_file) == (None, None)
+        assert not os.path.exists(cache_file)
+
+        with open(cache_file, "wb") as f:
+            f.write(data[:size])
+        assert _same_netlist(load_bench_file(bench_file, True, str(tmp_path)), parsed)
+        assert os.path.getsize(cache_file) == len(data)
+
+def test_cache_files_writable_by_others_are_not_loaded(bench_file, tmp_path):
+    parsed = load_bench_file(bench_file)
+    load_bench_file(bench_file, True, str(tmp_path))
+    cache_file = cache_file_path(bench_file, str(tmp_path))
+    assert stat.S_IMODE(os.stat(cache_file).st_mode) == 0o600
+
+    os.chmod(cache_file, 0o666)
+    assert load_netlist(cache_file) == (None, None)
+    assert not os.path.exists(cache_file)
+    assert _same_netlist(load_bench_file(bench_file, True, str(tmp_path)), parsed)
+    assert stat.S_IMODE(os.stat(cache_file).st_mode) == 0o600
+
+def test_cache_dir_must_be_private(bench_file, tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert private_cache_dir() == default_cache_dir() == str(tmp_path / "atpg")
+    assert stat.S_IMODE(os.stat(default_cache_dir()).st_mode) == 0o700
+
+    shared_dir = tmp_path / "shared"
+    shared_dir.mkdir()
+    os.chmod(shared_dir, 0o777)
+    with pytest.raises(CacheDirNotPrivate):
+        load_bench_file(bench_file, True, str(shared_dir))
+    assert os.listdir(shared_dir) == []
+
+    link = tmp_path / "link"
+    link.symlink_to(tmp_path / "atpg")
+    with pytest.raises(CacheDirNotPrivate):
+        private_cache_dir(str(link))
@@ -0,0 +1,33 @@
+import pytest
+from atpg.benchmark import metrics, run_benchmarks, save_results, load_results, compare_results
+
+def test_run_benchmarks_measures_every_metric(bench_file, tmp_path):
+    results = run_benchmarks([bench_file], print_progress = False, num_vectors = 64, num_scalar_vectors = 4,
+                             num_fault_vectors = 64, repeat = 1)
+    assert results["settings"]["repeat"] == 1
+    (bench, measured), = results["circuits"].items()
+    assert bench in bench_file
+    assert all(measured[metric] > 0 for metric in metrics)
+    assert measured["num_faults"] > 0
+
+    save_results(results, str(tmp_path / "baseline.json"))
+    baseline = load_results(str(tmp_path / "baseline.json"))
+    assert baseline == results
+    comparison = compare_results(baseline, results)
+    assert len(comparison) == len(metrics)
+    assert not any(regression for bench, metric, old, new, change, regression in comparison)
+
+def test_compare_results_flags_regressions():
+    baseline = {"circuits": {"c17": {"parse_time": 1.0, "parallel_simulation_rate": 100.0, "peak_memory": 1000},
+                             "c432": {"parse_time": 1.0}}}
+    current = {"circuits": {"c17": {"parse_time": 1.2, "parallel_simulation_rate": 95.0, "peak_memory": 800},
+                            "c880": {"parse_time": 5.0}}}
+    comparison = dict(((bench, metric), (change, regression))
+                      for bench, metric, old, new, change, regression in compare_results(baseline, current, 0.1))
+
+    #only the metrics of the circuits in both results are compared, a positive change is an improvement
+    assert set(comparison) == set([("c17", "parse_time"), ("c17", "parallel_simulation_rate"), ("c17", "peak_memory")])
+    assert comparison[("c17", "parse_time")] == (pytest.approx(-0.2), True)
+    assert comparison[("c17", "parallel_simulation_rate")] == (pytest.approx(-0.05), False)
+    assert comparison[("c17", "peak_memory")] == (pytest.approx(0.2), False)
+    assert compare_results(baseline, current, 0.25)[0][5] == False
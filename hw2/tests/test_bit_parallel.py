@@ -0,0 +1,21 @@
+from atpg.bit_parallel import pack_input_vectors, unpack_word
+
+def test_simulate_parallel_matches_simulate(circuit_under_test, vectors, reference_values):
+    num_inputs = len(circuit_under_test.input_list)
+    packed_inputs = pack_input_vectors(vectors, num_inputs)
+    input_words = dict(zip([n.name for n in circuit_under_test.input_list], packed_inputs))
+    words = circuit_under_test.simulate_parallel(input_words, len(vectors))
+    for pattern in range(len(vectors)):
+        assert [unpack_word(w, pattern) for w in words] == reference_values[pattern]
+
+def test_simulate_parallel_word_size_independent(circuit_under_test, vectors):
+    num_inputs = len(circuit_under_test.input_list)
+    input_names = [n.name for n in circuit_under_test.input_list]
+    words = circuit_under_test.simulate_parallel(dict(zip(input_names, pack_input_vectors(vectors, num_inputs))),
+                                                 len(vectors))
+    for start in range(0, len(vectors), 7):
+        block = vectors[start:start + 7]
+        block_words = circuit_under_test.simulate_parallel(dict(zip(input_names, pack_input_vectors(block, num_inputs))),
+                                                           len(block))
+        mask = (1 << len(block)) - 1
+        assert block_words == [(w >> start) & mask for w in words]
@@ -0,0 +1,28 @@
+from atpg import circuit
+from atpg.compact_netlist import compact_netlist
+from atpg.bit_parallel import pack_input_vectors, unpack_word
+
+def _by_name(reference_circuit, values):
+    return dict(zip([n.name for n in reference_circuit.nodes], values))
+
+def test_compact_simulate_matches_simulate(circuit_under_test, bench_file, vectors, reference_values):
+    netlist = compact_netlist.from_bench_file(bench_file)
+    input_names = [n.name for n in circuit_under_test.input_list]
+    for pattern in range(len(vectors)):
+        netlist.simulate(dict(zip(input_names, vectors[pattern])))
+        assert dict(zip(netlist.names, netlist.values)) == _by_name(circuit_under_test, reference_values[pattern])
+
+def test_compact_simulate_parallel_matches_simulate(circuit_under_test, vectors, reference_values):
+    netlist = compact_netlist.from_circuit(circuit_under_test)
+    words = netlist.simulate_parallel(pack_input_vectors(vectors, len(netlist.input_index)), len(vectors))
+    for pattern in range(len(vectors)):
+        assert [unpack_word(w, pattern) for w in words] == reference_values[pattern]
+
+def test_input_is_output_matches_circuit(tmp_path):
+    bench_file = tmp_path / "input_is_output.bench"
+    bench_file.write_text("OUTPUT(b)\nINPUT(a)\nINPUT(b)\nOUTPUT(a)\nOUTPUT(y)\ny = NAND(a, b)\n")
+    reference = circuit(str(bench_file))
+    for netlist in [compact_netlist.from_bench_file(str(bench_file)), compact_netlist.from_circuit(reference)]:
+        assert [n.input_is_output for n in netlist.nodes] == [n.input_is_output for n in reference.nodes] == \
+               [True, True, False]
+        assert sorted(netlist.names[i] for i in netlist.output_index) == ["a", "b", "y"]
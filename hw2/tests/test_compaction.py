@@ -0,0 +1,50 @@
+import random
+from atpg import node_value, fault_simulator, test_generation_session, test_compaction_session, \
+                 merge_compatible_vectors
+
+#test_generation_session and test_compaction_session are imported under their own name, pytest
+#does not collect them since they are classes with an __init__
+
+def _detected(simulator, iv_list):
+    detection = simulator.simulate(iv_list)
+    return set(fault_id for fault_id in detection if detection[fault_id])
+
+def _implies(merged, cube):
+    return all((v == node_value.undefined) or (m == v) for m, v in zip(merged, cube))
+
+def test_merged_cubes_do_not_conflict():
+    rng = random.Random(0)
+    for trial in range(20):
+        num_inputs = rng.randint(1, 12)
+        cubes = [[rng.choice([0, 1, node_value.undefined, node_value.undefined]) for j in range(num_inputs)]
+                 for k in range(rng.randint(1, 30))]
+        merged = merge_compatible_vectors(cubes)
+        assert len(merged) <= len(cubes)
+        for cube in cubes:
+            assert any(_implies(m, cube) for m in merged), cube
+        #every specified input of a merged cube comes from a cube it replaces
+        for m in merged:
+            for j in range(num_inputs):
+                if m[j] != node_value.undefined:
+                    assert any(_implies(m, cube) and (cube[j] == m[j]) for cube in cubes)
+
+def test_compaction_keeps_coverage(circuit_under_test):
+    generation = test_generation_session(circuit_under_test, backtrack_limit = 100, time_limit = 1.0, seed = 0)
+    generation.run()
+    simulator = fault_simulator(circuit_under_test)
+    expected = _detected(simulator, generation.test_set)
+
+    compaction = test_compaction_session(circuit_under_test, generation.test_cubes,
+                                         reference_vectors = generation.test_set, simulator = simulator)
+    compacted = compaction.run()
+    assert len(compacted) <= len(generation.test_set)
+    assert all(v in [0, 1] for iv in compacted for v in iv)
+    assert _detected(simulator, compacted) >= expected
+    assert compaction.num_detected_after == compaction.num_detected_before
+
+def test_compaction_of_random_vectors_keeps_coverage(circuit_under_test, vectors):
+    simulator = fault_simulator(circuit_under_test)
+    compaction = test_compaction_session(circuit_under_test, vectors, simulator = simulator)
+    compacted = compaction.run()
+    assert len(compacted) <= len(vectors)
+    assert _detected(simulator, compacted) >= _detected(simulator, vectors)
@@ -0,0 +1,41 @@
+import os
+import stat
+import marshal
+import pytest
+from atpg import compiled_circuit
+from atpg.bit_parallel import pack_input_vectors, unpack_word
+from atpg.errors import CacheDirNotPrivate
+
+def test_compiled_evaluate_matches_simulate(circuit_under_test, vectors, reference_values, tmp_path):
+    compiled = compiled_circuit(circuit_under_test, cache_dir = str(tmp_path))
+    for pattern in range(len(vectors)):
+        assert list(compiled.evaluate(vectors[pattern])) == reference_values[pattern]
+
+def test_compiled_evaluate_parallel_matches_simulate(circuit_under_test, vectors, reference_values, tmp_path):
+    compiled = compiled_circuit(circuit_under_test, cache_dir = str(tmp_path))
+    words = compiled.evaluate_parallel(pack_input_vectors(vectors, len(circuit_under_test.input_list)), len(vectors))
+    for pattern in range(len(vectors)):
+        assert [unpack_word(w, pattern) for w in words] == reference_values[pattern]
+
+def test_compiled_code_cache(circuit_under_test, vectors, reference_values, tmp_path):
+    assert not compiled_circuit(circuit_under_test, cache_dir = str(tmp_path)).from_cache
+    cached = compiled_circuit(circuit_under_test, cache_dir = str(tmp_path))
+    assert cached.from_cache
+    assert list(cached.evaluate(vectors[0])) == reference_values[0]
+
+def test_planted_code_is_not_executed(circuit_under_test, vectors, reference_values, tmp_path):
+    cache_file = compiled_circuit(circuit_under_test, cache_dir = str(tmp_path)).cache_file
+    assert stat.S_IMODE(os.stat(cache_file).st_mode) == 0o600
+    with open(cache_file, "wb") as f:
+        marshal.dump(compile("raise RuntimeError('planted code executed')", "<planted>", "exec"), f)
+    os.chmod(cache_file, 0o666)
+
+    compiled = compiled_circuit(circuit_under_test, cache_dir = str(tmp_path))
+    assert not compiled.from_cache
+    assert list(compiled.evaluate(vectors[0])) == reference_values[0]
+    assert stat.S_IMODE(os.stat(cache_file).st_mode) == 0o600
+
+def test_shared_cache_dir_is_refused(circuit_under_test, tmp_path):
+    os.chmod(tmp_path, 0o777)
+    with pytest.raises(CacheDirNotPrivate):
+        compiled_circuit(circuit_under_test, cache_dir = str(tmp_path))
@@ -0,0 +1,12 @@
+def test_event_driven_matches_simulate(circuit_under_test, vectors, reference_values):
+    input_names = [n.name for n in circuit_under_test.input_list]
+    num_gates = len(circuit_under_test.nodes) - len(input_names)
+    for pattern in range(len(vectors)):
+        num_evaluations = circuit_under_test.simulate_event_driven(dict(zip(input_names, vectors[pattern])))
+        assert [n.value for n in circuit_under_test.nodes] == reference_values[pattern]
+        assert num_evaluations <= num_gates
+
+def test_event_driven_repeated_vector_evaluates_nothing(circuit_under_test, vectors):
+    input_vector = dict(zip([n.name for n in circuit_under_test.input_list], vectors[0]))
+    circuit_under_test.simulate_event_driven(input_vector)
+    assert circuit_under_test.simulate_event_driven(input_vector) == 0
@@ -0,0 +1,43 @@
+import os
+from atpg import circuit, gray_code_vectors, truth_tables
+
+#c432 has a single output whose cone has at most this many inputs
+max_cone_inputs = 20
+#the Gray-code enumeration simulates one minterm at a time, only c17 is enumerated that way
+c17_bench_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "project1", "bench_files",
+                              "c17.bench")
+
+def test_gray_code_vectors():
+    num_inputs = 5
+    previous = None
+    minterms = set()
+    for minterm, flipped, vector in gray_code_vectors(num_inputs):
+        assert minterm == sum(vector[j] << j for j in range(num_inputs))
+        if previous == None:
+            assert (flipped == None) and (minterm == 0)
+        else:
+            assert previous ^ minterm == 1 << flipped
+        previous = minterm
+        minterms.add(minterm)
+    assert minterms == set(range(1 << num_inputs))
+
+def test_truth_tables_match_simulate(circuit_under_test, vectors, reference_values):
+    tables = truth_tables(circuit_under_test, max_cone_inputs)
+    assert tables.tables
+    assert sorted(list(tables.tables) + tables.skipped) == sorted(n.name for n in circuit_under_test.output_list)
+    assert all(len(tables.cone_inputs[name]) <= max_cone_inputs for name in tables.tables)
+
+    input_names = [n.name for n in circuit_under_test.input_list]
+    position = circuit_under_test.node_index
+    for pattern in range(len(vectors)):
+        input_vector = dict(zip(input_names, vectors[pattern]))
+        for name in tables.tables:
+            assert tables.evaluate(name, input_vector) == reference_values[pattern][position[name]], name
+
+def test_incremental_matches_bit_sliced():
+    circuit_under_test = circuit(c17_bench_file)
+    circuit_under_test.levelize_circuit()
+    bit_sliced = truth_tables(circuit_under_test, max_cone_inputs)
+    incremental = truth_tables(circuit_under_test, max_cone_inputs, incremental = True)
+    assert incremental.tables == bit_sliced.tables
+    assert incremental.cone_inputs == bit_sliced.cone_inputs
@@ -0,0 +1,45 @@
+import random
+from atpg import fault_dictionary
+
+def test_diagnose_finds_fault_with_a_missing_failure(circuit_under_test, vectors):
+    dictionary = fault_dictionary(circuit_under_test, vectors)
+    rng = random.Random(0)
+    #faults failing at least twice still differ from the fault free response
+    faults = [f for f in dictionary.fault_strings if sum(len(o) for o in dictionary.response(f).values()) >= 2]
+    for fault_string in rng.sample(faults, min(len(faults), 50)):
+        failures = dictionary.response(fault_string)
+        assert fault_string in dictionary.diagnose(failures)[0][0]
+
+        vector = rng.choice(list(failures))
+        failures[vector] = failures[vector][1:]
+        if not failures[vector]:
+            del failures[vector]
+        candidates = dictionary.diagnose(failures)
+        assert any(fault_string in faults for faults, vector_mismatches, output_mismatches in candidates)
+
+def test_diagnose_ranks_like_a_full_search(circuit_under_test, vectors):
+    dictionary = fault_dictionary(circuit_under_test, vectors)
+    position = dict((name, o) for o, name in enumerate(dictionary.output_names))
+    responses = []
+    for faults in dictionary.class_faults:
+        failures = dictionary.response(dictionary.fault_strings[faults[0]])
+        responses.append(set((position[name], vector) for vector in failures for name in failures[vector]))
+
+    rng = random.Random(1)
+    for trial in range(40):
+        observed = set(rng.choice(responses))
+        for k in range(rng.randint(0, 2)):
+            observed ^= set([(rng.randrange(len(dictionary.output_names)), rng.randrange(len(vectors)))])
+        failures = {}
+        for o, vector in observed:
+            failures.setdefault(vector, []).append(dictionary.output_names[o])
+        max_candidates = rng.choice([1, 3, 10])
+
+        observed_vectors = set(vector for o, vector in observed)
+        expected = sorted((len(response ^ observed), len(set(vector for o, vector in response) ^ observed_vectors), c)
+                          for c, response in enumerate(responses))[:max_candidates]
+        candidates = dictionary.diagnose(failures, max_candidates)
+        assert [(output_mismatches, vector_mismatches) for faults, vector_mismatches, output_mismatches in candidates] == \
+               [(output_mismatches, vector_mismatches) for output_mismatches, vector_mismatches, c in expected]
+        assert [faults for faults, vector_mismatches, output_mismatches in candidates] == \
+               [[dictionary.fault_strings[k] for k in dictionary.class_faults[c]] for o, v, c in expected]
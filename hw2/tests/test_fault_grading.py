@@ -0,0 +1,47 @@
+from atpg import fault_simulator, fault_grading_session
+
+def _first_detections(circuit_under_test, vectors):
+    '''
+    Index of the first vector detecting each fault, None if not detected, from one
+    fault simulation of all the vectors without fault dropping
+    '''
+    detection = fault_simulator(circuit_under_test).simulate(vectors)
+    words = [detection[fault_id] for fault_id in range(len(detection))]
+    return [((word & -word).bit_length() - 1) if word else None for word in words]
+
+def test_first_detection_without_dropping(circuit_under_test, vectors):
+    expected = _first_detections(circuit_under_test, vectors)
+    for block_size in [1, 7, 64]:
+        session = fault_grading_session(circuit_under_test, block_size = block_size)
+        session.run(vectors)
+        assert session.first_detection == expected
+        assert session.num_vectors == len(vectors)
+        assert session.num_detected == len(expected) - expected.count(None)
+        assert [point[0] for point in session.coverage_curve] == list(range(1, len(vectors) + 1))
+
+def test_early_stop_rolls_back_the_rest_of_the_block(circuit_under_test, vectors):
+    expected = _first_detections(circuit_under_test, vectors)
+    num_faults = len(expected)
+    target = 90.0
+    #smallest number of vectors reaching the target when applied in order
+    needed = next(k for k in range(1, len(vectors) + 1)
+                  if sum(1 for first in expected if (first != None) and (first < k)) * 100 / num_faults >= target)
+
+    for block_size in [1, 7, 64]:
+        session = fault_grading_session(circuit_under_test, block_size = block_size, target_coverage = target)
+        session.run(vectors)
+        assert session.done
+        assert session.num_vectors == needed
+        assert session.first_detection == [first if (first != None) and (first < needed) else None for first in expected]
+        assert session.num_detected + len(session.undetected) == num_faults
+        assert session.coverage_curve[-1] == (needed, session.coverage)
+
+def test_max_undetected_stop(circuit_under_test, vectors):
+    expected = _first_detections(circuit_under_test, vectors)
+    max_undetected = expected.count(None) + 3
+    session = fault_grading_session(circuit_under_test, block_size = 16, max_undetected = max_undetected)
+    session.run(vectors)
+    assert len(session.undetected) <= max_undetected
+    assert len(session.undetected_faults()) == len(session.undetected)
+    assert all(session.first_detection[session.simulator.fault_index[f]] == first
+               for f, first in session.detected_faults().items())
@@ -0,0 +1,38 @@
+from atpg import fault_simulator, parallel_fault_simulator, fault_grading_session, fault_types
+
+#the scalar reference simulates one fault at a time, a sample of the faults is checked
+num_checked_vectors = 16
+num_checked_faults = 80
+
+def test_ppsfp_matches_serial_fault_simulation(circuit_under_test, vectors, scalar_fault_detection):
+    simulator = fault_simulator(circuit_under_test)
+    fault_objects = [f for n in circuit_under_test.nodes for f_type in [fault_types.sa0, fault_types.sa1]
+                     for f in n.fault_list[f_type]]
+    assert [f.fault_string for f in fault_objects] == simulator.fault_strings
+
+    vectors = vectors[:num_checked_vectors]
+    fault_ids = range(0, len(fault_objects), max(1, len(fault_objects) // num_checked_faults))
+    detection = simulator.simulate(vectors, fault_ids)
+    for fault_id in fault_ids:
+        for pattern in range(len(vectors)):
+            expected = scalar_fault_detection(circuit_under_test, vectors[pattern], fault_objects[fault_id])
+            assert bool((detection[fault_id] >> pattern) & 1) == expected, \
+                   (simulator.fault_strings[fault_id], vectors[pattern])
+
+def test_parallel_simulator_matches_serial(circuit_under_test, vectors):
+    expected = fault_simulator(circuit_under_test).simulate(vectors)
+    with parallel_fault_simulator(circuit_under_test, num_workers = 2, chunks_per_worker = 3) as simulator:
+        assert simulator.simulate(vectors) == expected
+        fault_ids = list(range(1, len(expected), 3))
+        assert simulator.simulate(vectors, fault_ids) == dict((f, expected[f]) for f in fault_ids)
+
+def test_parallel_grading_matches_serial(circuit_under_test, vectors):
+    serial = fault_grading_session(circuit_under_test, block_size = 16)
+    serial.run(vectors)
+    parallel = fault_grading_session(circuit_under_test, block_size = 16, num_workers = 2)
+    try:
+        parallel.run(vectors)
+    finally:
+        parallel.close()
+    assert parallel.first_detection == serial.first_detection
+    assert parallel.coverage_curve == serial.coverage_curve
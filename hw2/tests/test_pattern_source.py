@@ -0,0 +1,34 @@
+from atpg import random_pattern_source, simulate_random_patterns
+from atpg.pattern_source import signal_probability_half_width, node_counts
+
+def test_same_seed_gives_same_vectors():
+    source = random_pattern_source(5, seed = 3, block_size = 8)
+    vectors = list(source.vectors(20))
+    assert len(vectors) == source.num_vectors == 20
+    assert list(random_pattern_source(5, seed = 3, block_size = 8).vectors(20)) == vectors
+    assert list(random_pattern_source(5, seed = 4, block_size = 8).vectors(20)) != vectors
+
+    blocks = list(random_pattern_source(5, seed = 3, block_size = 8).blocks(20))
+    assert [num_patterns for words, num_patterns in blocks] == [8, 8, 4]
+    assert [[(w >> pattern) & 1 for w in words] for words, num_patterns in blocks
+            for pattern in range(num_patterns)] == vectors
+
+def test_num_vectors_stop_updates_counts(circuit_under_test):
+    source = random_pattern_source(len(circuit_under_test.input_list), seed = 0, block_size = 64)
+    assert simulate_random_patterns(circuit_under_test, source, 200) == 200
+    assert all(n.zero_count + n.one_count == 200 for n in circuit_under_test.nodes)
+
+def test_half_width_stop_uses_only_the_vectors_of_the_run(circuit_under_test):
+    num_inputs = len(circuit_under_test.input_list)
+    fresh = simulate_random_patterns(circuit_under_test, random_pattern_source(num_inputs, seed = 1),
+                                     4096, half_width = 0.05)
+    assert 64 < fresh < 4096
+    assert signal_probability_half_width(circuit_under_test) <= 0.05
+
+    #counts left over from the earlier run do not satisfy the stop rule of the next one
+    counts_before = node_counts(circuit_under_test)
+    again = simulate_random_patterns(circuit_under_test, random_pattern_source(num_inputs, seed = 1),
+                                     4096, half_width = 0.05)
+    assert again == fresh
+    assert signal_probability_half_width(circuit_under_test, counts_before = counts_before) <= 0.05
+    assert all(n.zero_count + n.one_count == 2 * fresh for n in circuit_under_test.nodes)
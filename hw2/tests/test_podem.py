@@ -0,0 +1,26 @@
+from atpg import podem, test_status, node_value, fault_universe
+
+#faults of c432 targeted, a sample of the collapsed faults
+num_targeted_faults = 60
+
+def test_podem_cubes_detect_their_fault(circuit_under_test, vectors, scalar_fault_detection):
+    engine = podem(circuit_under_test, backtrack_limit = 1000)
+    universe = fault_universe(circuit_under_test)
+    fault_ids = universe.collapsed_ids[::max(1, len(universe.collapsed_ids) // num_targeted_faults)]
+
+    redundant = []
+    for fault_id in fault_ids:
+        status, cube = engine.generate(fault_id)
+        if status == test_status.redundant:
+            redundant.append(fault_id)
+            continue
+        assert status == test_status.detected, universe.faults[fault_id].fault_string
+        #every filling of the X inputs is a test
+        for fill in [node_value.zero, node_value.one]:
+            iv = [fill if v == node_value.undefined else v for v in cube]
+            assert scalar_fault_detection(circuit_under_test, iv, universe.faults[fault_id]), \
+                   (universe.faults[fault_id].fault_string, cube)
+
+    if redundant:
+        detection = engine.simulator.simulate(vectors, redundant)
+        assert not any(detection.values())
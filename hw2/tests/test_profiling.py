@@ -0,0 +1,59 @@
+from atpg import fault_simulator, simulation_profile, diff_profiles
+
+def test_fault_simulation_profile_counters(circuit_under_test, vectors):
+    simulator = fault_simulator(circuit_under_test)
+    expected = simulator.simulate(vectors)
+
+    profile = simulator.enable_profiling()
+    assert simulator.simulate(vectors) == expected
+    assert simulator.disable_profiling() is profile
+    assert simulator.profile == None
+
+    counters = profile.counters
+    assert counters["vectors"] == len(vectors)
+    assert counters["faults"] == len(simulator.fault_strings)
+    assert counters["faults_not_activated"] < counters["faults"]
+    assert counters["fault_injection_checks"] == profile.total("evaluations")
+    assert 0 < counters["fault_injections"] <= counters["fault_injection_checks"]
+    assert 0 < profile.total("toggles") <= profile.total("evaluations")
+    assert sum(m["evaluations"] for m in profile.gate_types.values()) == profile.total("evaluations")
+
+    #a disabled profile is not filled any more
+    simulator.simulate(vectors)
+    assert profile.counters == counters
+
+    #with a single vector every fault site is at 0 or 1, so one of its two faults is not activated
+    profile = simulator.enable_profiling()
+    simulator.simulate(vectors[:1])
+    assert 2 * profile.counters["faults_not_activated"] >= profile.counters["faults"] > 0
+
+def test_simulation_profile_counters(circuit_under_test, vectors):
+    input_names = [n.name for n in circuit_under_test.input_list]
+    num_gates = len(circuit_under_test.nodes) - len(input_names)
+    profile = circuit_under_test.enable_profiling()
+    for iv in vectors:
+        circuit_under_test.simulate(dict(zip(input_names, iv)))
+    assert profile.counters["vectors"] == len(vectors)
+    assert profile.total("evaluations") == len(vectors) * num_gates
+    assert profile.counters["fault_injections"] == 0
+    assert profile.counters["fault_injection_checks"] > 0
+
+    profile.reset()
+    num_evaluations = sum(circuit_under_test.simulate_event_driven(dict(zip(input_names, iv))) for iv in vectors)
+    circuit_under_test.disable_profiling()
+    assert profile.total("evaluations") == num_evaluations
+    assert profile.total("toggles") <= num_evaluations
+    assert "get_value" not in circuit_under_test.nodes[0].__dict__
+
+def test_profile_save_load_and_diff(circuit_under_test, vectors, tmp_path):
+    simulator = fault_simulator(circuit_under_test)
+    profile = simulator.enable_profiling()
+    simulator.simulate(vectors)
+    profile.save(str(tmp_path / "profile.json"))
+    loaded = simulation_profile.load(str(tmp_path / "profile.json"))
+    assert loaded.to_dict() == profile.to_dict()
+    assert diff_profiles(profile, loaded) == []
+
+    simulator.simulate(vectors[:1])
+    differences = diff_profiles(loaded, profile)
+    assert ("counters", "vectors", "count", len(vectors), len(vectors) + 1) in differences
@@ -0,0 +1,56 @@
+import os
+import pytest
+from atpg import simulation, result_node_names, columnar_result_store, result_stream_writer, read_result_file
+from atpg.compact_netlist import compact_netlist
+
+#test_circuit is called through its module so that pytest does not collect it
+
+def _values(store, num_vectors):
+    return [store.vector(pattern) for pattern in range(num_vectors)]
+
+def _reference_rows(circuit_under_test, reference_values):
+    position = dict((n.name, i) for i, n in enumerate(circuit_under_test.nodes))
+    names = result_node_names(circuit_under_test)
+    return [[values[position[name]] for name in names] for values in reference_values]
+
+def test_test_circuit_results_match_simulate(circuit_under_test, vectors, reference_values):
+    for parallel in [False, True]:
+        store = columnar_result_store()
+        simulation.test_circuit(circuit_under_test, vectors, print_result = False, parallel = parallel, sink = store)
+        assert store.node_names == result_node_names(circuit_under_test)
+        assert _values(store, len(vectors)) == _reference_rows(circuit_under_test, reference_values)
+
+def test_test_circuit_on_compact_netlist(circuit_under_test, bench_file, vectors, reference_values):
+    netlist = compact_netlist.from_bench_file(bench_file)
+    assert result_node_names(netlist) == result_node_names(circuit_under_test)
+    store = columnar_result_store()
+    simulation.test_circuit(netlist, vectors, print_result = False, sink = store)
+    assert _values(store, len(vectors)) == _reference_rows(circuit_under_test, reference_values)
+
+def _open_files():
+    return len(os.listdir("/proc/self/fd"))
+
+@pytest.mark.parametrize("file_format", ["csv", "binary"])
+def test_result_file_round_trip(circuit_under_test, vectors, reference_values, tmp_path, file_format):
+    file_name = str(tmp_path / f"results.{file_format}")
+    for parallel in [False, True]:
+        with result_stream_writer(file_name, file_format, chunk_size = 10) as writer:
+            simulation.test_circuit(circuit_under_test, vectors, print_result = False, parallel = parallel, sink = writer)
+        node_names, rows = read_result_file(file_name)
+        assert node_names == result_node_names(circuit_under_test)
+        assert list(rows) == _reference_rows(circuit_under_test, reference_values)
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason = "needs /proc to count the open files")
+@pytest.mark.parametrize("file_format", ["csv", "binary"])
+def test_result_file_is_not_left_open(circuit_under_test, vectors, tmp_path, file_format):
+    file_name = str(tmp_path / f"results.{file_format}")
+    with result_stream_writer(file_name, file_format) as writer:
+        simulation.test_circuit(circuit_under_test, vectors, print_result = False, sink = writer)
+    num_open = _open_files()
+    node_names, rows = read_result_file(file_name)
+    assert _open_files() == num_open
+
+    next(rows)
+    assert _open_files() == num_open + 1
+    rows.close()
+    assert _open_files() == num_open
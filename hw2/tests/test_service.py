@@ -0,0 +1,142 @@
+import os
+import stat
+import socket
+import asyncio
+import pytest
+from atpg import simulation_server, async_simulation_client, fault_simulator
+from atpg.errors import ServiceRequestError, RemoteHostRefused, SocketPathInUse
+
+def _load(server, circuit_bench_file):
+    '''
+    Starts the server on a localhost port, loads the bench file with a client and returns
+    the result or the error message
+    '''
+    async def load():
+        address = await server.start()
+        try:
+            async with async_simulation_client(address) as client:
+                try:
+                    return await client.load(circuit_bench_file)
+                except ServiceRequestError as e:
+                    return e.message
+        finally:
+            await server.close()
+    return asyncio.run(load())
+
+def test_service_refuses_files_outside_the_circuit_root(bench_file, tmp_path):
+    secret = tmp_path / "secret.txt"
+    secret.write_text("root:x:0:0:root:/root:/bin/bash\n")
+    server = simulation_server(circuit_root = os.path.dirname(bench_file))
+    for path in [str(secret), os.path.join("..", "..", str(secret))]:
+        message = _load(server, path)
+        assert "not in the circuit directory" in message
+        assert "root:x" not in message
+    assert _load(server, os.path.basename(bench_file))["circuit"] == os.path.realpath(bench_file)
+
+def test_service_hides_the_contents_of_invalid_bench_files(tmp_path):
+    (tmp_path / "invalid.bench").write_text("root:x:0:0:root:/root:/bin/bash\n")
+    message = _load(simulation_server(circuit_root = str(tmp_path)), "invalid.bench")
+    assert message == "Can not load invalid.bench: not a valid bench file"
+
+def test_service_refuses_remote_hosts_unless_allowed():
+    async def start(host, allow_remote):
+        server = simulation_server()
+        try:
+            return await server.start(host = host, allow_remote = allow_remote)
+        finally:
+            await server.close()
+    with pytest.raises(RemoteHostRefused):
+        asyncio.run(start("0.0.0.0", False))
+    assert asyncio.run(start("0.0.0.0", True))[0] == "0.0.0.0"
+    assert asyncio.run(start("localhost", False))[0] == "127.0.0.1"
+
+def test_service_replaces_only_stale_sockets(tmp_path):
+    async def start(socket_path):
+        server = simulation_server()
+        try:
+            await server.start(socket_path)
+            mode = stat.S_IMODE(os.lstat(socket_path).st_mode)
+            async with async_simulation_client(socket_path) as client:
+                assert await client.request("ping") == "pong"
+            return mode
+        finally:
+            await server.close()
+
+    regular_file = tmp_path / "regular"
+    regular_file.write_text("keep")
+    link = tmp_path / "link"
+    link.symlink_to(regular_file)
+    for path in [regular_file, link]:
+        with pytest.raises(SocketPathInUse):
+            asyncio.run(start(str(path)))
+    assert regular_file.read_text() == "keep"
+    assert link.is_symlink()
+
+    stale = tmp_path / "stale.sock"
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(str(stale))
+    sock.close()
+    assert asyncio.run(start(str(stale))) == 0o600
+    assert not stale.exists()
+
+def _serve(server, run):
+    '''
+    Starts the server on a localhost port, awaits run(client) with a connected client and
+    returns its result
+    '''
+    async def serve():
+        address = await server.start()
+        try:
+            async with async_simulation_client(address) as client:
+                return await run(client)
+        finally:
+            await server.close()
+    return asyncio.run(serve())
+
+def test_service_batches_concurrent_simulate_requests(circuit_under_test, bench_file, vectors, reference_values):
+    output_positions = [circuit_under_test.node_index[n.name] for n in circuit_under_test.output_list]
+    expected = ["".join(str(values[i]) for i in output_positions) for values in reference_values]
+    vector_strings = ["".join(str(value) for value in v) for v in vectors]
+    #requests of 0 to 4 vectors, one vector list is empty
+    requests = []
+    start = 0
+    while start < len(vectors):
+        size = len(requests) % 5
+        requests.append(range(start, min(start + size, len(vectors))))
+        start += size
+
+    async def run(client):
+        results = await asyncio.gather(*[client.simulate(bench_file, [vector_strings[k] for k in r])
+                                         for r in requests])
+        return results, await client.stats()
+    results, stats = _serve(simulation_server(batch_delay = 0.01, circuit_root = os.path.dirname(bench_file)), run)
+
+    assert [len(r) for r in requests].count(0) > 0
+    for r, result in zip(requests, results):
+        assert result == [expected[k] for k in r]
+    assert stats["simulate_requests"] == len(requests)
+    assert 0 < stats["batches"] < len(requests)
+
+def test_service_evicts_least_recently_used_circuits():
+    #relative paths are loaded from the bundled bench files
+    async def run(client):
+        for name in ["c17.bench", "c432.bench", "c17.bench", "c17.bench"]:
+            await client.load(name)
+        return await client.stats()
+    stats = _serve(simulation_server(max_circuits = 1), run)
+    assert (stats["cache_misses"], stats["cache_hits"], stats["evictions"]) == (3, 1, 2)
+    assert [os.path.basename(c["circuit"]) for c in stats["circuits"]] == ["c17.bench"]
+
+def test_service_fault_grade_matches_fault_simulation(circuit_under_test, bench_file, vectors):
+    simulator = fault_simulator(circuit_under_test)
+    detection = simulator.simulate(vectors)
+    undetected = [simulator.fault_strings[f] for f in range(len(simulator.fault_strings)) if detection[f] == 0]
+
+    vector_strings = ["".join(str(value) for value in v) for v in vectors]
+    async def run(client):
+        return await client.fault_grade(bench_file, vector_strings, list_undetected = True)
+    result = _serve(simulation_server(circuit_root = os.path.dirname(bench_file)), run)
+    assert result["num_faults"] == len(simulator.fault_strings)
+    assert result["num_detected"] == len(simulator.fault_strings) - len(undetected)
+    assert result["undetected"] == undetected
+    assert result["coverage"] == pytest.approx(100 * result["num_detected"] / result["num_faults"])
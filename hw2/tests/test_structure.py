@@ -0,0 +1,36 @@
+def _reach(start, next_nodes):
+    #brute-force depth-first search, returns the names of the nodes reached, the start included
+    reached = set([start.name])
+    stack = [start]
+    while stack:
+        n = stack.pop()
+        for m in next_nodes(n):
+            if m.name not in reached:
+                reached.add(m.name)
+                stack.append(m)
+    return reached
+
+def _names(index, circuit_under_test, bitset):
+    return set(circuit_under_test.nodes[i].name for i in index.cone_indices(bitset))
+
+def test_cones_match_depth_first_search(circuit_under_test):
+    index = circuit_under_test.create_structural_index()
+    output_names = [n.name for n in circuit_under_test.output_list]
+    for n in circuit_under_test.nodes:
+        pos = index.position[circuit_under_test.node_index[n.name]]
+        fanout_cone = _reach(n, lambda m: m.fanout_nodes)
+        fanin_cone = _reach(n, lambda m: m.gate.input_nodes if m.gate != None else [])
+        assert _names(index, circuit_under_test, index.fanout_cone[pos]) == fanout_cone, n.name
+        assert _names(index, circuit_under_test, index.fanin_cone[pos]) == fanin_cone, n.name
+        assert [m.name for m in index.reachable_output_nodes(n.name)] == \
+               [name for name in output_names if name in fanout_cone], n.name
+
+def test_ffr_stem_matches_walk_to_stem(circuit_under_test):
+    index = circuit_under_test.create_structural_index()
+    output_names = set(n.name for n in circuit_under_test.output_list)
+    for n in circuit_under_test.nodes:
+        stem = n
+        while (len(stem.fanout_nodes) == 1) and (stem.name not in output_names):
+            stem = stem.fanout_nodes[0]
+        assert index.ffr_stem(n.name).name == stem.name, n.name
+        assert n.name in [m.name for m in index.ffr_nodes(stem.name)]
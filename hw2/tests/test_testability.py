@@ -0,0 +1,72 @@
+import pytest
+from atpg import circuit, fault_simulator, fault_types, testability_analysis
+
+#without reconvergent fanout the inputs of every gate are independent and COP is exact
+fanout_free_bench = """INPUT(a)
+INPUT(b)
+INPUT(c)
+INPUT(d)
+INPUT(e)
+INPUT(f)
+OUTPUT(z)
+u = AND(a, b)
+v = NOR(c, d)
+w = XOR(u, v)
+x = NOT(e)
+y = NAND(x, f)
+z = OR(w, y)
+"""
+
+def _levelized_circuit(tmp_path, bench_text):
+    bench_file = tmp_path / "testability.bench"
+    bench_file.write_text(bench_text)
+    c = circuit(str(bench_file))
+    c.levelize_circuit()
+    return c
+
+def test_scoap_controllability_matches_circuit(circuit_under_test):
+    analysis = testability_analysis(circuit_under_test)
+    circuit_under_test.get_controllability()
+    for n in circuit_under_test.nodes:
+        assert analysis.get(n.name)["C0"] == n.controllability.c0, n.name
+        assert analysis.get(n.name)["C1"] == n.controllability.c1, n.name
+
+def test_scoap_observability(circuit_under_test, tmp_path):
+    analysis = testability_analysis(circuit_under_test)
+    for n in circuit_under_test.output_list:
+        assert analysis.scoap_observability(n.name) == 0
+
+    #z = OR(y, c), y = AND(a, b)
+    c = _levelized_circuit(tmp_path, "INPUT(a)\nINPUT(b)\nINPUT(c)\nOUTPUT(z)\ny = AND(a, b)\nz = OR(y, c)\n")
+    analysis = testability_analysis(c)
+    assert [analysis.scoap_observability(name) for name in ["z", "y", "c", "a", "b"]] == [0, 2, 3, 4, 4]
+
+def test_cop_is_exact_without_reconvergence(tmp_path):
+    c = _levelized_circuit(tmp_path, fanout_free_bench)
+    analysis = testability_analysis(c)
+    simulator = fault_simulator(c)
+    num_inputs = len(c.input_list)
+    vectors = [[(k >> j) & 1 for j in range(num_inputs)] for k in range(1 << num_inputs)]
+    input_names = [n.name for n in c.input_list]
+
+    ones = dict((n.name, 0) for n in c.nodes)
+    for iv in vectors:
+        c.simulate(dict(zip(input_names, iv)))
+        for n in c.nodes:
+            ones[n.name] += n.value
+    detection = simulator.simulate(vectors)
+
+    for n in c.nodes:
+        assert analysis.signal_probability(n.name) == pytest.approx(ones[n.name] / len(vectors)), n.name
+        for f_type in [fault_types.sa0, fault_types.sa1]:
+            fault_id = simulator.fault_index[f"{n.name}-{f_type}"]
+            detected = detection[fault_id].bit_count() / len(vectors)
+            assert analysis.detection_probability(n.name, f_type) == pytest.approx(detected), (n.name, f_type)
+
+def test_input_probabilities(tmp_path):
+    c = _levelized_circuit(tmp_path, fanout_free_bench)
+    weights = [0.1, 0.2, 0.3, 0.4, 0.6, 0.9]
+    analysis = testability_analysis(c, weights)
+    assert analysis.signal_probability("u") == pytest.approx(0.1 * 0.2)
+    assert analysis.signal_probability("v") == pytest.approx(0.7 * 0.6)
+    assert analysis.signal_probability("y") == pytest.approx(1 - 0.4 * 0.9)
@@ -0,0 +1,30 @@
+import random
+from atpg import node_value, pack_three_valued_vectors, unpack_rails, check_three_valued_simulation
+
+def _simulate_rails(circuit_under_test, iv_list):
+    input_names = [n.name for n in circuit_under_test.input_list]
+    zero_words, one_words = pack_three_valued_vectors(iv_list, len(input_names))
+    return circuit_under_test.simulate_three_valued(dict(zip(input_names, zip(zero_words, one_words))), len(iv_list))
+
+def test_three_valued_matches_simulate_without_x(circuit_under_test, vectors, reference_values):
+    zeros, ones = _simulate_rails(circuit_under_test, vectors)
+    for pattern in range(len(vectors)):
+        assert [unpack_rails(zeros[i], ones[i], pattern) for i in range(len(zeros))] == reference_values[pattern]
+
+def test_three_valued_values_hold_for_every_filling(circuit_under_test, vectors):
+    rng = random.Random(0)
+    iv_list = [[node_value.undefined if rng.random() < 0.3 else v for v in iv] for iv in vectors]
+    zeros, ones = _simulate_rails(circuit_under_test, iv_list)
+    input_names = [n.name for n in circuit_under_test.input_list]
+    for pattern in range(len(iv_list)):
+        values = [unpack_rails(zeros[i], ones[i], pattern) for i in range(len(zeros))]
+        for fill in range(4):
+            iv = [rng.randint(0, 1) if v == node_value.undefined else v for v in iv_list[pattern]]
+            circuit_under_test.simulate(dict(zip(input_names, iv)))
+            for n, value in zip(circuit_under_test.nodes, values):
+                assert value in [node_value.undefined, n.value], n.name
+
+def test_three_valued_matches_scalar_gates_and_x_expansion(circuit_under_test):
+    result = check_three_valued_simulation(circuit_under_test, 50, seed = 0, max_x_inputs = 8, print_result = False)
+    assert result["scalar_mismatches"] == 0
+    assert result["contradictions"] == 0
@@ -0,0 +1,48 @@
+from atpg import fault_simulator, weighted_pattern_source, fault_weight_analysis
+
+#x is an output that also feeds a gate, its out faults are observed at z only
+output_fanout_bench = """INPUT(a)
+INPUT(b)
+INPUT(c)
+INPUT(d)
+INPUT(e)
+OUTPUT(x)
+OUTPUT(z)
+x = AND(a, b, c)
+y = NOR(x, d)
+z = AND(y, e)
+"""
+
+def test_simulate_words_matches_simulate(circuit_under_test, vectors):
+    simulator = fault_simulator(circuit_under_test)
+    words = [0] * len(circuit_under_test.input_list)
+    for pattern in range(len(vectors)):
+        for j in range(len(words)):
+            words[j] |= vectors[pattern][j] << pattern
+    assert simulator.simulate_words(words, len(vectors)) == simulator.simulate(vectors)
+
+def test_weighted_source_frequencies():
+    weights = [1 / 16, 0.25, 0.5, 0.75, 15 / 16]
+    source = weighted_pattern_source(len(weights), weights, seed = 0, block_size = 4096)
+    words = source.next_block()
+    for w, word in zip(weights, words):
+        assert abs(word.bit_count() / 4096 - w) < 0.03
+
+def _fault_cube_detects(circuit_under_test, fault_ids):
+    analysis = fault_weight_analysis(circuit_under_test)
+    simulator = analysis.simulator
+    num_inputs = len(circuit_under_test.input_list)
+    for fault_id in fault_ids:
+        cube = analysis.fault_cube(fault_id)
+        #the cube of a fault on a fanout-free path is a test whatever the other inputs
+        fills = [[cube.get(j, fill) for j in range(num_inputs)] for fill in [0, 1]]
+        assert simulator.simulate(fills, [fault_id])[fault_id] == 0b11, simulator.fault_strings[fault_id]
+
+def test_fault_cube_propagates_out_faults(tmp_path):
+    from atpg import circuit
+    bench_file = tmp_path / "output_fanout.bench"
+    bench_file.write_text(output_fanout_bench)
+    c = circuit(str(bench_file))
+    c.levelize_circuit()
+    simulator = fault_simulator(c)
+    _fault_cube_detects(c, [simulator.fault_index["out-x-0"], simulator.fault_index["out-x-1"]])
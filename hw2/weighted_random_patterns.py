@@ -0,0 +1,29 @@
+import os
+import argparse
+from atpg import circuit, compare_with_uniform, print_weighted_comparison
+
+bench_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "project1", "bench_files")
+bench_files = ["c432", "c499", "c880", "c1355", "c1908", "c2670", "c3540", "c5315", "c6288", "c7552"]
+
+#usage:
+#python weighted_random_patterns.py [bench name or bench file ...] [--vectors n] [--targets t ...] [--seed n]
+#compares the vectors uniform and weighted random patterns need to reach the target fault coverages
+parser = argparse.ArgumentParser(description = "Compares weighted random patterns against uniform random patterns")
+parser.add_argument("bench", nargs = "*", help = "bench names or bench files, the ISCAS85 circuits if not given")
+parser.add_argument("--vectors", type = int, default = 16384, help = "largest number of vectors applied")
+parser.add_argument("--targets", type = float, nargs = "+", default = [90.0, 95.0, 98.0, 99.0],
+                    help = "target fault coverages")
+parser.add_argument("--seed", type = int, default = 0, help = "seed of the random vectors")
+parser.add_argument("--window", type = int, default = 512, help = "vectors without a new detection before a switch")
+parser.add_argument("--weight-sets", type = int, default = 4, help = "largest number of weight sets derived at once")
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    for b in (args.bench or bench_files):
+        file = b if os.path.exists(b) else os.path.join(bench_dir, f"{b}.bench")
+        c = circuit(file)
+        c.levelize_circuit()
+        results = compare_with_uniform(c, args.vectors, args.targets, args.seed,
+                                       saturation_window = args.window, max_weight_sets = args.weight_sets)
+        print_weighted_comparison(results)
+        print()